@@ -0,0 +1,151 @@
+"""
+Transaction Accumulator
+One-pass, mergeable summary of an account's transaction patterns
+"""
+
+import math
+from typing import Dict, Any, Iterable, Optional, Set
+
+import numpy as np
+
+from algorand.tx_batch import TransactionBatch
+
+class TransactionAccumulator:
+    """
+    Streams transactions into count, mean and variance of amounts (Welford),
+    amount min/max, confirmed-round span and distinct counterparties. Accumulators
+    built over different pages or workers combine exactly with merge().
+
+    A state loaded from the feature store keeps its counterparties in the store
+    and only their number here (stored_counterparties); counterparties then holds
+    just the ones seen since, until the store records them.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min_amount: Optional[float] = None
+        self.max_amount: Optional[float] = None
+        self.min_round: Optional[int] = None
+        self.max_round: Optional[int] = None
+        self.counterparties: Set[str] = set()
+        self.stored_counterparties = 0
+
+    def add(self, tx: Dict[str, Any]):
+        """Add one processed transaction (AlgorandClient._process_transaction shape)"""
+        amount = tx.get("amount", 0) / 1_000_000  # Convert to ALGO
+        self.count += 1
+        delta = amount - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (amount - self.mean)
+        if self.min_amount is None or amount < self.min_amount:
+            self.min_amount = amount
+        if self.max_amount is None or amount > self.max_amount:
+            self.max_amount = amount
+
+        confirmed_round = tx.get("confirmed-round", 0)
+        if confirmed_round:
+            self._add_rounds(confirmed_round, confirmed_round)
+
+        sender = tx.get("sender", "")
+        receiver = tx.get("receiver", "")
+        if sender:
+            self.counterparties.add(sender)
+        if receiver:
+            self.counterparties.add(receiver)
+
+    def add_many(self, transactions: Iterable[Dict[str, Any]]):
+        for tx in transactions:
+            self.add(tx)
+
+    def add_batch(self, batch: TransactionBatch):
+        """Add a columnar batch: summarized with NumPy, then merged in"""
+        if not len(batch):
+            return
+        amounts = batch.amounts / 1_000_000
+        mean = float(amounts.mean())
+        rounds = batch.rounds[batch.rounds != 0]
+
+        other = TransactionAccumulator()
+        other.count = len(amounts)
+        other.mean = mean
+        other.m2 = float(np.square(amounts - mean).sum())
+        other.min_amount = float(amounts.min())
+        other.max_amount = float(amounts.max())
+        if len(rounds):
+            other.min_round = int(rounds.min())
+            other.max_round = int(rounds.max())
+        other.counterparties = {batch.addresses[address_id] for address_id in batch.counterparty_ids().tolist()}
+        self.merge(other)
+
+    def merge(self, other: "TransactionAccumulator") -> "TransactionAccumulator":
+        """Fold another accumulator into this one (Chan et al. parallel variance)"""
+        if other.count:
+            if not self.count:
+                self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+                self.min_amount, self.max_amount = other.min_amount, other.max_amount
+            else:
+                count = self.count + other.count
+                delta = other.mean - self.mean
+                self.mean += delta * other.count / count
+                self.m2 += other.m2 + delta * delta * self.count * other.count / count
+                self.count = count
+                self.min_amount = min(self.min_amount, other.min_amount)
+                self.max_amount = max(self.max_amount, other.max_amount)
+        if other.min_round is not None:
+            self._add_rounds(other.min_round, other.max_round)
+        self.counterparties |= other.counterparties
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable state, for persisting between runs"""
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "m2": self.m2,
+            "min_amount": self.min_amount,
+            "max_amount": self.max_amount,
+            "min_round": self.min_round,
+            "max_round": self.max_round,
+            "counterparties": sorted(self.counterparties),
+            "stored_counterparties": self.stored_counterparties
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> "TransactionAccumulator":
+        accumulator = cls()
+        accumulator.count = state["count"]
+        accumulator.mean = state["mean"]
+        accumulator.m2 = state["m2"]
+        accumulator.min_amount = state["min_amount"]
+        accumulator.max_amount = state["max_amount"]
+        accumulator.min_round = state["min_round"]
+        accumulator.max_round = state["max_round"]
+        accumulator.counterparties = set(state["counterparties"])
+        accumulator.stored_counterparties = state.get("stored_counterparties", 0)
+        return accumulator
+
+    @property
+    def variance(self) -> float:
+        """Sample variance of amounts (0 with fewer than two transactions)"""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stdev(self) -> float:
+        return math.sqrt(max(self.variance, 0.0))
+
+    @property
+    def round_span(self) -> int:
+        return self.max_round - self.min_round if self.min_round is not None else 0
+
+    @property
+    def counterparty_count(self) -> int:
+        """Exact once stored; new counterparties already in the store count twice until then"""
+        return self.stored_counterparties + len(self.counterparties)
+
+    def _add_rounds(self, min_round: int, max_round: int):
+        if self.min_round is None or min_round < self.min_round:
+            self.min_round = min_round
+        if self.max_round is None or max_round > self.max_round:
+            self.max_round = max_round
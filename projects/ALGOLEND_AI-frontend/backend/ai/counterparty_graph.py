@@ -0,0 +1,226 @@
+"""
+Counterparty Graph
+Global who-pays-whom index over every analyzed history, with PageRank reputation
+"""
+
+import asyncio
+import time
+from array import array
+from datetime import datetime
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+
+import numpy as np
+
+from algorand.tx_batch import TransactionBatch
+
+def _sorted_unique(keys: np.ndarray) -> np.ndarray:
+    """Sorted distinct values (an in-place sort beats np.unique's hashing on large int64 arrays)"""
+    keys.sort()
+    if len(keys) < 2:
+        return keys
+    distinct = np.empty(len(keys), dtype=bool)
+    distinct[0] = True
+    np.not_equal(keys[1:], keys[:-1], out=distinct[1:])
+    return keys[distinct]
+
+class CounterpartyGraph:
+    """
+    Addresses are interned to dense int32 ids. New sender -> receiver edges are
+    appended to a pending buffer in O(1); a periodic refresh folds them into a CSR
+    adjacency (distinct edges only, so re-ingesting a history changes nothing) and
+    precomputes, per address, the number of distinct addresses in its transactions
+    (itself included, as TransactionAccumulator counts them) and a PageRank-based
+    reputation score. Lookups read those arrays and never touch the edges.
+    """
+
+    def __init__(self, refresh_seconds: float = 60.0, damping: float = 0.85,
+                 max_iterations: int = 50, tolerance: float = 1e-6):
+        self.refresh_seconds = refresh_seconds
+        self.damping = damping
+        self.max_iterations = max_iterations
+        self.tolerance = tolerance
+
+        self._ids: Dict[str, int] = {}
+        self._addresses: List[str] = []
+        self._pending_senders = array("i")
+        self._pending_receivers = array("i")
+
+        # Compacted adjacency: out-edges of node i are indices[indptr[i]:indptr[i + 1]]
+        self._indptr = np.zeros(1, dtype=np.int64)
+        self._indices = np.empty(0, dtype=np.int32)
+
+        # Precomputed per-node results, replaced together by each refresh
+        self._counterparty_counts = np.empty(0, dtype=np.int64)
+        self._reputation = np.empty(0, dtype=np.float64)
+
+        self._task: Optional[asyncio.Task] = None
+        self._refreshing = False
+        self.last_refresh: Optional[datetime] = None
+        self.last_refresh_seconds = 0.0
+        self.last_iterations = 0
+
+        # Counters
+        self.edges_added = 0
+        self.refreshes = 0
+        self.errors = 0
+
+    async def start(self):
+        """Start the periodic refresh (a no-op when refresh_seconds is 0)"""
+        if self.refresh_seconds > 0 and (self._task is None or self._task.done()):
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def add_transaction(self, tx: Dict[str, Any]):
+        """Record one processed transaction's sender -> receiver edge"""
+        sender = tx.get("sender", "")
+        receiver = tx.get("receiver", "")
+        if sender and receiver:
+            self._pending_senders.append(self._intern(sender))
+            self._pending_receivers.append(self._intern(receiver))
+            self.edges_added += 1
+
+    def add_transactions(self, transactions: Iterable[Dict[str, Any]]):
+        for tx in transactions:
+            self.add_transaction(tx)
+
+    def add_batch(self, batch: TransactionBatch):
+        """Record a columnar batch: its address table is interned once, edges are remapped with NumPy"""
+        if not len(batch):
+            return
+        global_ids = np.array([self._intern(address) for address in batch.addresses] + [-1], dtype=np.int32)
+        # Batch id -1 (no address) indexes the trailing -1
+        senders = global_ids[batch.senders]
+        receivers = global_ids[batch.receivers]
+        keep = (senders >= 0) & (receivers >= 0)
+        self._pending_senders.extend(senders[keep].tolist())
+        self._pending_receivers.extend(receivers[keep].tolist())
+        self.edges_added += int(keep.sum())
+
+    def lookup(self, address: str) -> Optional[Tuple[int, float]]:
+        """(distinct counterparties including the address, reputation 0-100), or None if not indexed yet"""
+        node = self._ids.get(address)
+        if node is None or node >= len(self._reputation):
+            return None
+        return int(self._counterparty_counts[node]), float(self._reputation[node])
+
+    async def refresh(self):
+        """Fold pending edges into the CSR and recompute counts and reputation off the event loop"""
+        if self._refreshing:
+            return
+        self._refreshing = True
+        try:
+            # Swap the pending buffers out first; edges recorded meanwhile wait for the next pass
+            senders, receivers = self._pending_senders, self._pending_receivers
+            self._pending_senders, self._pending_receivers = array("i"), array("i")
+            node_count = len(self._addresses)
+            start = time.perf_counter()
+            loop = asyncio.get_running_loop()
+            indptr, indices, counts, reputation, iterations = await loop.run_in_executor(
+                None, self._rebuild, self._indptr, self._indices, senders, receivers, node_count
+            )
+            self._indptr, self._indices = indptr, indices
+            self._counterparty_counts, self._reputation = counts, reputation
+            self.last_refresh = datetime.now()
+            self.last_refresh_seconds = time.perf_counter() - start
+            self.last_iterations = iterations
+            self.refreshes += 1
+        finally:
+            self._refreshing = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "nodes": len(self._addresses),
+            "indexed_nodes": len(self._reputation),
+            "edges": len(self._indices),
+            "pending_edges": len(self._pending_senders),
+            "edges_added": self.edges_added,
+            "refreshes": self.refreshes,
+            "last_refresh": self.last_refresh.isoformat() if self.last_refresh else None,
+            "last_refresh_seconds": round(self.last_refresh_seconds, 4),
+            "last_iterations": self.last_iterations,
+            "errors": self.errors
+        }
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.refresh_seconds)
+            try:
+                await self.refresh()
+            except Exception as e:
+                self.errors += 1
+                print(f"Counterparty graph refresh error: {e}")
+
+    def _intern(self, address: str) -> int:
+        node = self._ids.get(address)
+        if node is None:
+            node = len(self._addresses)
+            self._ids[address] = node
+            self._addresses.append(address)
+        return node
+
+    def _rebuild(self, indptr: np.ndarray, indices: np.ndarray, pending_senders: array,
+                 pending_receivers: array, node_count: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, int]:
+        # Existing edges back to (src, dst) pairs, plus the pending ones, deduplicated
+        old_senders = np.repeat(np.arange(len(indptr) - 1, dtype=np.int64), np.diff(indptr))
+        senders = np.concatenate((old_senders, np.frombuffer(pending_senders, dtype=np.int32)))
+        receivers = np.concatenate((indices, np.frombuffer(pending_receivers, dtype=np.int32))).astype(np.int64)
+        keys = _sorted_unique(senders * node_count + receivers)
+        senders = keys // node_count
+        receivers = keys % node_count
+
+        # The keys are sorted by sender, so this is already CSR order
+        out_degree = np.bincount(senders, minlength=node_count)
+        new_indptr = np.zeros(node_count + 1, dtype=np.int64)
+        np.cumsum(out_degree, out=new_indptr[1:])
+        new_indices = receivers.astype(np.int32)
+
+        counts = self._counterparty_counts_from(senders, receivers, node_count)
+        rank, iterations = self._pagerank(senders, receivers, out_degree, node_count)
+        return new_indptr, new_indices, counts, self._percentile_scores(rank), iterations
+
+    def _counterparty_counts_from(self, senders: np.ndarray, receivers: np.ndarray, node_count: int) -> np.ndarray:
+        """Distinct neighbours in either direction, plus the address itself"""
+        links = senders != receivers
+        if node_count == 0:
+            return np.empty(0, dtype=np.int64)
+        pairs = _sorted_unique(np.concatenate((
+            senders[links] * node_count + receivers[links],
+            receivers[links] * node_count + senders[links]
+        )))
+        return np.bincount(pairs // node_count, minlength=node_count) + 1
+
+    def _pagerank(self, senders: np.ndarray, receivers: np.ndarray, out_degree: np.ndarray,
+                  node_count: int) -> Tuple[np.ndarray, int]:
+        """Power iteration; rank held by addresses that never pay anyone is spread evenly"""
+        if node_count == 0:
+            return np.empty(0, dtype=np.float64), 0
+        rank = np.full(node_count, 1.0 / node_count)
+        dangling = out_degree == 0
+        inverse_degree = np.where(dangling, 0.0, 1.0 / np.maximum(out_degree, 1))
+        iterations = 0
+        for iterations in range(1, self.max_iterations + 1):
+            share = (rank * inverse_degree)[senders]
+            spread = (1.0 - self.damping + self.damping * rank[dangling].sum()) / node_count
+            new_rank = spread + self.damping * np.bincount(receivers, weights=share, minlength=node_count)
+            converged = np.abs(new_rank - rank).sum() < self.tolerance
+            rank = new_rank
+            if converged:
+                break
+        return rank, iterations
+
+    def _percentile_scores(self, rank: np.ndarray) -> np.ndarray:
+        """Rank percentile on a 0-100 scale (ties share their midpoint, so the median is 50)"""
+        if not len(rank):
+            return np.empty(0, dtype=np.float64)
+        ordered = np.sort(rank)
+        below = np.searchsorted(ordered, rank, side="left")
+        through = np.searchsorted(ordered, rank, side="right")
+        return 100.0 * (below + through) / (2 * len(rank))
@@ -0,0 +1,164 @@
+"""
+Feature Store
+Persisted per-address scoring state (SQLite, WAL) for incremental credit scores
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Any, Optional
+
+from ai.accumulator import TransactionAccumulator
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS address_features (
+    network TEXT NOT NULL,
+    address TEXT NOT NULL,
+    last_round INTEGER NOT NULL,
+    account TEXT NOT NULL,
+    features TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (network, address)
+);
+CREATE TABLE IF NOT EXISTS address_counterparties (
+    network TEXT NOT NULL,
+    address TEXT NOT NULL,
+    counterparty TEXT NOT NULL,
+    PRIMARY KEY (network, address, counterparty)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS feature_checkpoints (
+    network TEXT PRIMARY KEY,
+    synced_round INTEGER NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+class AddressState:
+    """Everything needed to rescore an address: its account record and accumulated features"""
+
+    def __init__(self, address: str, last_round: int, account_data: Dict[str, Any],
+                 features: TransactionAccumulator):
+        self.address = address
+        self.last_round = last_round
+        self.account_data = account_data
+        self.features = features
+
+class FeatureStore:
+    """
+    One row of features per address. Distinct counterparties live in their own
+    table, one row each, so an update only inserts the counterparties it adds and
+    the features row carries just their count; loading a state never reads them.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        # Same threading model as TransactionStore: one locked connection per process
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    async def get(self, network: str, address: str) -> Optional[AddressState]:
+        return await asyncio.to_thread(self._get, network, address)
+
+    async def put(self, network: str, state: AddressState):
+        """Persist a state; its new counterparties move into the store (and into its stored count)"""
+        await asyncio.to_thread(self._put, network, state)
+
+    async def watched_addresses(self, network: str) -> Dict[str, int]:
+        """Every stored address with the round its state is current to"""
+        return await asyncio.to_thread(self._watched_addresses, network)
+
+    async def read_states(self, network: str, after: str = "", limit: int = 500) -> List[AddressState]:
+        """Stored states in address order, starting after the given address (for bulk rescoring)"""
+        return await asyncio.to_thread(self._read_states, network, after, limit)
+
+    async def get_checkpoint(self, network: str) -> Optional[int]:
+        """Round through which every stored address on the network is current"""
+        return await asyncio.to_thread(self._get_checkpoint, network)
+
+    async def set_checkpoint(self, network: str, synced_round: int):
+        await asyncio.to_thread(self._set_checkpoint, network, synced_round)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            addresses = self._conn.execute("SELECT COUNT(*) FROM address_features").fetchone()[0]
+        return {"path": self.path, "addresses": addresses}
+
+    def _get(self, network: str, address: str) -> Optional[AddressState]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT address, last_round, account, features FROM address_features "
+                "WHERE network = ? AND address = ?",
+                (network, address)
+            ).fetchone()
+        return self._to_state(row) if row else None
+
+    def _put(self, network: str, state: AddressState):
+        features = state.features
+        with self._lock, self._conn:
+            if features.counterparties:
+                changes = self._conn.total_changes
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO address_counterparties (network, address, counterparty) VALUES (?, ?, ?)",
+                    ((network, state.address, counterparty) for counterparty in features.counterparties)
+                )
+                features.stored_counterparties += self._conn.total_changes - changes
+                features.counterparties.clear()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO address_features "
+                "(network, address, last_round, account, features, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (network, state.address, state.last_round,
+                 json.dumps(state.account_data, separators=(",", ":")),
+                 json.dumps(features.to_dict(), separators=(",", ":")),
+                 time.time())
+            )
+
+    def _get_checkpoint(self, network: str) -> Optional[int]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT synced_round FROM feature_checkpoints WHERE network = ?", (network,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def _set_checkpoint(self, network: str, synced_round: int):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO feature_checkpoints (network, synced_round, updated_at) VALUES (?, ?, ?)",
+                (network, synced_round, time.time())
+            )
+
+    def _watched_addresses(self, network: str) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT address, last_round FROM address_features WHERE network = ?", (network,)
+            ).fetchall()
+        return dict(rows)
+
+    def _read_states(self, network: str, after: str, limit: int) -> List[AddressState]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT address, last_round, account, features FROM address_features "
+                "WHERE network = ? AND address > ? ORDER BY address LIMIT ?",
+                (network, after, limit)
+            ).fetchall()
+        return [self._to_state(row) for row in rows]
+
+    def _to_state(self, row) -> AddressState:
+        address, last_round, account, features = row
+        return AddressState(address, last_round, json.loads(account),
+                            TransactionAccumulator.from_dict(json.loads(features)))
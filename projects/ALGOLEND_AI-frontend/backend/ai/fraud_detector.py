@@ -0,0 +1,297 @@
+"""
+Fraud Detector
+Streams new blocks through fixed-size per-address windows and flags bursts,
+volume spikes and round-trip (wash-trading style) transfers as they happen
+"""
+
+import asyncio
+from collections import defaultdict, deque
+from datetime import datetime
+from typing import Dict, List, Any, Deque, Iterable, Optional, Tuple
+
+import numpy as np
+
+from algorand.client import AlgorandClient
+
+ALERT_TYPES = ("burst", "volume_spike", "round_trips")
+
+class FraudDetector:
+    """
+    Every watched address owns one slot in preallocated (max_addresses x window)
+    ring buffers holding the round, amount, counterparty hash and direction of its
+    latest transactions, plus a few running baselines. Nothing grows with traffic:
+    old transactions are overwritten, counterparties are stored as hashes and the
+    alert log is bounded.
+
+    - burst: at least burst_min_transactions in the last burst_rounds rounds, and
+      burst_factor times the address's usual rate
+    - volume_spike: a round's volume at least spike_factor times the address's
+      usual volume per active round (and at least spike_min_algo)
+    - round_trips: cycle_min_round_trips transfers within cycle_rounds that send
+      back (within amount_tolerance) what the same counterparty sent, or vice versa
+    """
+
+    def __init__(self, client: AlgorandClient, max_addresses: int = 4096, window: int = 128,
+                 burst_rounds: int = 10, burst_min_transactions: int = 20, burst_factor: float = 5.0,
+                 spike_factor: float = 10.0, spike_min_algo: float = 1000.0, spike_min_history: int = 5,
+                 cycle_rounds: int = 100, cycle_min_round_trips: int = 3, amount_tolerance: float = 0.02,
+                 rate_decay: float = 0.98, cooldown_rounds: int = 50, max_alerts: int = 1000,
+                 round_retries: int = 5, retry_seconds: float = 1.0, max_catchup_rounds: int = 10):
+        self.client = client
+        self.max_addresses = max_addresses
+        self.window = window
+        self.burst_rounds = burst_rounds
+        self.burst_min_transactions = burst_min_transactions
+        self.burst_factor = burst_factor
+        self.spike_factor = spike_factor
+        self.spike_min_algo = spike_min_algo
+        self.spike_min_history = spike_min_history
+        self.cycle_rounds = cycle_rounds
+        self.cycle_min_round_trips = cycle_min_round_trips
+        self.amount_tolerance = amount_tolerance
+        self.rate_decay = rate_decay
+        self.cooldown_rounds = cooldown_rounds
+        self.round_retries = round_retries
+        self.retry_seconds = retry_seconds
+        self.max_catchup_rounds = max(1, max_catchup_rounds)
+
+        # Ring buffers, one row per slot
+        self._rounds = np.zeros((max_addresses, window), dtype=np.int64)
+        self._amounts = np.zeros((max_addresses, window), dtype=np.int64)
+        self._counterparties = np.zeros((max_addresses, window), dtype=np.int64)
+        self._directions = np.zeros((max_addresses, window), dtype=np.int8)
+        self._round_trips = np.zeros((max_addresses, window), dtype=np.int8)
+        self._heads = np.zeros(max_addresses, dtype=np.int64)
+        self._sizes = np.zeros(max_addresses, dtype=np.int64)
+
+        # Running baselines per slot
+        self._last_rounds = np.zeros(max_addresses, dtype=np.int64)
+        self._rates = np.zeros(max_addresses, dtype=np.float64)
+        self._volumes = np.zeros(max_addresses, dtype=np.float64)
+        self._active_rounds = np.zeros(max_addresses, dtype=np.int64)
+        self._last_alerts = np.full((max_addresses, len(ALERT_TYPES)), -(1 << 62), dtype=np.int64)
+
+        self._slots: Dict[str, int] = {}
+        self._slot_addresses: List[Optional[str]] = [None] * max_addresses
+        self._free_slots = list(range(max_addresses - 1, -1, -1))
+        self.alerts: Deque[Dict[str, Any]] = deque(maxlen=max_alerts)
+
+        # Block listener calls only record the latest round; the backlog is replayed as a
+        # range of at most max_catchup_rounds, older rounds are skipped
+        self._latest_round = 0
+        self._next_round = 0
+        self._round_event = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+        # Counters
+        self.rounds_processed = 0
+        self.rounds_idle = 0
+        self.rounds_skipped = 0
+        self.transactions_seen = 0
+        self.transactions_matched = 0
+        self.alert_counts = {alert_type: 0 for alert_type in ALERT_TYPES}
+        self.errors = 0
+
+    async def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def on_block(self, round_number: int):
+        """BlockFollower listener"""
+        if round_number > self._latest_round:
+            self._latest_round = round_number
+            self._round_event.set()
+
+    def watch(self, addresses: Iterable[str]) -> Dict[str, Optional[str]]:
+        """Start monitoring addresses; returns address -> error (None when watched)"""
+        results: Dict[str, Optional[str]] = {}
+        for address in addresses:
+            if address in self._slots:
+                results[address] = None
+            elif not self._free_slots:
+                results[address] = "fraud detector is at capacity"
+            else:
+                slot = self._free_slots.pop()
+                self._reset_slot(slot)
+                self._slots[address] = slot
+                self._slot_addresses[slot] = address
+                results[address] = None
+        return results
+
+    def unwatch(self, addresses: Iterable[str]):
+        for address in addresses:
+            slot = self._slots.pop(address, None)
+            if slot is not None:
+                self._slot_addresses[slot] = None
+                self._free_slots.append(slot)
+
+    def get_alerts(self, address: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """Most recent alerts first, optionally for one address"""
+        alerts = [alert for alert in reversed(self.alerts) if address is None or alert["address"] == address]
+        return alerts[:limit]
+
+    def stats(self) -> Dict[str, Any]:
+        buffers = (self._rounds, self._amounts, self._counterparties, self._directions, self._round_trips)
+        return {
+            "watched": len(self._slots),
+            "max_addresses": self.max_addresses,
+            "window": self.window,
+            "buffer_bytes": sum(buffer.nbytes for buffer in buffers),
+            "pending_rounds": max(self._latest_round - self._next_round + 1, 0) if self._next_round else 0,
+            "rounds_processed": self.rounds_processed,
+            "rounds_idle": self.rounds_idle,
+            "rounds_skipped": self.rounds_skipped,
+            "transactions_seen": self.transactions_seen,
+            "transactions_matched": self.transactions_matched,
+            "alerts": dict(self.alert_counts),
+            "errors": self.errors
+        }
+
+    def process_round(self, round_number: int, transactions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Feed one round's processed transactions through the windows; returns new alerts"""
+        touched: Dict[int, List[Tuple[int, int, int]]] = defaultdict(list)
+        slots = self._slots
+        for tx in transactions:
+            sender = tx.get("sender", "")
+            receiver = tx.get("receiver", "")
+            amount = tx.get("amount", 0)
+            slot = slots.get(sender)
+            if slot is not None:
+                touched[slot].append((amount, hash(receiver), -1))
+            if receiver != sender:
+                slot = slots.get(receiver)
+                if slot is not None:
+                    touched[slot].append((amount, hash(sender), 1))
+        self.transactions_seen += len(transactions)
+        self.rounds_processed += 1
+
+        alerts = []
+        for slot, entries in touched.items():
+            self.transactions_matched += len(entries)
+            alerts.extend(self._update_slot(self._slot_addresses[slot], slot, round_number, entries))
+        return alerts
+
+    async def _run(self):
+        while True:
+            await self._round_event.wait()
+            self._round_event.clear()
+            latest = self._latest_round
+            first = self._next_round or latest
+            if not self._slots:
+                # Nothing is watched, so the rounds are not worth an indexer scan
+                self.rounds_idle += latest - first + 1
+                self._next_round = latest + 1
+                continue
+            if latest - first + 1 > self.max_catchup_rounds:
+                self.rounds_skipped += latest - first + 1 - self.max_catchup_rounds
+                first = latest - self.max_catchup_rounds + 1
+            for round_number in range(first, latest + 1):
+                try:
+                    transactions = await self._fetch_round(round_number)
+                    self.process_round(round_number, transactions)
+                except Exception as e:
+                    self.errors += 1
+                    print(f"Fraud detector error at round {round_number}: {e}")
+                self._next_round = round_number + 1
+
+    async def _fetch_round(self, round_number: int) -> List[Dict[str, Any]]:
+        # The score maintainer reads the same round; the client coalesces the two requests
+        for attempt in range(self.round_retries):
+            transactions = await self.client.get_round_transactions(round_number)
+            if transactions is not None:
+                return transactions
+            await asyncio.sleep(self.retry_seconds)
+        raise RuntimeError(f"indexer has not reached round {round_number}")
+
+    def _update_slot(self, address: str, slot: int, round_number: int,
+                     entries: List[Tuple[int, int, int]]) -> List[Dict[str, Any]]:
+        rounds = self._rounds[slot]
+        amounts = self._amounts[slot]
+        counterparties = self._counterparties[slot]
+        directions = self._directions[slot]
+        round_trips = self._round_trips[slot]
+
+        # A transfer closes a round trip when the same counterparty moved a matching
+        # amount the other way within cycle_rounds
+        cycle_start = round_number - self.cycle_rounds
+        for amount, counterparty, direction in entries:
+            size = self._sizes[slot]
+            tolerance = self.amount_tolerance * max(amount, 1)
+            closes = bool(size) and bool(np.any(
+                (counterparties[:size] == counterparty) & (directions[:size] == -direction) &
+                (rounds[:size] >= cycle_start) & (np.abs(amounts[:size] - amount) <= tolerance)
+            ))
+            head = self._heads[slot]
+            rounds[head] = round_number
+            amounts[head] = amount
+            counterparties[head] = counterparty
+            directions[head] = direction
+            round_trips[head] = closes
+            self._heads[slot] = (head + 1) % self.window
+            self._sizes[slot] = min(size + 1, self.window)
+
+        size = self._sizes[slot]
+        count = len(entries)
+        volume_algo = sum(amount for amount, _, _ in entries) / 1_000_000
+        alerts = []
+
+        recent = int(np.count_nonzero(rounds[:size] > round_number - self.burst_rounds))
+        expected = self._rates[slot] * self.burst_rounds
+        if recent >= self.burst_min_transactions and recent >= self.burst_factor * expected:
+            alerts.append(("burst", {"transactions": recent, "rounds": self.burst_rounds,
+                                     "expected": round(float(expected), 2)}))
+
+        usual_volume = self._volumes[slot]
+        if (self._active_rounds[slot] >= self.spike_min_history and volume_algo >= self.spike_min_algo
+                and volume_algo >= self.spike_factor * usual_volume):
+            alerts.append(("volume_spike", {"volume_algo": round(volume_algo, 6),
+                                            "usual_volume_algo": round(float(usual_volume), 6)}))
+
+        trips = int(np.count_nonzero(round_trips[:size] & (rounds[:size] >= cycle_start)))
+        if trips >= self.cycle_min_round_trips:
+            alerts.append(("round_trips", {"round_trips": trips, "rounds": self.cycle_rounds}))
+
+        # Baselines include this round only after it was compared against them
+        elapsed = max(round_number - self._last_rounds[slot], 1) if self._last_rounds[slot] else 1
+        self._rates[slot] = self._rates[slot] * self.rate_decay ** elapsed + (1 - self.rate_decay) * count
+        active = self._active_rounds[slot]
+        self._volumes[slot] = volume_algo if not active else (
+            self._volumes[slot] * self.rate_decay + (1 - self.rate_decay) * volume_algo
+        )
+        self._active_rounds[slot] = active + 1
+        self._last_rounds[slot] = round_number
+
+        return [self._raise(address, slot, round_number, alert_type, detail) for alert_type, detail in alerts
+                if round_number - self._last_alerts[slot, ALERT_TYPES.index(alert_type)] >= self.cooldown_rounds]
+
+    def _raise(self, address: str, slot: int, round_number: int, alert_type: str,
+               detail: Dict[str, Any]) -> Dict[str, Any]:
+        self._last_alerts[slot, ALERT_TYPES.index(alert_type)] = round_number
+        self.alert_counts[alert_type] += 1
+        alert = {
+            "address": address,
+            "type": alert_type,
+            "round": round_number,
+            "detail": detail,
+            "timestamp": datetime.now().isoformat()
+        }
+        self.alerts.append(alert)
+        return alert
+
+    def _reset_slot(self, slot: int):
+        self._heads[slot] = 0
+        self._sizes[slot] = 0
+        self._last_rounds[slot] = 0
+        self._rates[slot] = 0.0
+        self._volumes[slot] = 0.0
+        self._active_rounds[slot] = 0
+        self._last_alerts[slot] = -(1 << 62)
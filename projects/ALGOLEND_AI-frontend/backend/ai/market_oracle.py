@@ -42,18 +42,24 @@ class MarketOracle:
     
     async def analyze_pool(self, pool_data: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Analyze a lending pool and provide AI recommendations
+        Analyze a lending pool and provide AI recommendations. Live pools (from the
+        pool catalog) carry total_borrowed and interest_rate from the contract's
+        global state; those replace the modelled utilization and APY, and utilization
+        stands in for the loan count.
         """
         try:
-            # Simulate AI analysis delay
-            await asyncio.sleep(0.5)
-            
             # Calculate risk score based on pool metrics
             tvl = pool_data.get("total_value_locked", 0)
             active_loans = pool_data.get("active_loans", 0)
             default_rate = pool_data.get("default_rate", 0)
             avg_loan_size = pool_data.get("average_loan_size", 0)
             
+            # Calculate utilization rate
+            if "total_borrowed" in pool_data:
+                utilization_rate = min(pool_data["total_borrowed"] / tvl, 1.0) if tvl > 0 else 0
+            else:
+                utilization_rate = min(active_loans * avg_loan_size / tvl, 1.0) if tvl > 0 else 0
+            
             # Risk scoring algorithm
             risk_score = 0
             
@@ -78,7 +84,14 @@ class MarketOracle:
                 risk_score += 10
             
             # Activity factor (more active loans = higher risk but more opportunity)
-            if active_loans > 50:
+            if "active_loans" not in pool_data and "total_borrowed" in pool_data:
+                if utilization_rate > 0.9:
+                    risk_score += 10
+                elif utilization_rate > 0.7:
+                    risk_score += 15
+                else:
+                    risk_score += 20
+            elif active_loans > 50:
                 risk_score += 15
             elif active_loans > 20:
                 risk_score += 20
@@ -91,10 +104,7 @@ class MarketOracle:
             base_apy = 8.0
             risk_premium = (100 - risk_score) * 0.1
             market_premium = self.market_data["fear_greed_index"] * 0.05
-            apy = base_apy + risk_premium + market_premium
-            
-            # Calculate utilization rate
-            utilization_rate = min(active_loans * avg_loan_size / tvl, 1.0) if tvl > 0 else 0
+            apy = pool_data.get("interest_rate", base_apy + risk_premium + market_premium)
             
             # Generate AI recommendation
             if risk_score >= 80:
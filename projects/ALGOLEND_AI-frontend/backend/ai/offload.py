@@ -0,0 +1,110 @@
+"""
+Process Offload
+Runs CPU-heavy analysis in a process pool so it does not block the event loop
+"""
+
+import asyncio
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, Callable, Deque, Optional, Tuple
+
+def _warm_up() -> None:
+    """No-op task that forces a worker process to start"""
+
+class ProcessOffload:
+    def __init__(self, workers: int, threshold: int, sample_size: int = 500):
+        self.workers = workers
+        self.threshold = threshold
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._execution_seconds: Deque[float] = deque(maxlen=sample_size)
+        self._wait_seconds: Deque[float] = deque(maxlen=sample_size)
+
+        # Counters
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.restarts = 0
+
+    async def start(self):
+        """Spawn the worker processes up front so the first large analysis does not pay for it"""
+        if self.workers <= 0:
+            return
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        await asyncio.gather(*[loop.run_in_executor(executor, _warm_up) for _ in range(self.workers)])
+
+    def should_offload(self, size: int) -> bool:
+        """Only work above the size threshold is worth the hand-off to another process"""
+        return self.workers > 0 and size >= self.threshold
+
+    async def run(self, fn: Callable[..., Tuple[Any, float]], *args) -> Any:
+        """
+        Run fn(*args) in a worker process. fn must be a module-level function that
+        returns (result, execution_seconds); arguments should already be compact.
+        """
+        self.submitted += 1
+        self.queue_depth += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        start = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            result, execution_seconds = await loop.run_in_executor(self._get_executor(), fn, *args)
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory); start a fresh pool next time
+            self.failed += 1
+            self.restarts += 1
+            self._executor = None
+            raise
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.queue_depth -= 1
+
+        self.completed += 1
+        self._execution_seconds.append(execution_seconds)
+        self._wait_seconds.append(max(0.0, time.perf_counter() - start - execution_seconds))
+        return result
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, throughput and execution/queue-wait latency"""
+        return {
+            "workers": self.workers,
+            "threshold": self.threshold,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "restarts": self.restarts,
+            "execution_ms": self._summarize(self._execution_seconds),
+            "queue_wait_ms": self._summarize(self._wait_seconds)
+        }
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn rather than fork: the parent runs an event loop and threads
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def _summarize(self, samples: Deque[float]) -> Optional[Dict[str, float]]:
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        return {
+            "avg": round(sum(ordered) / len(ordered) * 1000, 2),
+            "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 2),
+            "max": round(ordered[-1] * 1000, 2)
+        }
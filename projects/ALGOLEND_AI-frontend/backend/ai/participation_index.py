@@ -0,0 +1,163 @@
+"""
+Participation Index
+Known lending, DEX and governance application and asset IDs, matched against account holdings
+"""
+
+import asyncio
+import json
+import os
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+
+DEFAULT_INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "participation_index.json")
+
+CATEGORIES = ("lending", "dex", "governance")
+
+class ParticipationSnapshot:
+    """
+    One network's index compiled to two hash maps (application id and asset id ->
+    bitmask of categories). Snapshots are never mutated; a reload builds a new one.
+    """
+
+    def __init__(self, definition: Dict[str, Any], network: str):
+        self.version = str(definition.get("version") or "")
+        if not self.version:
+            raise ValueError("participation index has no version")
+
+        categories = definition.get("networks", {}).get(network, {})
+        unknown = [name for name in categories if name not in CATEGORIES]
+        if unknown:
+            raise ValueError(f"unknown participation categories {', '.join(unknown)}")
+
+        self.apps: Dict[int, int] = {}
+        self.assets: Dict[int, int] = {}
+        for bit, name in enumerate(CATEGORIES):
+            spec = categories.get(name, {})
+            for app_id in spec.get("apps", []):
+                self.apps[int(app_id)] = self.apps.get(int(app_id), 0) | 1 << bit
+            for asset_id in spec.get("assets", []):
+                self.assets[int(asset_id)] = self.assets.get(int(asset_id), 0) | 1 << bit
+
+    def match(self, account_data: Dict[str, Any]) -> Dict[str, int]:
+        """
+        Count an account's known applications (opted in or created) and known assets
+        with a non-zero balance, per category, in one pass over each holdings list
+        """
+        app_counts = [0] * len(CATEGORIES)
+        asset_counts = [0] * len(CATEGORIES)
+        apps = self.apps
+        assets = self.assets
+
+        seen_apps = set()
+        for app in account_data.get("apps-local-state", []):
+            app_id = app.get("id")
+            if app_id in apps and app_id not in seen_apps:
+                seen_apps.add(app_id)
+                self._count(apps[app_id], app_counts)
+        for app in account_data.get("created-apps", []):
+            app_id = app.get("id")
+            if app_id in apps and app_id not in seen_apps:
+                seen_apps.add(app_id)
+                self._count(apps[app_id], app_counts)
+        for holding in account_data.get("assets", []):
+            asset_id = holding.get("asset-id")
+            if asset_id in assets and holding.get("amount", 0) > 0:
+                self._count(assets[asset_id], asset_counts)
+
+        counts = {f"{name}_apps": app_counts[bit] for bit, name in enumerate(CATEGORIES)}
+        counts.update({f"{name}_assets": asset_counts[bit] for bit, name in enumerate(CATEGORIES)})
+        return counts
+
+    @staticmethod
+    def _count(mask: int, counts: List[int]):
+        bit = 0
+        while mask:
+            if mask & 1:
+                counts[bit] += 1
+            mask >>= 1
+            bit += 1
+
+class ParticipationIndex:
+    """
+    Loads the index file for one network and re-reads it in the background when it
+    changes. Parsing happens in a worker thread; scoring keeps using the previous
+    snapshot until the new one replaces it.
+    """
+
+    def __init__(self, network: str, path: Optional[str] = None, poll_seconds: float = 60.0):
+        self.network = network
+        self.path = path or DEFAULT_INDEX_PATH
+        self.poll_seconds = poll_seconds
+        self.snapshot = self._load(self.path, network)
+        self._mtime = os.path.getmtime(self.path)
+        self.loaded_at = datetime.now()
+        self._task: Optional[asyncio.Task] = None
+        self.reloads = 0
+        self.errors = 0
+
+    async def start(self):
+        """Start watching the index file (a no-op when poll_seconds is 0)"""
+        if self.poll_seconds > 0 and (self._task is None or self._task.done()):
+            self._task = asyncio.ensure_future(self._watch())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def match(self, account_data: Dict[str, Any]) -> Dict[str, int]:
+        return self.snapshot.match(account_data)
+
+    async def reload(self, force: bool = False) -> bool:
+        """
+        Reload the index file if it changed (or unconditionally with force). A file
+        that fails to load is reported and the current snapshot stays in place.
+        """
+        try:
+            mtime = os.path.getmtime(self.path)
+            if not force and mtime == self._mtime:
+                return False
+            loop = asyncio.get_running_loop()
+            snapshot = await loop.run_in_executor(None, self._load, self.path, self.network)
+        except (OSError, ValueError) as e:
+            self.errors += 1
+            print(f"Error loading participation index: {e}")
+            return False
+        self._mtime = mtime
+        self.snapshot = snapshot
+        self.loaded_at = datetime.now()
+        self.reloads += 1
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "network": self.network,
+            "version": self.snapshot.version,
+            "path": self.path,
+            "loaded_at": self.loaded_at.isoformat(),
+            "apps": len(self.snapshot.apps),
+            "assets": len(self.snapshot.assets),
+            "reloads": self.reloads,
+            "errors": self.errors
+        }
+
+    async def _watch(self):
+        while True:
+            await asyncio.sleep(self.poll_seconds)
+            await self.reload()
+
+    @staticmethod
+    def _load(path: str, network: str) -> ParticipationSnapshot:
+        with open(path) as f:
+            try:
+                definition = json.load(f)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"participation index {path} is not valid JSON: {e}")
+        try:
+            return ParticipationSnapshot(definition, network)
+        except (AttributeError, TypeError) as e:
+            raise ValueError(f"participation index {path} is malformed: {e}")
@@ -0,0 +1,181 @@
+"""
+Pool Catalog
+Live lending pool catalog read from LendingPool application global state,
+published as immutable snapshots refreshed once per round
+"""
+
+import asyncio
+from datetime import datetime
+from typing import Dict, Any, Iterable, Optional, Tuple
+
+from algorand.client import AlgorandClient
+from algorand.codec import decode_state
+
+MICROALGOS_PER_ALGO = 1_000_000
+
+class PoolSnapshot:
+    """
+    Every configured LendingPool at one version: pools holds the optimizer's pool
+    dicts in app id order, states the raw global state they were derived from.
+    Snapshots are never mutated (pools is a tuple and callers must treat its dicts
+    as read-only); a refresh that reads different state publishes a new one, so
+    the pools tuple can be cached by identity.
+    """
+
+    def __init__(self, version: int, round_number: int, states: Dict[int, Tuple[int, int, int]],
+                 pools: Tuple[Dict[str, Any], ...]):
+        self.version = version
+        self.round = round_number
+        self.states = states
+        self.pools = pools
+        self._by_id = {pool["id"]: pool for pool in pools}
+
+    def __len__(self) -> int:
+        return len(self.pools)
+
+    def get(self, pool_id: str) -> Optional[Dict[str, Any]]:
+        return self._by_id.get(str(pool_id))
+
+class PoolCatalog:
+    """
+    Reads totalDeposits, totalBorrowed and interestRate (basis points) from each
+    app's global state with concurrent algod lookups, at most once per round: block
+    listener calls only mark the latest round, so a refresh that falls behind skips
+    straight to the newest one. An app that cannot be read keeps its last known
+    state. Depositors earn interestRate on their deposits, and what is lent out
+    cannot be withdrawn, so liquidity is 1 - utilization and the risk score grows
+    with utilization and with how far the pool is below reference_tvl_algo.
+    """
+
+    def __init__(self, client: AlgorandClient, app_ids: Iterable[int], concurrency: int = 16,
+                 min_deposit: float = 1.0, max_deposit: float = 1_000_000.0,
+                 reference_tvl_algo: float = 1_000_000.0):
+        self.client = client
+        self.app_ids = sorted({int(app_id) for app_id in app_ids})
+        self.concurrency = max(1, concurrency)
+        self.min_deposit = min_deposit
+        self.max_deposit = max_deposit
+        self.reference_tvl_algo = reference_tvl_algo
+
+        self.snapshot = PoolSnapshot(0, 0, {}, ())
+        self.refreshed_at: Optional[datetime] = None
+        self._checked_round = -1
+        self._latest_round = 0
+        self._round_event = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+        # Counters
+        self.refreshes = 0
+        self.skipped_rounds = 0
+        self.app_errors = 0
+        self.errors = 0
+
+    async def start(self):
+        """Read the catalog once, then again on every round the block follower reports"""
+        if self.app_ids and (self._task is None or self._task.done()):
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def on_block(self, round_number: int):
+        """BlockFollower listener"""
+        if round_number > self._latest_round:
+            self._latest_round = round_number
+            self._round_event.set()
+
+    @property
+    def pools(self) -> Tuple[Dict[str, Any], ...]:
+        return self.snapshot.pools
+
+    def get_pool(self, pool_id: str) -> Optional[Dict[str, Any]]:
+        return self.snapshot.get(pool_id)
+
+    async def refresh(self, round_number: int = 0) -> bool:
+        """
+        Read every app's global state and publish a new snapshot if any changed.
+        Returns whether a new snapshot was published.
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def read(app_id: int) -> Optional[Tuple[int, int, int]]:
+            async with semaphore:
+                data = await self.client.get_app_info(app_id, refresh=True)
+            if data is None:
+                return None
+            state = decode_state(data.get("params", {}).get("global-state", []))
+            return (int(state.get("totalDeposits", 0)), int(state.get("totalBorrowed", 0)),
+                    int(state.get("interestRate", 0)))
+
+        results = await asyncio.gather(*(read(app_id) for app_id in self.app_ids))
+        previous = self.snapshot
+        states: Dict[int, Tuple[int, int, int]] = {}
+        for app_id, state in zip(self.app_ids, results):
+            if state is None:
+                self.app_errors += 1
+                state = previous.states.get(app_id)
+            if state is not None:
+                states[app_id] = state
+
+        self._checked_round = max(self._checked_round, round_number)
+        self.refreshed_at = datetime.now()
+        self.refreshes += 1
+        if states == previous.states:
+            return False
+        pools = tuple(self._to_pool(app_id, *state) for app_id, state in states.items())
+        self.snapshot = PoolSnapshot(previous.version + 1, round_number, states, pools)
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "apps": len(self.app_ids),
+            "pools": len(self.snapshot),
+            "version": self.snapshot.version,
+            "snapshot_round": self.snapshot.round,
+            "checked_round": max(self._checked_round, 0),
+            "refreshed_at": self.refreshed_at.isoformat() if self.refreshed_at is not None else None,
+            "refreshes": self.refreshes,
+            "skipped_rounds": self.skipped_rounds,
+            "app_errors": self.app_errors,
+            "errors": self.errors
+        }
+
+    async def _run(self):
+        round_number = self._latest_round or self.client.cache.latest_round(self.client.current_network)
+        while True:
+            try:
+                await self.refresh(round_number)
+            except Exception as e:
+                self.errors += 1
+                print(f"Pool catalog error at round {round_number}: {e}")
+            await self._round_event.wait()
+            self._round_event.clear()
+            if self._checked_round > 0:
+                self.skipped_rounds += max(self._latest_round - self._checked_round - 1, 0)
+            round_number = self._latest_round
+
+    def _to_pool(self, app_id: int, total_deposits: int, total_borrowed: int,
+                 interest_rate: int) -> Dict[str, Any]:
+        tvl = total_deposits / MICROALGOS_PER_ALGO
+        utilization = min(total_borrowed / total_deposits, 1.0) if total_deposits > 0 else 0.0
+        shortfall = 1.0 - min(tvl / self.reference_tvl_algo, 1.0) if self.reference_tvl_algo > 0 else 0.0
+        return {
+            "id": str(app_id),
+            "app_id": app_id,
+            "name": f"LendingPool {app_id}",
+            "apy": interest_rate / 100,
+            "risk_score": round(min(10 + 60 * utilization + 20 * shortfall, 100.0), 1),
+            "tvl": tvl,
+            "total_borrowed": total_borrowed / MICROALGOS_PER_ALGO,
+            "utilization": round(utilization, 4),
+            "min_deposit": self.min_deposit,
+            "max_deposit": self.max_deposit,
+            "term_days": 0,
+            "liquidity": round(1.0 - utilization, 4)
+        }
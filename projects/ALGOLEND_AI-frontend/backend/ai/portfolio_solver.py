@@ -0,0 +1,245 @@
+"""
+Portfolio Solver
+Linear program for pool allocation: highest APY under a portfolio risk budget,
+per-pool deposit bounds and all-or-nothing minimum deposits
+"""
+
+import hashlib
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+EPSILON = 1e-9
+
+# Candidates partitioned out before sorting in a greedy fill
+TOP_POOLS = 64
+
+class PoolColumns:
+    """
+    A pool catalog as parallel NumPy arrays (one entry per pool, catalog order).
+    version fingerprints the pool ids, APYs and risk scores: the inputs an
+    efficient frontier depends on besides eligibility.
+    """
+
+    def __init__(self, pools: List[Dict[str, Any]]):
+        self.pools = pools
+        self.ids = [str(pool["id"]) for pool in pools]
+        self.apy = np.array([pool["apy"] for pool in pools], dtype=np.float64)
+        self.risk = np.array([pool["risk_score"] for pool in pools], dtype=np.float64)
+        self.min_deposit = np.array([pool.get("min_deposit", 0) for pool in pools], dtype=np.float64)
+        self.max_deposit = np.array([pool.get("max_deposit", np.inf) for pool in pools], dtype=np.float64)
+        self.term_days = np.array([pool.get("term_days", 0) for pool in pools], dtype=np.float64)
+        self.liquidity = np.array([pool.get("liquidity", 1.0) for pool in pools], dtype=np.float64)
+
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update("\0".join(self.ids).encode())
+        digest.update(self.apy.tobytes())
+        digest.update(self.risk.tobytes())
+        self.version = digest.hexdigest()
+
+    def __len__(self) -> int:
+        return len(self.pools)
+
+def _greedy(scores: np.ndarray, lower: np.ndarray, upper: np.ndarray,
+            order: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Every pool at its lower bound, then pools with a positive score filled to their
+    upper bound, best score first (or in the given order), until the weights sum to 1
+    """
+    weights = lower.copy()
+    room = max(1.0 - lower.sum(), 0.0)
+    capacity = np.where(scores > 0, upper - lower, 0.0)
+    if order is None:
+        # Only the best few pools are usually needed; sort those when they cover the room
+        if len(scores) > TOP_POOLS:
+            top = np.argpartition(-scores, TOP_POOLS - 1)[:TOP_POOLS]
+            if capacity[top].sum() >= room:
+                order = top[np.argsort(-scores[top], kind="stable")]
+        if order is None:
+            order = np.argsort(-scores, kind="stable")
+    capacity = capacity[order]
+    before = np.cumsum(capacity) - capacity
+    weights[order] += np.clip(room - before, 0.0, capacity)
+    return weights
+
+def solve_relaxation(returns: np.ndarray, risks: np.ndarray, lower: np.ndarray, upper: np.ndarray,
+                     max_risk: float) -> Tuple[np.ndarray, bool]:
+    """
+    max returns·w  subject to  sum(w) <= 1, (risks - max_risk)·w <= 0, lower <= w <= upper.
+
+    The risk row keeps the weighted average risk of whatever is invested within
+    max_risk, so money that cannot be placed within the budget stays uninvested.
+    With one coupling row besides the budget the LP is a fractional knapsack on the
+    Lagrangian returns - penalty * excess risk: the greedy fill is optimal for a
+    fixed penalty and its excess risk only falls as the penalty grows, so the penalty
+    is bisected and the fills on either side of zero excess are mixed to hit it. When
+    the lower bounds alone break the budget, the lowest-risk fill is returned with False.
+    """
+    excess = risks - max_risk
+    best = _greedy(returns, lower, upper)
+    if best @ excess <= EPSILON:
+        return best, True
+    safest = _greedy(np.where(excess <= 0, returns, 0.0), lower, upper, np.lexsort((-returns, excess)))
+    if safest @ excess > EPSILON:
+        return safest, False
+
+    # Past the largest break-even penalty no pool above the budget scores positive
+    over = excess > 0
+    low, low_weights = 0.0, best
+    high = float(np.max(returns[over] / excess[over])) * (1 + 1e-9) + EPSILON
+    for _ in range(64):
+        high_weights = _greedy(returns - high * excess, lower, upper)
+        if high_weights @ excess <= EPSILON:
+            break
+        low, low_weights = high, high_weights
+        high *= 2
+    else:
+        return safest, True
+
+    while high - low > 1e-10 * high:
+        penalty = (low + high) / 2
+        weights = _greedy(returns - penalty * excess, lower, upper)
+        if weights @ excess <= EPSILON:
+            high, high_weights = penalty, weights
+        else:
+            low, low_weights = penalty, weights
+
+    low_excess, high_excess = low_weights @ excess, high_weights @ excess
+    share = -high_excess / (low_excess - high_excess) if low_excess > high_excess else 0.0
+    share = min(max(share, 0.0), 1.0)
+    return share * low_weights + (1 - share) * high_weights, True
+
+def solve_allocation(returns: np.ndarray, risks: np.ndarray, upper: np.ndarray, minimum: np.ndarray,
+                     max_risk: float, node_limit: int = 32) -> Tuple[np.ndarray, bool]:
+    """
+    Weights (fractions of the investment, summing to at most 1) maximizing
+    returns·w with average risk <= max_risk and each pool at 0 or within
+    [minimum, upper]. Branch and bound on the relaxation: a pool it leaves below
+    its minimum is either excluded or forced up to the minimum. Relaxation vertices
+    have at most two fractional pools, so trees stay small; if node_limit runs out
+    first, pools below their minimum are dropped until none is left. A pool whose
+    minimum exceeds its upper bound can only get 0.
+    Returns (weights, risk_met).
+    """
+    if not len(returns):
+        return np.zeros(0), True
+    upper = np.where(minimum <= upper + EPSILON, upper, 0.0)
+
+    best, best_key = None, None
+    stack = [(np.zeros_like(upper), upper)]
+    nodes = 0
+    while stack and nodes < node_limit:
+        lower, node_upper = stack.pop()
+        if lower.sum() > 1.0 + EPSILON:
+            continue
+        nodes += 1
+        weights, risk_met = solve_relaxation(returns, risks, lower, node_upper, max_risk)
+        # A relaxation bounds its subtree; risk-feasible solutions beat infeasible ones
+        key = (risk_met, float(returns @ weights))
+        if best_key is not None and key <= best_key:
+            continue
+        short = np.flatnonzero((weights > EPSILON) & (weights < minimum - EPSILON))
+        if not len(short):
+            best, best_key = weights, key
+            continue
+        pool = short[np.argmax(weights[short])]
+        forced = lower.copy()
+        forced[pool] = minimum[pool]
+        excluded = node_upper.copy()
+        excluded[pool] = 0.0
+        stack.append((forced, node_upper))
+        stack.append((lower, excluded))
+    if best is not None:
+        return best, best_key[0]
+
+    while True:
+        weights, risk_met = solve_relaxation(returns, risks, np.zeros_like(upper), upper, max_risk)
+        short = (weights > EPSILON) & (weights < minimum - EPSILON)
+        if not short.any():
+            return weights, risk_met
+        upper[short] = 0.0
+
+class EfficientFrontier:
+    """
+    Highest fully invested return for every risk budget over one set of candidate
+    pools (weights capped by upper, no minimum deposits). The optimum is piecewise
+    linear in the budget; its vertices are the distinct greedy fills of the
+    Lagrangian returns - penalty * risks, found by splitting between neighbouring
+    vertices at the penalty where their Lagrangians cross until nothing new
+    appears. Between two vertices the optimum mixes them, so answering a budget is
+    a binary search and an interpolation.
+    """
+
+    def __init__(self, returns: np.ndarray, risks: np.ndarray, candidates: np.ndarray,
+                 upper: np.ndarray, size: int):
+        self.size = size
+        self.candidates = candidates
+        self._returns = returns
+        self._risks = risks
+        self._upper = upper
+
+        vertices: List[Tuple[float, float, np.ndarray, np.ndarray]] = []
+        if len(candidates) and upper.sum() >= 1.0 - EPSILON:
+            riskiest = self._vertex(np.lexsort((risks, -returns)))
+            safest = self._vertex(np.lexsort((-returns, risks)))
+            vertices.append(riskiest)
+            stack = []
+            if riskiest[1] - safest[1] > EPSILON:
+                vertices.append(safest)
+                stack.append((riskiest, safest))
+            while stack:
+                high, low = stack.pop()
+                if high[0] <= low[0] or high[1] - low[1] <= EPSILON:
+                    continue
+                penalty = (high[0] - low[0]) / (high[1] - low[1])
+                middle = self._vertex(None, returns - penalty * risks)
+                bound = high[0] - penalty * high[1]
+                if middle[0] - penalty * middle[1] <= bound + 1e-12 * (1 + abs(bound)):
+                    continue
+                vertices.append(middle)
+                stack.append((high, middle))
+                stack.append((middle, low))
+        vertices.sort(key=lambda vertex: vertex[1])
+
+        self.vertex_returns = np.array([vertex[0] for vertex in vertices], dtype=np.float64)
+        self.vertex_risks = np.array([vertex[1] for vertex in vertices], dtype=np.float64)
+        self._positions = [vertex[2] for vertex in vertices]
+        self._weights = [vertex[3] for vertex in vertices]
+
+    def __len__(self) -> int:
+        return len(self.vertex_risks)
+
+    def allocate(self, max_risk: float) -> Optional[np.ndarray]:
+        """Catalog-wide weights for a risk budget, or None when full investment cannot meet it"""
+        if not len(self) or max_risk < self.vertex_risks[0] - EPSILON:
+            return None
+        weights = np.zeros(self.size)
+        above = int(np.searchsorted(self.vertex_risks, max_risk, side="right"))
+        if above == len(self):
+            weights[self._positions[-1]] = self._weights[-1]
+            return weights
+        below = above - 1
+        share = (max_risk - self.vertex_risks[below]) / (self.vertex_risks[above] - self.vertex_risks[below])
+        np.add.at(weights, self._positions[below], (1 - share) * self._weights[below])
+        np.add.at(weights, self._positions[above], share * self._weights[above])
+        return weights
+
+    def _vertex(self, order: Optional[np.ndarray],
+                scores: Optional[np.ndarray] = None) -> Tuple[float, float, np.ndarray, np.ndarray]:
+        """Fill the candidates to 1 in order (or by score); (return, risk, catalog positions, weights)"""
+        upper = self._upper
+        if order is None:
+            if len(scores) > TOP_POOLS:
+                top = np.argpartition(-scores, TOP_POOLS - 1)[:TOP_POOLS]
+                if upper[top].sum() >= 1.0:
+                    order = top[np.argsort(-scores[top], kind="stable")]
+            if order is None:
+                order = np.argsort(-scores, kind="stable")
+        capacity = upper[order]
+        before = np.cumsum(capacity) - capacity
+        filled = np.clip(1.0 - before, 0.0, capacity)
+        used = filled > EPSILON
+        picked = order[used]
+        weights = filled[used]
+        return (float(self._returns[picked] @ weights), float(self._risks[picked] @ weights),
+                self.candidates[picked], weights)
@@ -0,0 +1,273 @@
+"""
+Rescoring Job
+Scores every account opted into the LendingPool application, page by page, with
+checkpoints so an interrupted run resumes where it stopped
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Any, Optional, Tuple
+
+from ai.risk_analyzer import RiskAnalyzer
+from algorand.client import AlgorandClient
+from algorand.tx_batch import TransactionBatch
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rescoring_jobs (
+    job_id TEXT PRIMARY KEY,
+    network TEXT NOT NULL,
+    app_id INTEGER NOT NULL,
+    next_token TEXT,
+    status TEXT NOT NULL,
+    accounts_scored INTEGER NOT NULL,
+    accounts_failed INTEGER NOT NULL DEFAULT 0,
+    transactions_scored INTEGER NOT NULL,
+    elapsed_seconds REAL NOT NULL,
+    started_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS rescoring_results (
+    job_id TEXT NOT NULL,
+    address TEXT NOT NULL,
+    credit_score INTEGER NOT NULL,
+    risk_level TEXT NOT NULL,
+    ai_confidence REAL NOT NULL,
+    total_transactions INTEGER NOT NULL,
+    balance_algo REAL NOT NULL,
+    user_deposits INTEGER NOT NULL,
+    user_borrowed INTEGER NOT NULL,
+    last_update_time INTEGER NOT NULL,
+    model_version TEXT NOT NULL,
+    risk_factors TEXT NOT NULL,
+    scored_at REAL NOT NULL,
+    PRIMARY KEY (job_id, address)
+);
+CREATE TABLE IF NOT EXISTS rescoring_failures (
+    job_id TEXT NOT NULL,
+    address TEXT NOT NULL,
+    error TEXT NOT NULL,
+    failed_at REAL NOT NULL,
+    PRIMARY KEY (job_id, address)
+);
+"""
+
+class RescoringStore:
+    """Job checkpoints and per-account results in SQLite (WAL); each page commits atomically with its checkpoint"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        # Same threading model as FeatureStore: one locked connection per process
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(rescoring_jobs)")}
+            if "accounts_failed" not in columns:
+                self._conn.execute("ALTER TABLE rescoring_jobs ADD COLUMN accounts_failed INTEGER NOT NULL DEFAULT 0")
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    async def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self._get_job, job_id)
+
+    async def start_job(self, job_id: str, network: str, app_id: int):
+        """Create (or reset) a job at the start of the account list"""
+        await asyncio.to_thread(self._start_job, job_id, network, app_id)
+
+    async def save_page(self, job: Dict[str, Any], rows: List[tuple], failures: List[tuple] = ()):
+        """Write a page of results and failures and advance the job's checkpoint in one transaction"""
+        await asyncio.to_thread(self._save_page, job, rows, failures)
+
+    def _get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            cursor = self._conn.execute(
+                "SELECT job_id, network, app_id, next_token, status, accounts_scored, accounts_failed, transactions_scored, "
+                "elapsed_seconds, started_at, updated_at FROM rescoring_jobs WHERE job_id = ?", (job_id,)
+            )
+            row = cursor.fetchone()
+            columns = [description[0] for description in cursor.description]
+        return dict(zip(columns, row)) if row else None
+
+    def _start_job(self, job_id: str, network: str, app_id: int):
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM rescoring_results WHERE job_id = ?", (job_id,))
+            self._conn.execute("DELETE FROM rescoring_failures WHERE job_id = ?", (job_id,))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO rescoring_jobs (job_id, network, app_id, next_token, status, "
+                "accounts_scored, accounts_failed, transactions_scored, elapsed_seconds, started_at, updated_at) "
+                "VALUES (?, ?, ?, NULL, 'running', 0, 0, 0, 0, ?, ?)",
+                (job_id, network, app_id, now, now)
+            )
+
+    def _save_page(self, job: Dict[str, Any], rows: List[tuple], failures: List[tuple]):
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO rescoring_results (job_id, address, credit_score, risk_level, "
+                "ai_confidence, total_transactions, balance_algo, user_deposits, user_borrowed, "
+                "last_update_time, model_version, risk_factors, scored_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO rescoring_failures (job_id, address, error, failed_at) VALUES (?, ?, ?, ?)",
+                failures
+            )
+            self._conn.execute(
+                "UPDATE rescoring_jobs SET next_token = ?, status = ?, accounts_scored = ?, accounts_failed = ?, "
+                "transactions_scored = ?, elapsed_seconds = ?, updated_at = ? WHERE job_id = ?",
+                (job["next_token"], job["status"], job["accounts_scored"], job["accounts_failed"],
+                 job["transactions_scored"], job["elapsed_seconds"], time.time(), job["job_id"])
+            )
+
+class RescoringJob:
+    """
+    Pages through the pool's accounts with the indexer, fetches each page's histories
+    with bounded concurrency and scores the page in the analyzer's process pool (or a
+    thread, with fewer than two workers) while the next page's histories are being
+    fetched. After each page the results and the indexer next-token are committed
+    together, so a rerun with the same job id picks up at the first unsaved page.
+    Accounts whose history could not be fetched are not scored, and accounts whose
+    analysis failed get no result row; both are recorded with the error in
+    rescoring_failures and counted separately.
+    """
+
+    def __init__(self, client: AlgorandClient, analyzer: RiskAnalyzer, store: RescoringStore, app_id: int,
+                 job_id: str, page_size: int = 500, concurrency: int = 16, max_transactions: int = 10000,
+                 borrowers_only: bool = False):
+        self.client = client
+        self.analyzer = analyzer
+        self.store = store
+        self.app_id = app_id
+        self.job_id = job_id
+        self.page_size = page_size
+        self.concurrency = concurrency
+        self.max_transactions = max_transactions
+        self.borrowers_only = borrowers_only
+
+    async def run(self, restart: bool = False) -> Dict[str, Any]:
+        """Run (or resume) the job to completion and return its final checkpoint row"""
+        job = await self.store.get_job(self.job_id)
+        if job is None or restart:
+            await self.store.start_job(self.job_id, self.client.current_network, self.app_id)
+            job = await self.store.get_job(self.job_id)
+        elif job["status"] == "complete":
+            print(f"Job {self.job_id} already complete ({job['accounts_scored']} accounts)")
+            return job
+        elif job["app_id"] != self.app_id or job["network"] != self.client.current_network:
+            raise ValueError(f"job {self.job_id} was started for app {job['app_id']} on {job['network']}")
+
+        resume_token = job["next_token"]
+        if resume_token:
+            print(f"Resuming job {self.job_id} after {job['accounts_scored']} accounts")
+        start = time.perf_counter() - job["elapsed_seconds"]
+
+        # Page k is scored off the event loop while page k+1's histories are fetched
+        pending: Optional[tuple] = None
+        async for accounts, next_token in self.client.iter_application_accounts(
+            self.app_id, next_token=resume_token, page_size=self.page_size
+        ):
+            if self.borrowers_only:
+                accounts = [account for account in accounts if account["app-local-state"].get("userBorrowed", 0) > 0]
+            accounts, histories, fetch_failures = await self._fetch_histories(accounts)
+            if pending is not None:
+                await self._finish_page(job, start, *pending)
+            pending = (self._score(accounts, histories), accounts, histories, fetch_failures, next_token)
+        if pending is not None:
+            await self._finish_page(job, start, *pending)
+        elif job["status"] != "complete":
+            job["status"] = "complete"
+            job["elapsed_seconds"] = time.perf_counter() - start
+            await self.store.save_page(job, [])
+
+        self._report(job, final=True)
+        return job
+
+    async def _finish_page(self, job: Dict[str, Any], start: float, scoring: asyncio.Future,
+                           accounts: List[Dict[str, Any]], histories: List[TransactionBatch],
+                           fetch_failures: List[Tuple[str, str]], next_token: Optional[str]):
+        results = await scoring
+        scored_at = time.time()
+        rows = []
+        failures = [(self.job_id, address, error, scored_at) for address, error in fetch_failures]
+        for account, result in zip(accounts, results):
+            if result.get("risk_level") == "Unknown":
+                failures.append((self.job_id, account["address"], "; ".join(result["risk_factors"]), scored_at))
+            else:
+                rows.append(self._to_row(account, result, scored_at))
+        job["next_token"] = next_token
+        job["status"] = "running" if next_token else "complete"
+        job["accounts_scored"] += len(rows)
+        job["accounts_failed"] += len(failures)
+        job["transactions_scored"] += sum(len(history) for history in histories)
+        job["elapsed_seconds"] = time.perf_counter() - start
+        await self.store.save_page(job, rows, failures)
+        self._report(job)
+
+    def _score(self, accounts: List[Dict[str, Any]], histories: List[TransactionBatch]) -> asyncio.Future:
+        """Start scoring a page without blocking the event loop"""
+        workers = self.analyzer.offload.workers
+        if workers <= 1:
+            # analyze_accounts_parallel would score a single chunk inline on the loop
+            return asyncio.ensure_future(asyncio.to_thread(self.analyzer.analyze_accounts, accounts, histories))
+        # One chunk per worker so a page keeps the whole pool busy
+        chunk_size = max(1, -(-len(accounts) // workers))
+        return asyncio.ensure_future(
+            self.analyzer.analyze_accounts_parallel(accounts, histories, chunk_size=chunk_size)
+        )
+
+    async def _fetch_histories(self, accounts: List[Dict[str, Any]]
+                               ) -> Tuple[List[Dict[str, Any]], List[TransactionBatch], List[Tuple[str, str]]]:
+        """
+        Each account's recent history, at most `concurrency` fetches at a time. Returns
+        the accounts whose history was fetched in full, their histories, and an
+        (address, error) pair for every account whose fetch failed.
+        """
+        histories: List[Optional[TransactionBatch]] = [None] * len(accounts)
+        errors: Dict[int, str] = {}
+        pending = iter(range(len(accounts)))
+
+        async def worker():
+            for index in pending:
+                try:
+                    histories[index] = await self.client.get_transaction_batch(
+                        accounts[index]["address"], limit=self.max_transactions, strict=True
+                    )
+                except Exception as e:
+                    errors[index] = f"History fetch failed: {str(e) or e.__class__.__name__}"
+
+        await asyncio.gather(*[worker() for _ in range(min(self.concurrency, len(accounts)))])
+        fetched = [index for index in range(len(accounts)) if index not in errors]
+        return ([accounts[index] for index in fetched], [histories[index] for index in fetched],
+                [(accounts[index]["address"], error) for index, error in sorted(errors.items())])
+
+    def _to_row(self, account: Dict[str, Any], result: Dict[str, Any], scored_at: float) -> tuple:
+        local_state = account["app-local-state"]
+        return (
+            self.job_id, account["address"], result["credit_score"], result["risk_level"],
+            result["ai_confidence"], result["total_transactions"], result["balance_algo"],
+            local_state.get("userDeposits", 0), local_state.get("userBorrowed", 0),
+            local_state.get("lastUpdateTime", 0), result["model_version"],
+            json.dumps(result["risk_factors"]), scored_at
+        )
+
+    def _report(self, job: Dict[str, Any], final: bool = False):
+        elapsed = max(job["elapsed_seconds"], 1e-9)
+        print(f"{'Finished' if final else 'Progress'} {job['job_id']}: {job['accounts_scored']} accounts, "
+              f"{job['accounts_failed']} failed, "
+              f"{job['transactions_scored']} transactions in {elapsed:.1f}s "
+              f"({job['accounts_scored'] / elapsed:.1f} accounts/s, "
+              f"{job['transactions_scored'] / elapsed:.0f} txns/s)")
@@ -5,28 +5,136 @@ Analyzes account risk, creditworthiness, and provides lending recommendations
 
 import asyncio
 import math
+import os
+import time
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
-import statistics
+from typing import Dict, List, Any, Optional, AsyncIterator, Tuple
+
+import numpy as np
+
+from algorand.tx_batch import TransactionBatch
+from ai.accumulator import TransactionAccumulator
+from ai.counterparty_graph import CounterpartyGraph
+from ai.feature_store import AddressState, FeatureStore
+from ai.offload import ProcessOffload
+from ai.participation_index import CATEGORIES, ParticipationIndex
+from ai.scoring_model import DEFAULT_MODEL_PATH, ScoringModel
+
+# Participation counts for accounts scored without a participation index
+_NO_PARTICIPATION = {f"{category}_{kind}": 0 for category in CATEGORIES for kind in ("apps", "assets")}
+
+# Per-process analyzer used by offloaded scoring (created on first use in each worker)
+_worker_analyzer: Optional["RiskAnalyzer"] = None
+
+def _score_batch_in_worker(model_definition: Dict[str, Any], account_data: Dict[str, Any],
+                           payload: bytes, context: Tuple[Optional[int], float]) -> Tuple[Dict[str, Any], float]:
+    """Process-pool entry point: score a TransactionBatch packed with to_bytes()"""
+    start = time.perf_counter()
+    analyzer = _get_worker_analyzer(model_definition)
+    batch = TransactionBatch.from_bytes(payload)
+    tx_analysis = analyzer._analyze_transaction_batch(batch)
+    # Workers have no graph or participation index; the parent's lookups are passed along
+    result = analyzer._score_account(account_data, tx_analysis, [], context)
+    return result, time.perf_counter() - start
+
+def _score_accounts_in_worker(model_definition: Dict[str, Any], accounts: List[Dict[str, Any]],
+                              payloads: List[Optional[bytes]],
+                              contexts: List[Tuple[Optional[int], float]]) -> Tuple[List[Dict[str, Any]], float]:
+    """Process-pool entry point: analyze_accounts over a chunk of accounts and packed histories"""
+    start = time.perf_counter()
+    analyzer = _get_worker_analyzer(model_definition)
+    histories = [TransactionBatch.from_bytes(payload) if payload is not None else None for payload in payloads]
+    return analyzer.analyze_accounts(accounts, histories, contexts), time.perf_counter() - start
+
+def _get_worker_analyzer(model_definition: Dict[str, Any]) -> "RiskAnalyzer":
+    global _worker_analyzer
+    if _worker_analyzer is None:
+        _worker_analyzer = RiskAnalyzer(model_poll_seconds=0)
+    # The parent's model travels with each task; recompile only when its version changes
+    if _worker_analyzer.model.version != model_definition.get("version"):
+        _worker_analyzer.set_model(ScoringModel(model_definition))
+    return _worker_analyzer
 
 class RiskAnalyzer:
-    def __init__(self):
+    def __init__(self, process_workers: int = 0, offload_threshold: int = 20000,
+                 feature_store: Optional[FeatureStore] = None, model_path: Optional[str] = None,
+                 model_poll_seconds: float = 5.0, graph: Optional[CounterpartyGraph] = None,
+                 participation: Optional[ParticipationIndex] = None):
         self.name = "Risk Analyzer"
         self.status = "active"
         self.performance = 98.7
         self.description = "Advanced risk assessment and fraud detection"
         self.last_update = datetime.now()
         
-        # Risk scoring weights
-        self.weights = {
-            "balance": 0.25,
-            "account_age": 0.20,
-            "transaction_frequency": 0.15,
-            "transaction_consistency": 0.15,
-            "transaction_amounts": 0.10,
-            "network_activity": 0.10,
-            "reputation": 0.05
-        }
+        # Scoring ladders and weights come from a model file, compiled at load time.
+        # The file is polled for changes and a new version replaces the old one
+        # atomically: each scoring call reads self.model once and uses only that.
+        self.model_path = model_path or DEFAULT_MODEL_PATH
+        self.model_poll_seconds = model_poll_seconds
+        self.model = ScoringModel.load(self.model_path)
+        self._model_mtime = os.path.getmtime(self.model_path)
+        self._model_task: Optional[asyncio.Task] = None
+        
+        # Histories of offload_threshold+ transactions are scored in a process pool so
+        # the event loop stays responsive; smaller ones stay inline (0 workers disables)
+        self.offload = ProcessOffload(process_workers, offload_threshold)
+        
+        # Persisted per-address features, so scores can be maintained incrementally
+        self.feature_store = feature_store
+        
+        # Optional global counterparty graph: every analyzed history is recorded in it,
+        # and network and reputation scores are read from its precomputed index
+        self.graph = graph
+        
+        # Optional index of known lending/DEX/governance apps and assets for reputation
+        self.participation = participation
+    
+    async def start(self):
+        """Start the analysis process pool (a no-op when offloading is disabled) and the model watcher"""
+        await self.offload.start()
+        if self.model_poll_seconds > 0 and (self._model_task is None or self._model_task.done()):
+            self._model_task = asyncio.ensure_future(self._watch_model())
+    
+    def close(self):
+        """Shut down the analysis process pool and the model watcher"""
+        self.offload.close()
+        if self._model_task is not None:
+            self._model_task.cancel()
+            self._model_task = None
+    
+    @property
+    def weights(self) -> Dict[str, float]:
+        return self.model.weights
+    
+    def set_model(self, model: ScoringModel):
+        """Swap in a compiled scoring model; scores already in progress finish on the old one"""
+        self.model = model
+        self.last_update = datetime.now()
+    
+    def reload_model(self, force: bool = False) -> bool:
+        """
+        Reload the model file if it changed (or unconditionally with force). A file that
+        fails to load is reported and the current model stays in place.
+        """
+        try:
+            mtime = os.path.getmtime(self.model_path)
+            if not force and mtime == self._model_mtime:
+                return False
+            model = ScoringModel.load(self.model_path)
+        except (OSError, ValueError) as e:
+            print(f"Error loading scoring model: {e}")
+            return False
+        self._model_mtime = mtime
+        if model.version != self.model.version:
+            print(f"Scoring model {self.model.version} replaced by {model.version}")
+        self.set_model(model)
+        return True
+    
+    async def _watch_model(self):
+        while True:
+            await asyncio.sleep(self.model_poll_seconds)
+            self.reload_model()
     
     async def get_status(self) -> Dict[str, Any]:
         """Get current status of the Risk Analyzer"""
@@ -36,7 +144,9 @@ class RiskAnalyzer:
             "performance": self.performance,
             "description": self.description,
             "last_update": self.last_update.isoformat(),
-            "uptime_hours": (datetime.now() - self.last_update).total_seconds() / 3600
+            "uptime_hours": (datetime.now() - self.last_update).total_seconds() / 3600,
+            "offload": self.offload.stats(),
+            "model": self.model.info()
         }
     
     async def analyze_account(self, account_data: Dict[str, Any], transaction_history: List[Dict[str, Any]]) -> Dict[str, Any]:
@@ -44,302 +154,477 @@ class RiskAnalyzer:
         Comprehensive account analysis using AI
         """
         try:
-            # Simulate AI analysis delay
-            await asyncio.sleep(0.8)
-            
-            # Extract account information
-            address = account_data.get("address", "")
-            balance_microalgos = account_data.get("amount", 0)
-            balance_algo = balance_microalgos / 1_000_000
-            created_at = account_data.get("created-at", None)
-            
-            # Calculate account age
-            account_age_days = 0
-            if created_at:
-                created_date = datetime.fromtimestamp(created_at)
-                account_age_days = (datetime.now() - created_date).days
-            
             # Analyze transaction patterns
+            self.observe_transactions(transaction_history)
             tx_analysis = self._analyze_transaction_patterns(transaction_history)
             
-            # Calculate individual risk factors
-            balance_score = self._calculate_balance_score(balance_algo)
-            age_score = self._calculate_age_score(account_age_days)
-            frequency_score = self._calculate_frequency_score(tx_analysis["frequency"])
-            consistency_score = self._calculate_consistency_score(tx_analysis["amounts"])
-            amount_score = self._calculate_amount_score(tx_analysis["amounts"])
-            network_score = self._calculate_network_score(tx_analysis["unique_addresses"])
-            reputation_score = self._calculate_reputation_score(account_data, transaction_history)
+            return self._score_account(account_data, tx_analysis, transaction_history)
             
-            # Calculate weighted credit score
-            credit_score = (
-                balance_score * self.weights["balance"] +
-                age_score * self.weights["account_age"] +
-                frequency_score * self.weights["transaction_frequency"] +
-                consistency_score * self.weights["transaction_consistency"] +
-                amount_score * self.weights["transaction_amounts"] +
-                network_score * self.weights["network_activity"] +
-                reputation_score * self.weights["reputation"]
-            )
-            
-            # Determine risk level
-            risk_level = self._determine_risk_level(credit_score)
-            
-            # Identify risk factors
-            risk_factors = self._identify_risk_factors(
-                balance_algo, account_age_days, tx_analysis, credit_score
-            )
-            
-            # Generate recommendations
-            recommendations = self._generate_recommendations(
-                credit_score, risk_level, risk_factors, balance_algo
-            )
-            
-            # Calculate AI confidence
-            ai_confidence = self._calculate_confidence(
-                len(transaction_history), account_age_days, tx_analysis
-            )
-            
-            return {
-                "credit_score": int(credit_score),
-                "risk_level": risk_level,
-                "account_age_days": account_age_days,
-                "total_transactions": len(transaction_history),
-                "balance_algo": round(balance_algo, 2),
-                "transaction_frequency": tx_analysis["frequency"],
+        except Exception as e:
+            return self._failed_analysis(e)
+    
+    async def analyze_account_stream(self, account_data: Dict[str, Any],
+                                     transactions: AsyncIterator[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Analyze an account from a streamed transaction history
+        (e.g. AlgorandClient.iter_transactions) without holding every transaction in memory
+        """
+        try:
+            tx_analysis = await self._analyze_transaction_stream(transactions)
+            return self._score_account(account_data, tx_analysis, [])
+        except Exception as e:
+            return self._failed_analysis(e)
+    
+    async def analyze_account_batch(self, account_data: Dict[str, Any], batch: TransactionBatch) -> Dict[str, Any]:
+        """
+        Analyze an account from a columnar TransactionBatch
+        (e.g. AlgorandClient.get_transaction_batch), working on the columns directly
+        """
+        try:
+            if self.graph is not None:
+                self.graph.add_batch(batch)
+            if self.offload.should_offload(len(batch)):
+                try:
+                    return await self.offload.run(_score_batch_in_worker, self.model.definition, account_data,
+                                                 batch.to_bytes(), self._score_context(account_data))
+                except BrokenProcessPool as e:
+                    print(f"Analysis worker pool failed, scoring inline: {e}")
+            tx_analysis = self._analyze_transaction_batch(batch)
+            return self._score_account(account_data, tx_analysis, [])
+        except Exception as e:
+            return self._failed_analysis(e)
+    
+    async def apply_transactions(self, network: str, address: str, transactions: List[Dict[str, Any]],
+                                 synced_round: int, account_data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Fold new transactions into an address's persisted features and rescore it.
+        Transactions at or below the state's last round were already counted and are
+        skipped; the state is then current to synced_round.
+        """
+        state = await self._load_state(network, address, account_data)
+        self.observe_transactions(transactions)
+        features = TransactionAccumulator()
+        features.add_many(tx for tx in transactions if tx.get("confirmed-round", 0) > state.last_round)
+        return await self.apply_features(network, address, features, synced_round, account_data, state)
+    
+    async def apply_features(self, network: str, address: str, features: TransactionAccumulator,
+                             synced_round: int, account_data: Optional[Dict[str, Any]] = None,
+                             state: Optional[AddressState] = None) -> Dict[str, Any]:
+        """Merge features covering rounds after the state's last round, persist and rescore"""
+        if state is None:
+            state = await self._load_state(network, address, account_data)
+        state.features.merge(features)
+        state.last_round = max(state.last_round, synced_round)
+        if account_data is not None:
+            state.account_data = account_data
+        await self.feature_store.put(network, state)
+        return self.score_state(state)
+    
+    def observe_transactions(self, transactions: List[Dict[str, Any]]):
+        """Record processed transactions in the counterparty graph (a no-op without one)"""
+        if self.graph is not None:
+            self.graph.add_transactions(transactions)
+    
+    async def get_address_score(self, network: str, address: str) -> Optional[Dict[str, Any]]:
+        """Current score of a tracked address, re-weighted from its persisted features"""
+        if self.feature_store is None:
+            return None
+        state = await self.feature_store.get(network, address)
+        return self.score_state(state) if state is not None else None
+    
+    def score_state(self, state: AddressState) -> Dict[str, Any]:
+        """Score from accumulated features alone: no transaction history is touched"""
+        result = self._score_account(state.account_data, self._summarize_transaction_patterns(state.features), [])
+        result["last_round"] = state.last_round
+        return result
+    
+    async def _load_state(self, network: str, address: str,
+                          account_data: Optional[Dict[str, Any]]) -> AddressState:
+        if self.feature_store is None:
+            raise RuntimeError("incremental scoring requires a feature store")
+        state = await self.feature_store.get(network, address)
+        if state is None:
+            state = AddressState(address, 0, account_data or {}, TransactionAccumulator())
+        return state
+    
+    async def analyze_accounts_parallel(self, accounts: List[Dict[str, Any]],
+                                        histories: List[Optional[TransactionBatch]],
+                                        chunk_size: int = 500) -> List[Dict[str, Any]]:
+        """
+        analyze_accounts for large sets: chunks of chunk_size accounts are scored
+        concurrently in the process pool (inline when offloading is disabled)
+        """
+        if self.offload.workers <= 0 or len(accounts) <= chunk_size:
+            return self.analyze_accounts(accounts, histories)
+        if len(histories) != len(accounts):
+            raise ValueError("analyze_accounts_parallel needs one history (or None) per account")
+        
+        # Graph and participation lookups happen here; workers only see their results
+        if self.graph is not None:
+            for history in histories:
+                if history is not None:
+                    self.graph.add_batch(history)
+        contexts = [self._score_context(account) for account in accounts]
+        model_definition = self.model.definition
+        try:
+            chunks = await asyncio.gather(*[
+                self.offload.run(
+                    _score_accounts_in_worker, model_definition, accounts[start:start + chunk_size],
+                    [history.to_bytes() if history is not None else None
+                     for history in histories[start:start + chunk_size]],
+                    contexts[start:start + chunk_size]
+                )
+                for start in range(0, len(accounts), chunk_size)
+            ])
+        except BrokenProcessPool as e:
+            print(f"Analysis worker pool failed, scoring inline: {e}")
+            return self.analyze_accounts(accounts, histories, contexts)
+        return [result for chunk in chunks for result in chunk]
+    
+    def analyze_accounts(self, accounts: List[Dict[str, Any]],
+                         histories: Optional[List[Optional[TransactionBatch]]] = None,
+                         contexts: Optional[List[Tuple[Optional[int], float]]] = None) -> List[Dict[str, Any]]:
+        """
+        Score many accounts at once. Transaction patterns are summarized per account,
+        then every component score, the weighted credit score, risk level and confidence
+        are computed as NumPy array operations over all accounts. Results are identical
+        to scoring each account on its own. contexts, when given, are the accounts'
+        precomputed graph and reputation lookups (see _score_context).
+        """
+        count = len(accounts)
+        if histories is None:
+            histories = [None] * count
+        if len(histories) != count:
+            raise ValueError("analyze_accounts needs one history (or None) per account")
+        if not count:
+            return []
+        
+        model = self.model
+        now = datetime.now()
+        empty_analysis = self._analyze_transaction_patterns([])
+        analyses = [
+            self._analyze_transaction_batch(history) if history is not None else empty_analysis
+            for history in histories
+        ]
+        if contexts is None:
+            if self.graph is not None:
+                for history in histories:
+                    if history is not None:
+                        self.graph.add_batch(history)
+            contexts = [self._score_context(account) for account in accounts]
+        
+        balance_algo = np.array([account.get("amount", 0) / 1_000_000 for account in accounts], dtype=np.float64)
+        age_days = np.array([
+            (now - datetime.fromtimestamp(account["created-at"])).days if account.get("created-at") else 0
+            for account in accounts
+        ], dtype=np.int64)
+        tx_count = np.array([analysis["count"] for analysis in analyses], dtype=np.int64)
+        frequency = np.array([analysis["frequency"] for analysis in analyses], dtype=np.float64)
+        volatility = np.array([analysis["volatility"] for analysis in analyses], dtype=np.float64)
+        address_count = np.array([
+            max(analysis["address_count"], graph_count) if graph_count is not None else analysis["address_count"]
+            for analysis, (graph_count, _) in zip(analyses, contexts)
+        ], dtype=np.int64)
+        mean_amount = np.array([analysis["mean_amount"] for analysis in analyses], dtype=np.float64)
+        std_amount = np.array([analysis["std_amount"] for analysis in analyses], dtype=np.float64)
+        reputation_score = np.array([reputation for _, reputation in contexts], dtype=np.float64)
+        
+        # Component scores: one searchsorted per ladder
+        ladders = model.components
+        balance_score = ladders["balance"].score_many(balance_algo)
+        age_score = ladders["account_age"].score_many(age_days)
+        frequency_score = ladders["transaction_frequency"].score_many(frequency)
+        consistency_score = self._vector_consistency_score(model, tx_count, mean_amount, std_amount)
+        amount_score = self._vector_amount_score(model, tx_count, mean_amount)
+        network_score = ladders["network_activity"].score_many(address_count)
+        
+        # Weighted credit score, summed in the same order as the scalar path
+        weights = model.weights
+        credit_score = (
+            balance_score * weights["balance"] +
+            age_score * weights["account_age"] +
+            frequency_score * weights["transaction_frequency"] +
+            consistency_score * weights["transaction_consistency"] +
+            amount_score * weights["transaction_amounts"] +
+            network_score * weights["network_activity"] +
+            reputation_score * weights["reputation"]
+        )
+        risk_level = model.risk_levels.score_many(credit_score).tolist()
+        ai_confidence = self._vector_confidence(model, tx_count, age_days, address_count)
+        
+        # Risk factor conditions, in the order _identify_risk_factors reports them,
+        # packed into a bitmask so each distinct combination is built only once
+        factor_flags = [
+            balance_algo < 10,
+            age_days < 7,
+            frequency < 0.1,
+            volatility > 2.0,
+            address_count < 2,
+            credit_score < 50
+        ]
+        factor_messages = [
+            "Very low account balance",
+            "New account (less than 7 days old)",
+            "Very low transaction activity",
+            "High transaction amount volatility",
+            "Limited network connections",
+            "Overall low creditworthiness"
+        ]
+        factor_masks = sum(flags.astype(np.int64) << bit for bit, flags in enumerate(factor_flags)).tolist()
+        factor_lists = {
+            mask: [message for bit, message in enumerate(factor_messages) if mask >> bit & 1]
+            for mask in set(factor_masks)
+        }
+        
+        # Confidence and reputation take only a handful of distinct values; round each once
+        confidence_values = ai_confidence.tolist()
+        reputation_values = reputation_score.tolist()
+        rounded = {value: round(value, 2) for value in set(confidence_values)}
+        rounded_reputation = {value: round(value, 1) for value in set(reputation_values)}
+        
+        # Back to Python scalars once, rather than indexing arrays per account
+        columns = zip(
+            credit_score.tolist(), risk_level, age_days.tolist(), tx_count.tolist(), balance_algo.tolist(),
+            factor_masks, confidence_values, balance_score.tolist(), age_score.tolist(),
+            frequency_score.tolist(), consistency_score.tolist(), amount_score.tolist(),
+            network_score.tolist(), reputation_values, analyses
+        )
+        # Recommendations depend only on the score tier, a low balance and the number of
+        # risk factors; generate each distinct combination once
+        recommendations: Dict[Tuple[int, bool, bool], List[str]] = {}
+        
+        results = []
+        for (score, level, age, transactions, balance, mask, confidence, balance_component, age_component,
+             frequency_component, consistency_component, amount_component, network_component,
+             reputation_component, analysis) in columns:
+            risk_factors = list(factor_lists[mask])
+            recommendation_key = (2 if score >= 80 else 1 if score >= 60 else 0, balance < 100, len(risk_factors) > 3)
+            if recommendation_key not in recommendations:
+                recommendations[recommendation_key] = self._generate_recommendations(score, level, risk_factors, balance)
+            results.append({
+                "credit_score": int(score),
+                "risk_level": level,
+                "account_age_days": age,
+                "total_transactions": transactions,
+                "balance_algo": round(balance, 2),
+                "transaction_frequency": analysis["frequency"],
                 "risk_factors": risk_factors,
-                "recommendations": recommendations,
-                "ai_confidence": round(ai_confidence, 2),
+                "recommendations": list(recommendations[recommendation_key]),
+                "ai_confidence": rounded[confidence],
+                "model_version": model.version,
                 "detailed_scores": {
-                    "balance_score": round(balance_score, 1),
-                    "age_score": round(age_score, 1),
-                    "frequency_score": round(frequency_score, 1),
-                    "consistency_score": round(consistency_score, 1),
-                    "amount_score": round(amount_score, 1),
-                    "network_score": round(network_score, 1),
-                    "reputation_score": round(reputation_score, 1)
+                    # Ladder scores are integers, for which round(score, 1) is the identity
+                    "balance_score": balance_component,
+                    "age_score": age_component,
+                    "frequency_score": frequency_component,
+                    "consistency_score": consistency_component,
+                    "amount_score": amount_component,
+                    "network_score": network_component,
+                    "reputation_score": rounded_reputation[reputation_component]
                 }
+            })
+        return results
+    
+    def _score_account(self, account_data: Dict[str, Any], tx_analysis: Dict[str, Any],
+                       transaction_history: List[Dict[str, Any]],
+                       context: Optional[Tuple[Optional[int], float]] = None) -> Dict[str, Any]:
+        """
+        Turn account data and transaction pattern analysis into a credit assessment.
+        context is the account's (graph counterparty count, reputation score); by
+        default it is computed here.
+        """
+        model = self.model
+        graph_count, reputation_score = context or self._score_context(account_data, transaction_history)
+        if graph_count is not None:
+            # The global graph may know counterparties this history does not cover
+            tx_analysis = {**tx_analysis, "address_count": max(tx_analysis["address_count"], graph_count)}
+        
+        # Extract account information
+        address = account_data.get("address", "")
+        balance_microalgos = account_data.get("amount", 0)
+        balance_algo = balance_microalgos / 1_000_000
+        created_at = account_data.get("created-at", None)
+        
+        # Calculate account age
+        account_age_days = 0
+        if created_at:
+            created_date = datetime.fromtimestamp(created_at)
+            account_age_days = (datetime.now() - created_date).days
+        
+        # Calculate individual risk factors
+        ladders = model.components
+        balance_score = ladders["balance"].score(balance_algo)
+        age_score = ladders["account_age"].score(account_age_days)
+        frequency_score = ladders["transaction_frequency"].score(tx_analysis["frequency"])
+        consistency_score = self._calculate_consistency_score(
+            model, tx_analysis["count"], tx_analysis["mean_amount"], tx_analysis["std_amount"]
+        )
+        amount_score = self._calculate_amount_score(model, tx_analysis["count"], tx_analysis["mean_amount"])
+        network_score = ladders["network_activity"].score(tx_analysis["address_count"])
+        
+        # Calculate weighted credit score
+        weights = model.weights
+        credit_score = (
+            balance_score * weights["balance"] +
+            age_score * weights["account_age"] +
+            frequency_score * weights["transaction_frequency"] +
+            consistency_score * weights["transaction_consistency"] +
+            amount_score * weights["transaction_amounts"] +
+            network_score * weights["network_activity"] +
+            reputation_score * weights["reputation"]
+        )
+        
+        # Determine risk level
+        risk_level = model.risk_levels.score(credit_score)
+        
+        # Identify risk factors
+        risk_factors = self._identify_risk_factors(
+            balance_algo, account_age_days, tx_analysis, credit_score
+        )
+        
+        # Generate recommendations
+        recommendations = self._generate_recommendations(
+            credit_score, risk_level, risk_factors, balance_algo
+        )
+        
+        # Calculate AI confidence
+        ai_confidence = self._calculate_confidence(
+            model, tx_analysis["count"], account_age_days, tx_analysis
+        )
+        
+        return {
+            "credit_score": int(credit_score),
+            "risk_level": risk_level,
+            "account_age_days": account_age_days,
+            "total_transactions": tx_analysis["count"],
+            "balance_algo": round(balance_algo, 2),
+            "transaction_frequency": tx_analysis["frequency"],
+            "risk_factors": risk_factors,
+            "recommendations": recommendations,
+            "ai_confidence": round(ai_confidence, 2),
+            "model_version": model.version,
+            "detailed_scores": {
+                "balance_score": round(balance_score, 1),
+                "age_score": round(age_score, 1),
+                "frequency_score": round(frequency_score, 1),
+                "consistency_score": round(consistency_score, 1),
+                "amount_score": round(amount_score, 1),
+                "network_score": round(network_score, 1),
+                "reputation_score": round(reputation_score, 1)
             }
-            
-        except Exception as e:
-            return {
-                "credit_score": 500,
-                "risk_level": "Unknown",
-                "account_age_days": 0,
-                "total_transactions": 0,
-                "balance_algo": 0,
-                "transaction_frequency": 0,
-                "risk_factors": [f"Analysis error: {str(e)}"],
-                "recommendations": ["Unable to analyze account"],
-                "ai_confidence": 0.0
-            }
+        }
+    
+    def _score_context(self, account_data: Dict[str, Any],
+                       transaction_history: Optional[List[Dict[str, Any]]] = None) -> Tuple[Optional[int], float]:
+        """Graph counterparty count (None if not indexed) and reputation score for an account"""
+        lookup = self.graph.lookup(account_data.get("address", "")) if self.graph is not None else None
+        graph_count, network_standing = lookup if lookup is not None else (None, None)
+        reputation_score = self._calculate_reputation_score(account_data, transaction_history or [], network_standing)
+        return graph_count, reputation_score
+    
+    def _failed_analysis(self, error: Exception) -> Dict[str, Any]:
+        """Fallback result when an analysis cannot be completed"""
+        return {
+            "credit_score": 500,
+            "risk_level": "Unknown",
+            "account_age_days": 0,
+            "total_transactions": 0,
+            "balance_algo": 0,
+            "transaction_frequency": 0,
+            "risk_factors": [f"Analysis error: {str(error)}"],
+            "recommendations": ["Unable to analyze account"],
+            "ai_confidence": 0.0,
+            "model_version": self.model.version
+        }
     
     def _analyze_transaction_patterns(self, transactions: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Analyze transaction patterns for risk assessment"""
-        if not transactions:
-            return {
-                "frequency": 0,
-                "amounts": [],
-                "unique_addresses": set(),
-                "time_patterns": [],
-                "volatility": 0
-            }
-        
-        amounts = []
-        unique_addresses = set()
-        time_patterns = []
-        
-        for tx in transactions:
-            # Extract amount (simplified - in production, parse actual transaction data)
-            amount = tx.get("amount", 0) / 1_000_000  # Convert to ALGO
-            amounts.append(amount)
-            
-            # Extract addresses
-            sender = tx.get("sender", "")
-            receiver = tx.get("receiver", "")
-            if sender:
-                unique_addresses.add(sender)
-            if receiver:
-                unique_addresses.add(receiver)
-            
-            # Extract timestamp
-            timestamp = tx.get("confirmed-round", 0)
-            if timestamp:
-                time_patterns.append(timestamp)
-        
+        features = TransactionAccumulator()
+        features.add_many(transactions)
+        return self._summarize_transaction_patterns(features)
+    
+    async def _analyze_transaction_stream(self, transactions: AsyncIterator[Dict[str, Any]]) -> Dict[str, Any]:
+        """Analyze a streamed transaction history in one pass, without keeping the transactions"""
+        features = TransactionAccumulator()
+        async for tx in transactions:
+            features.add(tx)
+            if self.graph is not None:
+                self.graph.add_transaction(tx)
+        return self._summarize_transaction_patterns(features)
+    
+    def _analyze_transaction_batch(self, batch: TransactionBatch) -> Dict[str, Any]:
+        """Analyze transaction patterns on the batch columns, without per-transaction objects"""
+        features = TransactionAccumulator()
+        features.add_batch(batch)
+        return self._summarize_transaction_patterns(features)
+    
+    def _summarize_transaction_patterns(self, features: TransactionAccumulator) -> Dict[str, Any]:
+        """Derive frequency and volatility from the accumulated transaction features"""
         # Calculate frequency (transactions per day)
-        if time_patterns:
-            time_span = max(time_patterns) - min(time_patterns)
-            frequency = len(transactions) / max(1, time_span / 86400)  # 86400 seconds in a day
+        if features.min_round is not None:
+            frequency = features.count / max(1, features.round_span / 86400)  # 86400 seconds in a day
         else:
             frequency = 0
         
         # Calculate volatility
         volatility = 0
-        if len(amounts) > 1:
-            volatility = statistics.stdev(amounts) / max(statistics.mean(amounts), 1)
+        if features.count > 1:
+            volatility = features.stdev / max(features.mean, 1)
         
         return {
+            "count": features.count,
             "frequency": round(frequency, 2),
-            "amounts": amounts,
-            "unique_addresses": unique_addresses,
-            "time_patterns": time_patterns,
-            "volatility": round(volatility, 3)
+            "mean_amount": features.mean,
+            "std_amount": features.stdev,
+            "address_count": features.counterparty_count,
+            "volatility": round(volatility, 3),
+            "features": features
         }
     
-    def _calculate_balance_score(self, balance_algo: float) -> float:
-        """Calculate balance-based risk score (0-100)"""
-        if balance_algo >= 10000:
-            return 100
-        elif balance_algo >= 5000:
-            return 90
-        elif balance_algo >= 1000:
-            return 80
-        elif balance_algo >= 500:
-            return 70
-        elif balance_algo >= 100:
-            return 60
-        elif balance_algo >= 50:
-            return 50
-        elif balance_algo >= 10:
-            return 40
-        else:
-            return 20
-    
-    def _calculate_age_score(self, age_days: int) -> float:
-        """Calculate account age-based risk score (0-100)"""
-        if age_days >= 365:
-            return 100
-        elif age_days >= 180:
-            return 90
-        elif age_days >= 90:
-            return 80
-        elif age_days >= 30:
-            return 70
-        elif age_days >= 7:
-            return 60
-        elif age_days >= 1:
-            return 40
-        else:
-            return 20
-    
-    def _calculate_frequency_score(self, frequency: float) -> float:
-        """Calculate transaction frequency-based risk score (0-100)"""
-        if frequency >= 10:
-            return 100
-        elif frequency >= 5:
-            return 90
-        elif frequency >= 2:
-            return 80
-        elif frequency >= 1:
-            return 70
-        elif frequency >= 0.5:
-            return 60
-        elif frequency >= 0.1:
-            return 50
-        else:
-            return 30
-    
-    def _calculate_consistency_score(self, amounts: List[float]) -> float:
+    def _calculate_consistency_score(self, model: ScoringModel, count: int, mean_amount: float,
+                                     std_dev: float) -> float:
         """Calculate transaction consistency score (0-100)"""
-        if len(amounts) < 2:
-            return 50
+        ladder = model.components["transaction_consistency"]
+        if count < 2:
+            return ladder.neutral_score
         
         # Calculate coefficient of variation (lower is more consistent)
-        mean_amount = statistics.mean(amounts)
         if mean_amount == 0:
-            return 50
-        
-        std_dev = statistics.stdev(amounts)
-        cv = std_dev / mean_amount
-        
-        # Convert to score (lower CV = higher score)
-        if cv <= 0.1:
-            return 100
-        elif cv <= 0.2:
-            return 90
-        elif cv <= 0.5:
-            return 80
-        elif cv <= 1.0:
-            return 70
-        elif cv <= 2.0:
-            return 60
-        else:
-            return 40
+            return ladder.neutral_score
+        
+        return ladder.score(std_dev / mean_amount)
     
-    def _calculate_amount_score(self, amounts: List[float]) -> float:
+    def _calculate_amount_score(self, model: ScoringModel, count: int, avg_amount: float) -> float:
         """Calculate transaction amount-based risk score (0-100)"""
-        if not amounts:
-            return 50
-        
-        avg_amount = statistics.mean(amounts)
-        max_amount = max(amounts)
+        ladder = model.components["transaction_amounts"]
+        if count == 0:
+            return ladder.neutral_score
         
         # Higher amounts generally indicate more established users
-        if avg_amount >= 1000:
-            return 100
-        elif avg_amount >= 500:
-            return 90
-        elif avg_amount >= 100:
-            return 80
-        elif avg_amount >= 50:
-            return 70
-        elif avg_amount >= 10:
-            return 60
-        else:
-            return 40
-    
-    def _calculate_network_score(self, unique_addresses: set) -> float:
-        """Calculate network activity score (0-100)"""
-        address_count = len(unique_addresses)
-        
-        if address_count >= 50:
-            return 100
-        elif address_count >= 20:
-            return 90
-        elif address_count >= 10:
-            return 80
-        elif address_count >= 5:
-            return 70
-        elif address_count >= 2:
-            return 60
-        elif address_count >= 1:
-            return 50
-        else:
-            return 30
+        return ladder.score(avg_amount)
     
-    def _calculate_reputation_score(self, account_data: Dict[str, Any], transactions: List[Dict[str, Any]]) -> float:
-        """Calculate reputation score (0-100)"""
-        # This would integrate with reputation systems, governance participation, etc.
-        # For now, use a simplified model
+    def _calculate_reputation_score(self, account_data: Dict[str, Any], transactions: List[Dict[str, Any]],
+                                    network_standing: Optional[float] = None) -> float:
+        """
+        Calculate reputation score (0-100) from governance and DeFi participation and
+        known asset holdings, plus the counterparty graph standing when available
+        """
+        ladders = self.model.reputation
+        counts = self.participation.match(account_data) if self.participation is not None else _NO_PARTICIPATION
         
-        # Check for governance participation (simplified)
-        governance_score = 50  # Base score
+        # Check for governance participation
+        governance_score = ladders["governance"].score(counts["governance_apps"] + counts["governance_assets"])
         
         # Check for DeFi participation
-        defi_score = 50  # Base score
-        
-        # Check for long-term holding patterns
-        holding_score = 50  # Base score
-        
-        return (governance_score + defi_score + holding_score) / 3
-    
-    def _determine_risk_level(self, credit_score: float) -> str:
-        """Determine risk level based on credit score"""
-        if credit_score >= 85:
-            return "A+"
-        elif credit_score >= 75:
-            return "A"
-        elif credit_score >= 65:
-            return "B+"
-        elif credit_score >= 55:
-            return "B"
-        elif credit_score >= 45:
-            return "C+"
-        elif credit_score >= 35:
-            return "C"
-        else:
-            return "D"
+        defi_score = ladders["defi"].score(counts["lending_apps"] + counts["dex_apps"])
+        
+        # Check for long-term holding of protocol assets (governance assets already
+        # count towards governance participation)
+        holding_score = ladders["holding"].score(counts["lending_assets"] + counts["dex_assets"])
+        
+        if network_standing is None:
+            return (governance_score + defi_score + holding_score) / 3
+        return (governance_score + defi_score + holding_score + network_standing) / 4
     
     def _identify_risk_factors(self, balance_algo: float, age_days: int, tx_analysis: Dict[str, Any], credit_score: float) -> List[str]:
         """Identify specific risk factors"""
@@ -357,7 +642,7 @@ class RiskAnalyzer:
         if tx_analysis["volatility"] > 2.0:
             risk_factors.append("High transaction amount volatility")
         
-        if len(tx_analysis["unique_addresses"]) < 2:
+        if tx_analysis["address_count"] < 2:
             risk_factors.append("Limited network connections")
         
         if credit_score < 50:
@@ -390,26 +675,38 @@ class RiskAnalyzer:
         
         return recommendations
     
-    def _calculate_confidence(self, tx_count: int, age_days: int, tx_analysis: Dict[str, Any]) -> float:
+    def _calculate_confidence(self, model: ScoringModel, tx_count: int, age_days: int,
+                              tx_analysis: Dict[str, Any]) -> float:
         """Calculate AI confidence in the analysis"""
-        confidence = 0.5  # Base confidence
-        
-        # More transactions = higher confidence
-        if tx_count >= 100:
-            confidence += 0.3
-        elif tx_count >= 50:
-            confidence += 0.2
-        elif tx_count >= 10:
-            confidence += 0.1
-        
-        # Older account = higher confidence
-        if age_days >= 365:
-            confidence += 0.2
-        elif age_days >= 90:
-            confidence += 0.1
-        
-        # More network activity = higher confidence
-        if len(tx_analysis["unique_addresses"]) >= 10:
-            confidence += 0.1
-        
-        return min(1.0, confidence)
+        ladders = model.confidence
+        confidence = model.confidence_base
+        
+        # More transactions, an older account and more network activity = higher confidence
+        confidence += ladders["transaction_count"].score(tx_count)
+        confidence += ladders["account_age"].score(age_days)
+        confidence += ladders["network_activity"].score(tx_analysis["address_count"])
+        
+        return min(model.confidence_max, confidence)
+    
+    # Vectorized counterparts of the guarded scores above (used by analyze_accounts)
+    
+    def _vector_consistency_score(self, model: ScoringModel, tx_count: np.ndarray, mean_amount: np.ndarray,
+                                  std_amount: np.ndarray) -> np.ndarray:
+        ladder = model.components["transaction_consistency"]
+        undefined = (tx_count < 2) | (mean_amount == 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cv = np.where(undefined, 0.0, std_amount / np.where(undefined, 1.0, mean_amount))
+        return np.where(undefined, ladder.neutral_score, ladder.score_many(cv))
+    
+    def _vector_amount_score(self, model: ScoringModel, tx_count: np.ndarray, mean_amount: np.ndarray) -> np.ndarray:
+        ladder = model.components["transaction_amounts"]
+        return np.where(tx_count == 0, ladder.neutral_score, ladder.score_many(mean_amount))
+    
+    def _vector_confidence(self, model: ScoringModel, tx_count: np.ndarray, age_days: np.ndarray,
+                           address_count: np.ndarray) -> np.ndarray:
+        ladders = model.confidence
+        confidence = np.full(len(tx_count), model.confidence_base)
+        confidence = confidence + ladders["transaction_count"].score_many(tx_count)
+        confidence = confidence + ladders["account_age"].score_many(age_days)
+        confidence = confidence + ladders["network_activity"].score_many(address_count)
+        return np.minimum(model.confidence_max, confidence)
@@ -0,0 +1,141 @@
+"""
+Score Cache
+Serves recent account analyses from memory, refreshing stale ones in the background
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Awaitable, Callable, Hashable, Optional, Set, Tuple
+
+from algorand.single_flight import SingleFlight
+
+# compute() -> (result, round of the address's latest transaction); a None round
+# means the result must not be cached (e.g. a failed analysis)
+ComputeFn = Callable[[], Awaitable[Tuple[Dict[str, Any], Optional[int]]]]
+# probe() -> round of the address's latest transaction, or None if unknown
+ProbeFn = Callable[[], Awaitable[Optional[int]]]
+
+class ScoreCache:
+    """
+    Results are stamped with the round of the address's latest transaction. Within
+    fresh_seconds they are served as is. Up to max_stale_seconds they are still served
+    immediately while a background refresh probes the address: if it has no newer
+    transaction the stamp is renewed, otherwise the score is recomputed. Older entries
+    are recomputed before answering.
+    """
+
+    def __init__(self, fresh_seconds: float = 5.0, max_stale_seconds: float = 60.0, max_entries: int = 10000):
+        if max_stale_seconds < fresh_seconds:
+            raise ValueError("max_stale_seconds must be at least fresh_seconds")
+        self.fresh_seconds = fresh_seconds
+        self.max_stale_seconds = max_stale_seconds
+        self.max_entries = max_entries
+
+        # key -> (result, activity_round, checked_at)
+        self._entries: "OrderedDict[Hashable, Tuple[Dict[str, Any], int, float]]" = OrderedDict()
+        self._single_flight = SingleFlight()
+        self._refreshing: Set[Hashable] = set()
+        self._tasks: Set[asyncio.Task] = set()
+
+        # Counters
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.recomputed = 0
+        self.refresh_errors = 0
+        self.evictions = 0
+
+    async def get(self, key: Hashable, compute: ComputeFn, probe: ProbeFn) -> Dict[str, Any]:
+        """Cached result for key, computing it (once across concurrent callers) when needed"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            result, activity_round, checked_at = entry
+            age = time.monotonic() - checked_at
+            if age <= self.fresh_seconds:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return result
+            if age <= self.max_stale_seconds:
+                self._entries.move_to_end(key)
+                self.stale_hits += 1
+                self._refresh_in_background(key, activity_round, compute, probe)
+                return result
+
+        self.misses += 1
+        return await self._single_flight.do(key, lambda: self._compute(key, compute))
+
+    def invalidate(self, key: Hashable):
+        """Drop a single entry"""
+        self._entries.pop(key, None)
+
+    def clear(self):
+        """Drop every entry"""
+        self._entries.clear()
+
+    def close(self):
+        """Cancel background refreshes (called from the app lifespan)"""
+        for task in self._tasks:
+            task.cancel()
+        self._tasks.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache size, hit/stale/miss counters and background refresh outcomes"""
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "fresh_seconds": self.fresh_seconds,
+            "max_stale_seconds": self.max_stale_seconds,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "refreshing": len(self._refreshing),
+            "revalidated": self.revalidated,
+            "recomputed": self.recomputed,
+            "refresh_errors": self.refresh_errors,
+            "evictions": self.evictions,
+            "hit_rate": round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0
+        }
+
+    async def _compute(self, key: Hashable, compute: ComputeFn) -> Dict[str, Any]:
+        result, activity_round = await compute()
+        if activity_round is not None:
+            self._store(key, result, activity_round)
+        return result
+
+    def _refresh_in_background(self, key: Hashable, activity_round: int, compute: ComputeFn, probe: ProbeFn):
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+        task = asyncio.ensure_future(self._refresh(key, activity_round, compute, probe))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _refresh(self, key: Hashable, activity_round: int, compute: ComputeFn, probe: ProbeFn):
+        try:
+            latest_round = await probe()
+            entry = self._entries.get(key)
+            if latest_round is not None and latest_round == activity_round and entry is not None:
+                # No new transactions: the cached score still holds
+                self._entries[key] = (entry[0], activity_round, time.monotonic())
+                self.revalidated += 1
+                return
+            await self._single_flight.do(key, lambda: self._compute(key, compute))
+            self.recomputed += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # The stale entry keeps being served until max_stale_seconds
+            self.refresh_errors += 1
+            print(f"Error refreshing cached score: {e}")
+        finally:
+            self._refreshing.discard(key)
+
+    def _store(self, key: Hashable, result: Dict[str, Any], activity_round: int):
+        self._entries[key] = (result, activity_round, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
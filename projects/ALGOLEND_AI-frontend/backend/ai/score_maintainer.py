@@ -0,0 +1,243 @@
+"""
+Score Maintainer
+Keeps credit scores for a watched set of addresses fresh as new blocks arrive
+"""
+
+import asyncio
+from collections import defaultdict
+from typing import Dict, List, Any, Iterable, Optional
+
+from ai.accumulator import TransactionAccumulator
+from ai.risk_analyzer import RiskAnalyzer
+from algorand.client import AlgorandClient
+
+class ScoreMaintainer:
+    """
+    Applies each new round's transactions to the watched addresses they touch.
+    Addresses are bootstrapped from their full history once; afterwards only new
+    transactions are read: per round from the indexer, or with a min-round query
+    per address after a gap too large to replay block by block.
+
+    Every watched address is complete through the maintainer's checkpoint round
+    (persisted), plus its own last round if it was touched more recently.
+    """
+
+    def __init__(self, client: AlgorandClient, analyzer: RiskAnalyzer, max_replay_rounds: int = 50,
+                 concurrency: int = 8, round_retries: int = 5, retry_seconds: float = 1.0):
+        if analyzer.feature_store is None:
+            raise ValueError("ScoreMaintainer needs a RiskAnalyzer with a feature store")
+        self.client = client
+        self.analyzer = analyzer
+        self.store = analyzer.feature_store
+        self.max_replay_rounds = max_replay_rounds
+        self.concurrency = concurrency
+        self.round_retries = round_retries
+        self.retry_seconds = retry_seconds
+
+        self._rounds: "asyncio.Queue[int]" = asyncio.Queue()
+        self._watched: Dict[str, int] = {}
+        self._network: Optional[str] = None
+        self._checkpoint: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+
+        # Updates to one address are serialized (striped locks keep memory flat)
+        self._locks = [asyncio.Lock() for _ in range(64)]
+
+        # Counters
+        self.rounds_processed = 0
+        self.rounds_idle = 0
+        self.transactions_applied = 0
+        self.address_updates = 0
+        self.address_syncs = 0
+        self.errors = 0
+
+    async def start(self):
+        """Load the watched set and start applying rounds in the background"""
+        await self._load_watched()
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def on_block(self, round_number: int):
+        """BlockFollower listener"""
+        self._rounds.put_nowait(round_number)
+
+    async def watch(self, addresses: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Start tracking addresses, bootstrapping new ones from their full history"""
+        if self._network != self.client.current_network:
+            await self._load_watched()
+        new_addresses = [address for address in dict.fromkeys(addresses) if address not in self._watched]
+        results = await self._for_each(new_addresses, self._sync_address)
+        return dict(zip(new_addresses, results))
+
+    def watched_addresses(self) -> List[str]:
+        return list(self._watched)
+
+    async def get_score(self, address: str) -> Optional[Dict[str, Any]]:
+        return await self.analyzer.get_address_score(self.client.current_network, address)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "watched": len(self._watched),
+            "checkpoint_round": self._checkpoint,
+            "pending_rounds": self._rounds.qsize(),
+            "rounds_processed": self.rounds_processed,
+            "rounds_idle": self.rounds_idle,
+            "transactions_applied": self.transactions_applied,
+            "address_updates": self.address_updates,
+            "address_syncs": self.address_syncs,
+            "errors": self.errors
+        }
+
+    async def _load_watched(self):
+        self._network = self.client.current_network
+        self._watched = await self.store.watched_addresses(self._network)
+        self._checkpoint = await self.store.get_checkpoint(self._network)
+
+    async def _run(self):
+        while True:
+            round_number = await self._rounds.get()
+            try:
+                await self._advance_to(round_number)
+            except Exception as e:
+                # The round stays unapplied; the next one sees the gap and catches up
+                self.errors += 1
+                print(f"Score maintainer error at round {round_number}: {e}")
+
+    async def _advance_to(self, round_number: int):
+        if self._network != self.client.current_network:
+            await self._load_watched()
+        if self._checkpoint is not None and round_number <= self._checkpoint:
+            return
+
+        if self._checkpoint is None or round_number - self._checkpoint - 1 > self.max_replay_rounds:
+            # First run or a long outage: bring every lagging address up with one
+            # min-round query each rather than replaying every missed block
+            lagging = [address for address in self._watched if self._synced_round(address) < round_number - 1]
+            results = await self._for_each(lagging, lambda address: self._sync_address(address, round_number - 1))
+            if any("error" in result for result in results):
+                raise RuntimeError("some addresses could not be synced")
+            await self._set_checkpoint(round_number - 1)
+        else:
+            for missed_round in range(self._checkpoint + 1, round_number):
+                await self._apply_round(missed_round)
+        await self._apply_round(round_number)
+
+    async def _apply_round(self, round_number: int):
+        if not self._watched:
+            # Nothing to update; move the checkpoint without scanning the round
+            await self._set_checkpoint(round_number)
+            self.rounds_idle += 1
+            return
+
+        transactions = None
+        for attempt in range(self.round_retries):
+            transactions = await self.client.get_round_transactions(round_number)
+            if transactions is not None:
+                break
+            # The indexer trails algod by a moment
+            await asyncio.sleep(self.retry_seconds)
+        if transactions is None:
+            raise RuntimeError(f"indexer has not reached round {round_number}")
+
+        touched: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for tx in transactions:
+            for address in {tx.get("sender"), tx.get("receiver")}:
+                if address in self._watched:
+                    touched[address].append(tx)
+
+        results = await self._for_each(
+            list(touched.items()), lambda item: self._apply_transactions(item[0], item[1], round_number)
+        )
+        if any("error" in result for result in results):
+            raise RuntimeError(f"round {round_number} could not be applied to every address")
+        await self._set_checkpoint(round_number)
+        self.rounds_processed += 1
+
+    async def _apply_transactions(self, address: str, transactions: List[Dict[str, Any]],
+                                  round_number: int) -> Dict[str, Any]:
+        async with self._lock(address):
+            if self._synced_round(address) >= round_number:
+                return {}
+            # The balance changed with these transactions; the account cache is
+            # round-aware, so this read is not stale
+            account_data = await self.client.get_account_info(address)
+            result = await self.analyzer.apply_transactions(self._network, address, transactions,
+                                                            round_number, account_data)
+            self._watched[address] = round_number
+            self.transactions_applied += len(transactions)
+            self.address_updates += 1
+            return result
+
+    async def _sync_address(self, address: str, target_round: int = 0) -> Dict[str, Any]:
+        """
+        Read an address's transactions after the round it is complete through, with
+        one paged min-round query, until it is current to target_round and to the
+        checkpoint (which can move on while a long history is being read).
+        """
+        async with self._lock(address):
+            synced_round = self._synced_round(address)
+            result: Dict[str, Any] = {}
+            for attempt in range(self.round_retries + 1):
+                features = TransactionAccumulator()
+                walk_round = None
+                async for current_round, transactions in self.client.iter_transaction_updates(
+                    address, min_round=synced_round + 1 if synced_round else None
+                ):
+                    if walk_round is None:
+                        walk_round = current_round
+                    features.add_many(transactions)
+                    self.analyzer.observe_transactions(transactions)
+
+                account_data = await self.client.get_account_info(address)
+                if account_data is None:
+                    raise RuntimeError(f"account {address} not found")
+                result = await self.analyzer.apply_features(self._network, address, features,
+                                                            max(walk_round or 0, synced_round), account_data)
+                synced_round = result["last_round"]
+                self.transactions_applied += features.count
+                self.address_syncs += 1
+                if synced_round >= max(target_round, self._checkpoint or 0):
+                    self._watched[address] = synced_round
+                    return result
+                # The indexer is behind the round we need; give it a moment
+                await asyncio.sleep(self.retry_seconds)
+            raise RuntimeError(f"indexer has not reached round {target_round} for {address}")
+
+    def _synced_round(self, address: str) -> int:
+        """Round an address is complete through (0 if it is not watched yet)"""
+        if address not in self._watched:
+            return 0
+        return max(self._watched[address], self._checkpoint or 0)
+
+    async def _set_checkpoint(self, round_number: int):
+        self._checkpoint = round_number
+        await self.store.set_checkpoint(self._network, round_number)
+
+    async def _for_each(self, items: List[Any], fn) -> List[Dict[str, Any]]:
+        """Run fn over items with bounded concurrency; failures become {"error": ...} results"""
+        results: List[Dict[str, Any]] = [{} for _ in items]
+        pending = list(reversed(range(len(items))))
+
+        async def worker():
+            while pending:
+                index = pending.pop()
+                try:
+                    results[index] = await fn(items[index])
+                except Exception as e:
+                    self.errors += 1
+                    results[index] = {"error": str(e)}
+
+        await asyncio.gather(*[worker() for _ in range(min(self.concurrency, len(items)))])
+        return results
+
+    def _lock(self, address: str) -> asyncio.Lock:
+        return self._locks[hash(address) % len(self._locks)]
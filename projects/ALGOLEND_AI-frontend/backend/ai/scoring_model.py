@@ -0,0 +1,133 @@
+"""
+Scoring Model
+Declarative credit scoring ladders and weights, compiled for binary-search lookup
+"""
+
+import json
+import os
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+
+import numpy as np
+
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "credit_model.json")
+
+COMPONENTS = (
+    "balance", "account_age", "transaction_frequency", "transaction_consistency",
+    "transaction_amounts", "network_activity"
+)
+WEIGHTS = COMPONENTS + ("reputation",)
+CONFIDENCE_COMPONENTS = ("transaction_count", "account_age", "network_activity")
+REPUTATION_COMPONENTS = ("governance", "defi", "holding")
+
+class ScoreLadder:
+    """
+    Step function over sorted breakpoints: scores[i] applies between breakpoints[i-1]
+    and breakpoints[i]. With "lower" bounds a value equal to a breakpoint moves up a
+    step (value >= breakpoint); with "upper" bounds it stays (value <= breakpoint).
+    """
+
+    def __init__(self, breakpoints: List[float], scores: List[Any], bounds: str = "lower",
+                 neutral_score: Optional[float] = None):
+        if bounds not in ("lower", "upper"):
+            raise ValueError(f"bounds must be 'lower' or 'upper', not {bounds!r}")
+        if len(scores) != len(breakpoints) + 1:
+            raise ValueError("a ladder needs exactly one more score than breakpoints")
+        if any(low >= high for low, high in zip(breakpoints, breakpoints[1:])):
+            raise ValueError("ladder breakpoints must be strictly increasing")
+
+        self.breakpoints = list(breakpoints)
+        self.scores = list(scores)
+        self.bounds = bounds
+        self.neutral_score = neutral_score
+
+        # Python lists for scalar bisect (cheaper than NumPy on one value), arrays for searchsorted
+        self._bisect = bisect_right if bounds == "lower" else bisect_left
+        self._side = "right" if bounds == "lower" else "left"
+        self._breakpoint_array = np.array(self.breakpoints, dtype=np.float64)
+        self._score_array = np.array(self.scores)
+
+    def score(self, value: float) -> Any:
+        return self.scores[self._bisect(self.breakpoints, value)]
+
+    def score_many(self, values: np.ndarray) -> np.ndarray:
+        return self._score_array[np.searchsorted(self._breakpoint_array, values, side=self._side)]
+
+    @classmethod
+    def from_dict(cls, spec: Dict[str, Any]) -> "ScoreLadder":
+        return cls(spec["breakpoints"], spec["scores"], spec.get("bounds", "lower"), spec.get("neutral_score"))
+
+class ScoringModel:
+    """
+    A versioned credit model: one ladder per component score, the component weights,
+    the risk-level ladder over the credit score, the confidence ladders and the
+    reputation ladders over DeFi/governance participation counts. Compiled
+    once at load time; instances are never mutated, so a new version is swapped in by
+    replacing the reference.
+    """
+
+    def __init__(self, definition: Dict[str, Any], path: Optional[str] = None):
+        self.definition = definition
+        self.path = path
+        self.loaded_at = datetime.now()
+
+        self.version = str(definition.get("version") or "")
+        if not self.version:
+            raise ValueError("scoring model has no version")
+
+        weights = definition.get("weights", {})
+        missing = [name for name in WEIGHTS if name not in weights]
+        if missing:
+            raise ValueError(f"scoring model is missing weights for {', '.join(missing)}")
+        self.weights: Dict[str, float] = {name: float(weights[name]) for name in WEIGHTS}
+
+        components = definition.get("components", {})
+        missing = [name for name in COMPONENTS if name not in components]
+        if missing:
+            raise ValueError(f"scoring model is missing components {', '.join(missing)}")
+        self.components: Dict[str, ScoreLadder] = {
+            name: ScoreLadder.from_dict(components[name]) for name in COMPONENTS
+        }
+        for name in ("transaction_consistency", "transaction_amounts"):
+            if self.components[name].neutral_score is None:
+                raise ValueError(f"component {name} needs a neutral_score for accounts without data")
+
+        self.risk_levels = ScoreLadder.from_dict(definition["risk_levels"])
+
+        confidence = definition.get("confidence", {})
+        self.confidence_base = float(confidence.get("base", 0.5))
+        self.confidence_max = float(confidence.get("max", 1.0))
+        self.confidence: Dict[str, ScoreLadder] = {
+            name: ScoreLadder.from_dict(confidence[name]) for name in CONFIDENCE_COMPONENTS
+        }
+
+        reputation = definition.get("reputation", {})
+        missing = [name for name in REPUTATION_COMPONENTS if name not in reputation]
+        if missing:
+            raise ValueError(f"scoring model is missing reputation ladders {', '.join(missing)}")
+        self.reputation: Dict[str, ScoreLadder] = {
+            name: ScoreLadder.from_dict(reputation[name]) for name in REPUTATION_COMPONENTS
+        }
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_MODEL_PATH) -> "ScoringModel":
+        """Read and compile a model file; raises ValueError if it is malformed"""
+        with open(path) as f:
+            try:
+                definition = json.load(f)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"scoring model {path} is not valid JSON: {e}")
+        try:
+            return cls(definition, path)
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"scoring model {path} is malformed: {e}")
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "description": self.definition.get("description", ""),
+            "path": self.path,
+            "loaded_at": self.loaded_at.isoformat(),
+            "weights": self.weights
+        }
@@ -4,13 +4,82 @@ Optimizes portfolio allocation, maximizes returns, and manages risk
 """
 
 import asyncio
+import functools
 import math
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, AsyncIterator, Iterable, Optional, Tuple
 import statistics
 
+import numpy as np
+
+from ai.pool_catalog import PoolCatalog
+from ai.portfolio_solver import EfficientFrontier, PoolColumns, solve_allocation
+from ai.yield_forecast import simulate_yield
+
+# Served when no pool catalog is configured
+MOCK_POOLS = [
+    {
+        "id": "stable_pool",
+        "name": "Stable Yield Pool",
+        "apy": 8.5,
+        "risk_score": 15,
+        "tvl": 2400000,
+        "min_deposit": 100,
+        "max_deposit": 100000,
+        "term_days": 30,
+        "liquidity": 0.95
+    },
+    {
+        "id": "growth_pool",
+        "name": "High Growth Pool",
+        "apy": 12.3,
+        "risk_score": 35,
+        "tvl": 1800000,
+        "min_deposit": 500,
+        "max_deposit": 50000,
+        "term_days": 60,
+        "liquidity": 0.85
+    },
+    {
+        "id": "conservative_pool",
+        "name": "Conservative Pool",
+        "apy": 6.2,
+        "risk_score": 8,
+        "tvl": 3200000,
+        "min_deposit": 50,
+        "max_deposit": 200000,
+        "term_days": 15,
+        "liquidity": 0.98
+    },
+    {
+        "id": "defi_pool",
+        "name": "DeFi Innovation Pool",
+        "apy": 15.8,
+        "risk_score": 55,
+        "tvl": 800000,
+        "min_deposit": 1000,
+        "max_deposit": 25000,
+        "term_days": 90,
+        "liquidity": 0.75
+    },
+    {
+        "id": "liquid_pool",
+        "name": "Liquid Staking Pool",
+        "apy": 7.1,
+        "risk_score": 12,
+        "tvl": 5000000,
+        "min_deposit": 200,
+        "max_deposit": 1000000,
+        "term_days": 7,
+        "liquidity": 0.99
+    }
+]
+
 class YieldOptimizer:
-    def __init__(self):
+    def __init__(self, max_frontiers: int = 64, forecast_paths: int = 10000, forecast_chunk_days: int = 64,
+                 catalog: Optional[PoolCatalog] = None):
         self.name = "Yield Optimizer"
         self.status = "active"
         self.performance = 91.5
@@ -18,11 +87,40 @@ class YieldOptimizer:
         self.last_update = datetime.now()
         
         # Optimization parameters
+        # max_risk bounds the portfolio's weighted risk score, max_pool_risk and
+        # min_liquidity decide which pools qualify, max_weight caps any one pool
         self.risk_tolerance_levels = {
-            "conservative": {"max_risk": 0.1, "target_return": 0.08},
-            "moderate": {"max_risk": 0.2, "target_return": 0.12},
-            "aggressive": {"max_risk": 0.4, "target_return": 0.18}
+            "conservative": {"max_risk": 0.1, "target_return": 0.08, "max_pool_risk": 0.2,
+                             "min_liquidity": 0.95, "max_weight": 0.5},
+            "moderate": {"max_risk": 0.2, "target_return": 0.12, "max_pool_risk": 0.4,
+                         "min_liquidity": 0.85, "max_weight": 0.5},
+            "aggressive": {"max_risk": 0.4, "target_return": 0.18, "max_pool_risk": 0.6,
+                           "min_liquidity": 0.75, "max_weight": 0.6}
         }
+        
+        # Live pools from LendingPool global state (MOCK_POOLS without a catalog)
+        self.catalog = catalog
+        
+        # Efficient frontiers for the current pool snapshot, per risk tolerance and
+        # eligible pool set; dropped when pool APYs or risk scores change
+        self.max_frontiers = max_frontiers
+        self._columns: Optional[PoolColumns] = None
+        self._frontiers: "OrderedDict[Tuple[str, bytes], EfficientFrontier]" = OrderedDict()
+        
+        # Monte Carlo yield forecast; portfolios without pools are forecast at the base APY
+        self.forecast_paths = forecast_paths
+        self.forecast_chunk_days = forecast_chunk_days
+        self.base_forecast_apy = 8.5
+        self.base_forecast_risk = 15
+        
+        # Counters
+        self.frontier_builds = 0
+        self.frontier_hits = 0
+        self.frontier_fallbacks = 0
+        self.batches = 0
+        self.batch_portfolios = 0
+        self.batch_plans = 0
+        self.batch_seconds = 0.0
     
     async def get_status(self) -> Dict[str, Any]:
         """Get current status of the Yield Optimizer"""
@@ -35,48 +133,100 @@ class YieldOptimizer:
             "uptime_hours": (datetime.now() - self.last_update).total_seconds() / 3600
         }
     
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "catalog_version": self.catalog.snapshot.version if self.catalog is not None else None,
+            "snapshot_version": self._columns.version if self._columns is not None else None,
+            "pools": len(self._columns) if self._columns is not None else 0,
+            "frontiers": len(self._frontiers),
+            "frontier_builds": self.frontier_builds,
+            "frontier_hits": self.frontier_hits,
+            "frontier_fallbacks": self.frontier_fallbacks,
+            "batches": self.batches,
+            "batch_portfolios": self.batch_portfolios,
+            "batch_distinct_preferences": self.batch_plans,
+            "batch_portfolios_per_second": (round(self.batch_portfolios / self.batch_seconds, 1)
+                                            if self.batch_seconds > 0 else None)
+        }
+    
     async def optimize_portfolio(self, current_portfolio: Dict[str, Any], user_preferences: Dict[str, Any]) -> Dict[str, Any]:
         """
         Optimize portfolio allocation for maximum yield
         """
+        available_pools = await self._get_available_pools()
+        return self._optimize(available_pools, current_portfolio, user_preferences, {})
+    
+    async def optimize_portfolios(self, requests: Iterable[Tuple[Dict[str, Any], Dict[str, Any]]],
+                                  chunk_size: int = 256,
+                                  stats: Optional[Dict[str, Any]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Optimize many (current portfolio, preferences) pairs against one pool snapshot,
+        yielding optimize_portfolio's result plus its "index" for each pair, in order.
+        Everything but the rebalancing recommendations depends only on the preference
+        tuple (see preference_key), so it is computed once per distinct tuple and
+        shared (read-only) by every result that asks for it. Control returns to the
+        event loop every chunk_size portfolios. When the batch is exhausted, its counts
+        and throughput are written into stats, if given.
+        """
+        available_pools = await self._get_available_pools()
+        snapshot_version = self._get_columns(available_pools).version if available_pools else None
+        plans: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+        portfolios = 0
+        seconds = 0.0
+        for index, (current_portfolio, user_preferences) in enumerate(requests):
+            started = time.perf_counter()
+            result = self._optimize(available_pools, current_portfolio, user_preferences, plans)
+            seconds += time.perf_counter() - started
+            portfolios += 1
+            yield {"index": index, **result}
+            if portfolios % chunk_size == 0:
+                await asyncio.sleep(0)
+        
+        self.batches += 1
+        self.batch_portfolios += portfolios
+        self.batch_plans += len(plans)
+        self.batch_seconds += seconds
+        if stats is not None:
+            stats.update({
+                "portfolios": portfolios,
+                "distinct_preferences": len(plans),
+                "snapshot_version": snapshot_version,
+                "optimize_seconds": round(seconds, 4),
+                "portfolios_per_second": round(portfolios / seconds, 1) if seconds > 0 else None
+            })
+    
+    @staticmethod
+    def preference_key(user_preferences: Dict[str, Any]) -> Tuple[Any, ...]:
+        """(risk tolerance, investment amount, time horizon in days), with their defaults"""
+        return (user_preferences.get("risk_tolerance", "moderate"),
+                user_preferences.get("investment_amount", 1000),
+                user_preferences.get("time_horizon", 30))
+    
+    def _optimize(self, pools: List[Dict[str, Any]], current_portfolio: Dict[str, Any],
+                  user_preferences: Dict[str, Any], plans: Dict[Tuple[Any, ...], Dict[str, Any]]) -> Dict[str, Any]:
+        """One portfolio against a pool snapshot, reusing (and filling) plans per preference tuple"""
         try:
-            # Simulate AI optimization delay
-            await asyncio.sleep(0.6)
-            
-            # Extract user preferences
-            risk_tolerance = user_preferences.get("risk_tolerance", "moderate")
-            investment_amount = user_preferences.get("investment_amount", 1000)
-            time_horizon = user_preferences.get("time_horizon", 30)  # days
-            
-            # Get available lending pools
-            available_pools = await self._get_available_pools()
-            
-            # Calculate optimal allocation
-            optimal_allocation = self._calculate_optimal_allocation(
-                available_pools, risk_tolerance, investment_amount, time_horizon
-            )
-            
-            # Calculate expected returns
-            expected_returns = self._calculate_expected_returns(optimal_allocation, time_horizon)
+            key = self.preference_key(user_preferences)
+            plan = plans.get(key)
+            if plan is None:
+                plan = self._plan(pools, *key)
+                plans[key] = plan
+            if "error" in plan:
+                return {"error": plan["error"], "timestamp": datetime.now().isoformat()}
             
             # Generate rebalancing recommendations
             rebalancing = self._generate_rebalancing_recommendations(
-                current_portfolio, optimal_allocation
+                current_portfolio, plan["optimal_allocation"]
             )
             
-            # Risk analysis
-            risk_analysis = self._analyze_portfolio_risk(optimal_allocation)
-            
-            # Generate action plan
-            action_plan = self._generate_action_plan(optimal_allocation, current_portfolio)
-            
             return {
-                "optimal_allocation": optimal_allocation,
-                "expected_returns": expected_returns,
+                "optimal_allocation": plan["optimal_allocation"],
+                "expected_returns": plan["expected_returns"],
                 "rebalancing_recommendations": rebalancing,
-                "risk_analysis": risk_analysis,
-                "action_plan": action_plan,
-                "optimization_confidence": self._calculate_optimization_confidence(optimal_allocation),
+                "risk_analysis": plan["risk_analysis"],
+                "constraints": plan["constraints"],
+                "action_plan": plan["action_plan"],
+                "optimization_confidence": plan["optimization_confidence"],
                 "timestamp": datetime.now().isoformat()
             }
             
@@ -86,128 +236,170 @@ class YieldOptimizer:
                 "timestamp": datetime.now().isoformat()
             }
     
-    async def _get_available_pools(self) -> List[Dict[str, Any]]:
-        """Get available lending pools with current data"""
-        # Mock data - in production, this would fetch from smart contracts
-        pools = [
-            {
-                "id": "stable_pool",
-                "name": "Stable Yield Pool",
-                "apy": 8.5,
-                "risk_score": 15,
-                "tvl": 2400000,
-                "min_deposit": 100,
-                "max_deposit": 100000,
-                "term_days": 30,
-                "liquidity": 0.95
-            },
-            {
-                "id": "growth_pool",
-                "name": "High Growth Pool",
-                "apy": 12.3,
-                "risk_score": 35,
-                "tvl": 1800000,
-                "min_deposit": 500,
-                "max_deposit": 50000,
-                "term_days": 60,
-                "liquidity": 0.85
-            },
-            {
-                "id": "conservative_pool",
-                "name": "Conservative Pool",
-                "apy": 6.2,
-                "risk_score": 8,
-                "tvl": 3200000,
-                "min_deposit": 50,
-                "max_deposit": 200000,
-                "term_days": 15,
-                "liquidity": 0.98
-            },
-            {
-                "id": "defi_pool",
-                "name": "DeFi Innovation Pool",
-                "apy": 15.8,
-                "risk_score": 55,
-                "tvl": 800000,
-                "min_deposit": 1000,
-                "max_deposit": 25000,
-                "term_days": 90,
-                "liquidity": 0.75
-            },
-            {
-                "id": "liquid_pool",
-                "name": "Liquid Staking Pool",
-                "apy": 7.1,
-                "risk_score": 12,
-                "tvl": 5000000,
-                "min_deposit": 200,
-                "max_deposit": 1000000,
-                "term_days": 7,
-                "liquidity": 0.99
+    def _plan(self, pools: List[Dict[str, Any]], risk_tolerance: str, investment_amount: float,
+              time_horizon: int) -> Dict[str, Any]:
+        """The parts of an optimization that depend only on the preferences (failures included)"""
+        try:
+            # Calculate optimal allocation
+            optimal_allocation = self._calculate_optimal_allocation(
+                pools, risk_tolerance, investment_amount, time_horizon
+            )
+            
+            return {
+                "optimal_allocation": optimal_allocation,
+                "expected_returns": self._calculate_expected_returns(optimal_allocation, time_horizon),
+                "risk_analysis": self._analyze_portfolio_risk(optimal_allocation),
+                "constraints": self._check_constraints(optimal_allocation, risk_tolerance, investment_amount),
+                "action_plan": self._generate_action_plan(optimal_allocation),
+                "optimization_confidence": self._calculate_optimization_confidence(optimal_allocation)
             }
-        ]
-        
-        return pools
+            
+        except Exception as e:
+            return {"error": f"Portfolio optimization failed: {str(e)}"}
+    
+    def get_pool(self, pool_id: str) -> Optional[Dict[str, Any]]:
+        """One of the pools the optimizer allocates across (MOCK_POOLS without a catalog)"""
+        if self.catalog is None:
+            return next((pool for pool in MOCK_POOLS if pool["id"] == str(pool_id)), None)
+        return self.catalog.get_pool(pool_id)
+    
+    async def _get_available_pools(self) -> List[Dict[str, Any]]:
+        """The catalog's current snapshot, read from memory (the same object until it changes)"""
+        if self.catalog is None:
+            return MOCK_POOLS
+        return self.catalog.pools
     
     def _calculate_optimal_allocation(self, pools: List[Dict[str, Any]], risk_tolerance: str, 
                                     investment_amount: float, time_horizon: int) -> List[Dict[str, Any]]:
-        """Calculate optimal portfolio allocation using AI optimization"""
-        risk_params = self.risk_tolerance_levels[risk_tolerance]
-        max_risk = risk_params["max_risk"]
-        target_return = risk_params["target_return"]
+        """
+        Highest-APY allocation whose weighted risk score stays within the tolerance's
+        max_risk. Pools must fit the time horizon, the tolerance's liquidity floor and
+        per-pool risk ceiling, and get nothing or between their min and max deposit.
+        max_weight caps any one pool unless the eligible pools cannot take the full
+        amount otherwise; what no pool can take is left unallocated.
         
-        # Filter pools based on risk tolerance
-        suitable_pools = [pool for pool in pools if pool["risk_score"] <= max_risk * 100]
+        The cached efficient frontier answers most requests; the solver runs only when
+        the frontier's allocation breaks a deposit bound for this amount.
+        """
+        risk_params = self.risk_tolerance_levels[risk_tolerance]
+        if not pools or investment_amount <= 0:
+            return []
+        columns = self._get_columns(pools)
         
-        if not suitable_pools:
+        within_risk = columns.risk <= risk_params["max_pool_risk"] * 100
+        eligible = (
+            within_risk
+            & (columns.liquidity >= risk_params["min_liquidity"])
+            & (columns.term_days <= time_horizon)
+        )
+        if not eligible.any():
+            # Nothing fits the horizon and liquidity floor: relax both
+            eligible = within_risk
+        if not eligible.any():
             # If no pools meet risk criteria, use the lowest risk pools
-            suitable_pools = sorted(pools, key=lambda x: x["risk_score"])[:3]
-        
-        # Calculate allocation using modern portfolio theory
-        allocations = []
-        total_weight = 0
-        
-        for pool in suitable_pools:
-            # Calculate weight based on risk-adjusted return
-            risk_adjusted_return = pool["apy"] / 100 - (pool["risk_score"] / 100) * 0.5
-            weight = max(0, risk_adjusted_return)
-            total_weight += weight
+            eligible = np.zeros(len(columns), dtype=bool)
+            eligible[np.argsort(columns.risk, kind="stable")[:3]] = True
+        max_risk = risk_params["max_risk"] * 100
         
-        # Normalize weights
-        for pool in suitable_pools:
-            risk_adjusted_return = pool["apy"] / 100 - (pool["risk_score"] / 100) * 0.5
-            weight = max(0, risk_adjusted_return)
-            normalized_weight = weight / total_weight if total_weight > 0 else 1 / len(suitable_pools)
-            
-            allocation_amount = investment_amount * normalized_weight
-            
-            # Ensure minimum deposit requirements
-            if allocation_amount >= pool["min_deposit"]:
-                allocations.append({
-                    "pool_id": pool["id"],
-                    "pool_name": pool["name"],
-                    "allocation_percent": round(normalized_weight * 100, 1),
-                    "allocation_amount": round(allocation_amount, 2),
-                    "expected_apy": pool["apy"],
-                    "risk_score": pool["risk_score"],
-                    "term_days": pool["term_days"]
-                })
+        weights = self._get_frontier(columns, risk_tolerance, eligible).allocate(max_risk)
+        if weights is not None:
+            held = weights > 1e-9
+            amounts = weights[held] * investment_amount
+            if (np.all(amounts >= columns.min_deposit[held] - 1e-6)
+                    and np.all(amounts <= columns.max_deposit[held] + 1e-6)):
+                self.frontier_hits += 1
+            else:
+                weights = None
+        if weights is None:
+            self.frontier_fallbacks += 1
+            weights = self._solve_allocation(columns, eligible, risk_params, investment_amount)
         
-        # If no allocations meet minimum requirements, suggest the most suitable pool
-        if not allocations:
-            best_pool = min(suitable_pools, key=lambda x: x["min_deposit"])
+        allocations = []
+        for index in np.argsort(-weights, kind="stable"):
+            weight = float(weights[index])
+            if weight <= 1e-9:
+                break
+            pool = pools[index]
             allocations.append({
-                "pool_id": best_pool["id"],
-                "pool_name": best_pool["name"],
-                "allocation_percent": 100.0,
-                "allocation_amount": investment_amount,
-                "expected_apy": best_pool["apy"],
-                "risk_score": best_pool["risk_score"],
-                "term_days": best_pool["term_days"]
+                "pool_id": pool["id"],
+                "pool_name": pool["name"],
+                "allocation_percent": round(weight * 100, 1),
+                "allocation_amount": round(weight * investment_amount, 2),
+                "expected_apy": pool["apy"],
+                "risk_score": pool["risk_score"],
+                "term_days": pool["term_days"]
             })
         
         return allocations
     
+    def _solve_allocation(self, columns: PoolColumns, eligible: np.ndarray, risk_params: Dict[str, Any],
+                          investment_amount: float) -> np.ndarray:
+        """Exact allocation for one amount, with its deposit bounds as fractions of the investment"""
+        minimum = columns.min_deposit / investment_amount
+        capacity = np.minimum(columns.max_deposit / investment_amount, 1.0)
+        candidates = np.flatnonzero(eligible & (capacity >= minimum))
+        returns = columns.apy[candidates] / 100
+        risks = columns.risk[candidates]
+        minimum = minimum[candidates]
+        capacity = capacity[candidates]
+        max_risk = risk_params["max_risk"] * 100
+        
+        capped = np.minimum(capacity, risk_params["max_weight"])
+        solved, _ = solve_allocation(returns, risks, np.where(capped >= minimum, capped, 0.0), minimum, max_risk)
+        if solved.sum() < 1.0 - 1e-6:
+            # max_weight is a preference; drop it if the caps leave money uninvested
+            uncapped, _ = solve_allocation(returns, risks, capacity, minimum, max_risk)
+            if uncapped.sum() > solved.sum() + 1e-6:
+                solved = uncapped
+        weights = np.zeros(len(columns))
+        weights[candidates] = solved
+        return weights
+    
+    def _get_columns(self, pools: List[Dict[str, Any]]) -> PoolColumns:
+        """Columns for the pool snapshot; frontiers survive a new snapshot with the same APYs and risk scores"""
+        if self._columns is None or self._columns.pools is not pools:
+            columns = PoolColumns(pools)
+            if self._columns is None or columns.version != self._columns.version:
+                self._frontiers.clear()
+            self._columns = columns
+        return self._columns
+    
+    def _get_frontier(self, columns: PoolColumns, risk_tolerance: str, eligible: np.ndarray) -> EfficientFrontier:
+        key = (risk_tolerance, np.packbits(eligible).tobytes())
+        frontier = self._frontiers.get(key)
+        if frontier is not None:
+            self._frontiers.move_to_end(key)
+            return frontier
+        candidates = np.flatnonzero(eligible)
+        frontier = EfficientFrontier(
+            columns.apy[candidates] / 100,
+            columns.risk[candidates],
+            candidates,
+            np.full(len(candidates), self.risk_tolerance_levels[risk_tolerance]["max_weight"]),
+            len(columns)
+        )
+        self.frontier_builds += 1
+        self._frontiers[key] = frontier
+        while len(self._frontiers) > self.max_frontiers:
+            self._frontiers.popitem(last=False)
+        return frontier
+    
+    def _check_constraints(self, allocation: List[Dict[str, Any]], risk_tolerance: str,
+                           investment_amount: float) -> Dict[str, Any]:
+        """How the allocation sits against the tolerance's risk budget and return target"""
+        risk_params = self.risk_tolerance_levels[risk_tolerance]
+        invested = sum(pool["allocation_amount"] for pool in allocation)
+        portfolio_risk = sum(pool["allocation_amount"] * pool["risk_score"] for pool in allocation) / invested if invested else 0.0
+        portfolio_apy = sum(pool["allocation_amount"] * pool["expected_apy"] for pool in allocation) / invested if invested else 0.0
+        return {
+            "max_risk_score": risk_params["max_risk"] * 100,
+            "portfolio_risk_score": round(portfolio_risk, 2),
+            "portfolio_apy": round(portfolio_apy, 2),
+            "risk_constraint_met": portfolio_risk <= risk_params["max_risk"] * 100 + 0.01,
+            "target_return_met": portfolio_apy >= risk_params["target_return"] * 100,
+            "unallocated_amount": round(max(investment_amount - invested, 0.0), 2)
+        }
+    
     def _calculate_expected_returns(self, allocation: List[Dict[str, Any]], time_horizon: int) -> Dict[str, Any]:
         """Calculate expected returns for the portfolio"""
         total_investment = sum(pool["allocation_amount"] for pool in allocation)
@@ -315,8 +507,7 @@ class YieldOptimizer:
             "number_of_pools": len(allocation)
         }
     
-    def _generate_action_plan(self, optimal_allocation: List[Dict[str, Any]], 
-                            current_portfolio: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def _generate_action_plan(self, optimal_allocation: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Generate step-by-step action plan"""
         actions = []
         
@@ -364,36 +555,54 @@ class YieldOptimizer:
         confidence = (diversification_factor + balance_factor + risk_factor) / 3
         return round(confidence, 2)
     
-    async def get_yield_forecast(self, portfolio: Dict[str, Any], days: int = 30) -> Dict[str, Any]:
-        """Get yield forecast for the next N days"""
+    async def get_yield_forecast(self, portfolio: Dict[str, Any], days: int = 30, paths: Optional[int] = None,
+                                 seed: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Monte Carlo forecast of the portfolio's cumulative yield for the next N days.
+        portfolio["pools"] holds {"pool_id", "allocation_percent" or "allocation_amount"}
+        entries (APY and risk score come from the entry or the pool catalog); without
+        any, the forecast is for a single pool at the base APY. Pass seed for
+        reproducible paths.
+        """
         try:
-            # Simulate AI forecasting delay
-            await asyncio.sleep(0.4)
+            days = max(int(days), 0)
+            paths = max(int(paths or self.forecast_paths), 1)
+            apy, risk, weights = await self._get_forecast_inputs(portfolio)
             
-            # Mock forecast data (in production, use ML models)
-            base_yield = 8.5  # Base APY
-            volatility = 0.02  # Daily volatility
+            loop = asyncio.get_running_loop()
+            simulation = await loop.run_in_executor(None, functools.partial(
+                simulate_yield, apy, risk, weights, days, paths, seed=seed, chunk_days=self.forecast_chunk_days
+            ))
             
+            low, median, high = simulation["bands"] * 100
+            mean_daily = simulation["mean_daily"] * 100
             forecast_data = []
-            cumulative_yield = 0
-            
             for day in range(1, days + 1):
-                # Simulate daily yield with some randomness
-                daily_yield = base_yield / 365 + (volatility * (0.5 - 0.5))  # Random walk
-                cumulative_yield += daily_yield
-                
                 forecast_data.append({
                     "day": day,
-                    "daily_yield": round(daily_yield * 100, 4),
-                    "cumulative_yield": round(cumulative_yield * 100, 2),
-                    "projected_apy": round(cumulative_yield * 365 / day * 100, 2)
+                    "daily_yield": round(float(mean_daily[day - 1]), 4),
+                    "cumulative_yield": round(float(median[day - 1]), 2),
+                    "cumulative_yield_p5": round(float(low[day - 1]), 2),
+                    "cumulative_yield_p95": round(float(high[day - 1]), 2),
+                    "projected_apy": round(float(median[day - 1]) * 365 / day, 2)
                 })
             
+            final_low, final_median, final_high = simulation["final"] * 100
+            # Narrower bands relative to the median mean a more certain forecast
+            spread = (final_high - final_low) / (2 * final_median) if final_median > 0 else 1.0
             return {
                 "forecast_period_days": days,
                 "forecast_data": forecast_data,
-                "projected_total_yield": round(cumulative_yield * 100, 2),
-                "confidence": 0.85,
+                "projected_total_yield": round(float(final_median), 2),
+                "yield_percentiles": {
+                    "p5": round(float(final_low), 2),
+                    "p50": round(float(final_median), 2),
+                    "p95": round(float(final_high), 2)
+                },
+                "expected_shortfall": round(simulation["expected_shortfall"] * 100, 2),
+                "paths": paths,
+                "seed": seed,
+                "confidence": round(float(min(max(1.0 - spread, 0.0), 1.0)), 2),
                 "timestamp": datetime.now().isoformat()
             }
             
@@ -402,3 +611,22 @@ class YieldOptimizer:
                 "error": f"Yield forecast failed: {str(e)}",
                 "timestamp": datetime.now().isoformat()
             }
+    
+    async def _get_forecast_inputs(self, portfolio: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """APYs (fractions), risk scores and normalized weights of the portfolio's pools"""
+        catalog = {pool["id"]: pool for pool in await self._get_available_pools()}
+        apy, risk, weights = [], [], []
+        for holding in portfolio.get("pools", []):
+            pool = catalog.get(holding.get("pool_id"), {})
+            pool_apy = holding.get("expected_apy", pool.get("apy"))
+            pool_risk = holding.get("risk_score", pool.get("risk_score"))
+            weight = holding.get("allocation_percent", holding.get("allocation_amount", 0))
+            if pool_apy is None or pool_risk is None or weight <= 0:
+                continue
+            apy.append(pool_apy / 100)
+            risk.append(pool_risk)
+            weights.append(weight)
+        if not weights:
+            apy, risk, weights = [self.base_forecast_apy / 100], [self.base_forecast_risk], [1.0]
+        weights = np.array(weights, dtype=np.float64)
+        return np.array(apy), np.array(risk, dtype=np.float64), weights / weights.sum()
@@ -0,0 +1,180 @@
+"""
+Block Follower
+Follows the chain in the background and serves network statistics from memory
+"""
+
+import asyncio
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Callable, Deque, Tuple
+
+from algorand.client import AlgorandClient
+
+class BlockFollower:
+    def __init__(self, client: AlgorandClient, window: int = 120, warmup_blocks: int = 10,
+                 fee_refresh_blocks: int = 10):
+        self.client = client
+        self.window = window
+        self.warmup_blocks = min(warmup_blocks, window)
+        self.fee_refresh_blocks = fee_refresh_blocks
+
+        # Ring buffer of (round, timestamp, txn_count, block_seconds) with running sums,
+        # so statistics are updated incrementally as blocks enter and leave the window
+        self._blocks: Deque[Tuple[int, int, int, int]] = deque()
+        self._total_txns = 0
+        self._total_seconds = 0
+
+        self._network: Optional[str] = None
+        self._last_round = 0
+        self._last_timestamp = 0
+        self._last_txn_counter: Optional[int] = None
+        self._min_fee = 1000
+        self._blocks_since_fee_refresh = fee_refresh_blocks
+
+        self._task: Optional[asyncio.Task] = None
+        self._backoff_seconds = 1.0
+        self.errors = 0
+        
+        # Called with each recorded round; must not block (e.g. enqueue and return)
+        self._listeners: List[Callable[[int], None]] = []
+
+    async def start(self):
+        """Start following the chain in the background"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        """Stop the background task"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def add_listener(self, listener: Callable[[int], None]):
+        """Call listener(round) for every block the follower records"""
+        self._listeners.append(listener)
+    
+    def get_stats(self) -> Optional[Dict[str, Any]]:
+        """Current network statistics from the block window (None until two blocks were seen)"""
+        if not self._blocks or self._total_seconds <= 0:
+            return None
+
+        avg_block_seconds = self._total_seconds / len(self._blocks)
+        seconds_since_last_block = max(0.0, time.time() - self._last_timestamp)
+
+        return {
+            "tps": round(self._total_txns / self._total_seconds),
+            "finality_seconds": round(avg_block_seconds, 2),
+            "fees_microalgos": self._min_fee,
+            "block_height": self._last_round,
+            "last_block_time": datetime.fromtimestamp(self._last_timestamp).isoformat(),
+            "network_health": self._assess_network_health(avg_block_seconds, seconds_since_last_block),
+            "window_blocks": len(self._blocks),
+            "window_transactions": self._total_txns
+        }
+
+    async def _run(self):
+        while True:
+            try:
+                await self._follow()
+            except Exception as e:
+                self.errors += 1
+                print(f"Block follower error: {e}")
+                await asyncio.sleep(self._backoff_seconds)
+                self._backoff_seconds = min(self._backoff_seconds * 2, 30.0)
+
+    async def _follow(self):
+        """Sync to the current round, then wait for each new block"""
+        if self._network != self.client.current_network:
+            self._reset()
+
+        status = await self.client.get_status()
+        if status is None:
+            raise RuntimeError("node status unavailable")
+        await self._catch_up(status.get("last-round", 0))
+
+        while self._network == self.client.current_network:
+            status = await self.client.wait_for_block_after(self._last_round)
+            if status is None:
+                raise RuntimeError("wait-for-block-after unavailable")
+            await self._catch_up(status.get("last-round", self._last_round))
+            self._backoff_seconds = 1.0
+
+    async def _catch_up(self, latest_round: int):
+        """
+        Record every round up to latest_round. On startup, or after falling a whole
+        window behind, only the last few blocks are read to re-seed the window.
+        """
+        if latest_round <= self._last_round:
+            return
+        first_round = self._last_round + 1
+        if self._last_round == 0 or latest_round - self._last_round > self.window:
+            first_round = max(1, latest_round - self.warmup_blocks)
+        for round_number in range(first_round, latest_round + 1):
+            await self._record_block(round_number)
+
+    async def _record_block(self, round_number: int):
+        header = await self.client.get_block_header(round_number)
+        if header is None:
+            raise RuntimeError(f"block {round_number} unavailable")
+
+        timestamp = header.get("ts", 0)
+        txn_counter = header.get("tc", 0)
+
+        # Only consecutive rounds give a meaningful transaction count and block time
+        if self._last_txn_counter is not None and round_number == self._last_round + 1:
+            self._push(round_number, timestamp,
+                       max(0, txn_counter - self._last_txn_counter),
+                       max(0, timestamp - self._last_timestamp))
+
+        self._last_round = round_number
+        self._last_timestamp = timestamp
+        self._last_txn_counter = txn_counter
+        for listener in self._listeners:
+            listener(round_number)
+
+        self._blocks_since_fee_refresh += 1
+        if self._blocks_since_fee_refresh >= self.fee_refresh_blocks:
+            await self._refresh_fee()
+
+    def _push(self, round_number: int, timestamp: int, txn_count: int, block_seconds: int):
+        self._blocks.append((round_number, timestamp, txn_count, block_seconds))
+        self._total_txns += txn_count
+        self._total_seconds += block_seconds
+        if len(self._blocks) > self.window:
+            _, _, old_txns, old_seconds = self._blocks.popleft()
+            self._total_txns -= old_txns
+            self._total_seconds -= old_seconds
+
+    async def _refresh_fee(self):
+        params = await self.client.get_transaction_params()
+        if params is not None:
+            self._min_fee = params.get("min-fee", self._min_fee)
+        self._blocks_since_fee_refresh = 0
+
+    def _reset(self):
+        self._blocks.clear()
+        self._total_txns = 0
+        self._total_seconds = 0
+        self._network = self.client.current_network
+        self._last_round = 0
+        self._last_timestamp = 0
+        self._last_txn_counter = None
+        self._blocks_since_fee_refresh = self.fee_refresh_blocks
+
+    def _assess_network_health(self, avg_block_seconds: float, seconds_since_last_block: float) -> str:
+        """Assess network health from block production"""
+        if seconds_since_last_block > 30:
+            return "Poor"
+        elif avg_block_seconds <= 4:
+            return "Excellent"
+        elif avg_block_seconds <= 6:
+            return "Good"
+        elif avg_block_seconds <= 10:
+            return "Fair"
+        else:
+            return "Poor"
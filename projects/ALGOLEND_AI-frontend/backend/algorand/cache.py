@@ -0,0 +1,88 @@
+"""
+Lookup Cache
+Bounded LRU cache with TTL and round-aware invalidation for Algorand lookups
+"""
+
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+class LookupCache:
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+
+        # key -> (value, expires_at, read_round); keys are (network, kind, id)
+        self._entries: "OrderedDict[Tuple[Any, ...], Tuple[Any, float, Optional[int]]]" = OrderedDict()
+        self._latest_round: Dict[str, int] = {}
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Tuple[Any, ...]) -> Optional[Any]:
+        """Return a cached value, or None if missing, expired or read at an older round"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        value, expires_at, read_round = entry
+        if expires_at <= time.monotonic() or self._is_behind_chain(key[0], read_round):
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Tuple[Any, ...], value: Any, ttl: float, read_round: Optional[int] = None):
+        """
+        Store a value for ttl seconds. Values with a read_round are also dropped
+        as soon as the chain is known to have advanced past that round.
+        """
+        if read_round is not None:
+            self.advance_round(key[0], read_round)
+
+        self._entries[key] = (value, time.monotonic() + ttl, read_round)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def advance_round(self, network: str, round_number: int):
+        """Record the latest round observed on a network"""
+        if round_number and round_number > self._latest_round.get(network, 0):
+            self._latest_round[network] = round_number
+
+    def latest_round(self, network: str) -> int:
+        """Latest round observed on a network (0 if unknown)"""
+        return self._latest_round.get(network, 0)
+
+    def invalidate(self, key: Tuple[Any, ...]):
+        """Drop a single entry"""
+        self._entries.pop(key, None)
+
+    def clear(self):
+        """Drop every entry"""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache size and hit/miss/eviction counters"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+    def _is_behind_chain(self, network: str, read_round: Optional[int]) -> bool:
+        return read_round is not None and read_round < self._latest_round.get(network, 0)
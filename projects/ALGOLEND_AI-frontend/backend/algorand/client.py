@@ -7,11 +7,27 @@ import asyncio
 import aiohttp
 import json
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, AsyncIterator, Iterable, Tuple
 import time
 
+from algorand.cache import LookupCache
+from algorand.single_flight import SingleFlight
+from algorand.endpoints import EndpointPool
+from algorand.tx_store import TransactionStore
+from algorand.tx_batch import TransactionBatch, TransactionBatchBuilder
+from algorand.codec import MSGPACK_CONTENT_TYPE, decode_msgpack, decode_state, msgpack_available, normalize_account
+
+# algod endpoints whose responses are requested as msgpack in msgpack wire format
+MSGPACK_PATH_PREFIXES = ("/v2/accounts/", "/v2/blocks/")
+
 class AlgorandClient:
-    def __init__(self):
+    def __init__(self, pool_limit: int = 100, pool_limit_per_host: int = 20,
+                 keepalive_timeout: float = 30.0, dns_cache_ttl: int = 300,
+                 request_timeout: float = 10.0, cache_max_entries: int = 10000,
+                 bulk_concurrency: Optional[int] = None,
+                 endpoints: Optional[Dict[str, Dict[str, List[str]]]] = None,
+                 endpoint_options: Optional[Dict[str, Any]] = None,
+                 wire_format: str = "json", tx_store: Optional[TransactionStore] = None):
         self.testnet_algod_url = "https://testnet-api.algonode.cloud"
         self.testnet_indexer_url = "https://testnet-idx.algonode.cloud"
         self.mainnet_algod_url = "https://mainnet-api.algonode.cloud"
@@ -19,256 +35,588 @@ class AlgorandClient:
         
         # Use testnet by default
         self.current_network = "testnet"
-        self.algod_url = self.testnet_algod_url
-        self.indexer_url = self.testnet_indexer_url
+        
+        # Endpoint pools per network and service ("algod" / "indexer"); requests are
+        # routed by health and latency, with retries, hedging and circuit breakers
+        self.network_endpoints = {
+            "testnet": {"algod": [self.testnet_algod_url], "indexer": [self.testnet_indexer_url]},
+            "mainnet": {"algod": [self.mainnet_algod_url], "indexer": [self.mainnet_indexer_url]}
+        }
+        for network, services in (endpoints or {}).items():
+            self.network_endpoints.setdefault(network, {}).update(
+                {service: list(urls) for service, urls in services.items() if urls}
+            )
+        self.endpoint_options = endpoint_options or {}
+        self._endpoint_pools: Dict[Tuple[str, str], EndpointPool] = {}
         
         # API headers
         self.headers = {
             "Content-Type": "application/json",
             "User-Agent": "AlgoLend-AI/1.0"
         }
+        
+        # algod account and block responses can be requested as msgpack (the indexer
+        # only speaks JSON); decoded payloads are normalized to the JSON shapes either way
+        if wire_format not in ("json", "msgpack"):
+            raise ValueError(f"Unsupported wire format: {wire_format}")
+        if wire_format == "msgpack" and not msgpack_available():
+            raise ValueError("msgpack wire format requires the msgpack package")
+        self.wire_format = wire_format
+        
+        # Connection pool settings (shared by every request this client makes)
+        self.pool_limit = pool_limit
+        self.pool_limit_per_host = pool_limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.request_timeout = request_timeout
+        # A pool limit of 0 means unlimited to aiohttp; bulk fetches then default to 20 workers
+        self.bulk_concurrency = bulk_concurrency or pool_limit_per_host or 20
+        self._session: Optional[aiohttp.ClientSession] = None
+        
+        # Lookup cache, keyed by (network, kind, id). Balances are also dropped once
+        # the chain moves past the round they were read at; asset and app metadata
+        # rarely change and live much longer.
+        self.cache = LookupCache(max_entries=cache_max_entries)
+        self.cache_ttl_seconds = {
+            "account": 10,
+            "asset": 3600,
+            "app": 600
+        }
+        
+        # Concurrent identical GETs share one upstream request
+        self._single_flight = SingleFlight()
+        
+        # Optional local copy of transaction history, synced incrementally per address
+        self.tx_store = tx_store
+    
+    async def start(self):
+        """Open the pooled HTTP session (called from the app lifespan)"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_limit,
+                limit_per_host=self.pool_limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                use_dns_cache=True,
+                ttl_dns_cache=self.dns_cache_ttl
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers=self.headers,
+                timeout=aiohttp.ClientTimeout(total=self.request_timeout)
+            )
+    
+    async def close(self):
+        """Close the pooled HTTP session and release its connections"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+    
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Return the pooled session, opening it lazily if start() was not called"""
+        if self._session is None or self._session.closed:
+            await self.start()
+        return self._session
+    
+    def endpoint_pool(self, service: str) -> EndpointPool:
+        """Endpoint pool for a service ("algod" or "indexer") on the current network"""
+        key = (self.current_network, service)
+        pool = self._endpoint_pools.get(key)
+        if pool is None:
+            pool = EndpointPool(self.network_endpoints[self.current_network][service], **self.endpoint_options)
+            self._endpoint_pools[key] = pool
+        return pool
+    
+    def set_endpoints(self, service: str, urls: List[str], network: Optional[str] = None):
+        """Replace the endpoints used for a service (defaults to the current network)"""
+        network = network or self.current_network
+        self.network_endpoints.setdefault(network, {})[service] = list(urls)
+        self._endpoint_pools.pop((network, service), None)
+    
+    @property
+    def algod_url(self) -> str:
+        """Preferred algod endpoint on the current network"""
+        return self.endpoint_pool("algod").primary_url
+    
+    @algod_url.setter
+    def algod_url(self, url: str):
+        self.set_endpoints("algod", [url])
+    
+    @property
+    def indexer_url(self) -> str:
+        """Preferred indexer endpoint on the current network"""
+        return self.endpoint_pool("indexer").primary_url
+    
+    @indexer_url.setter
+    def indexer_url(self, url: str):
+        self.set_endpoints("indexer", [url])
+    
+    async def _get_json(self, service: str, path: str, params: Optional[Dict[str, Any]] = None,
+                        timeout: Optional[float] = None, hedge: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        GET a JSON document from a service's endpoint pool, returning None when it does
+        not exist (404); other HTTP errors raise aiohttp.ClientResponseError once retries
+        are exhausted. Concurrent identical requests (same URL and params) share one
+        upstream call and one decoded result, so callers must treat the returned dict
+        as read-only.
+        """
+        pool = self.endpoint_pool(service)
+        if service == "algod" and self.wire_format == "msgpack" and path.startswith(MSGPACK_PATH_PREFIXES):
+            params = {**(params or {}), "format": "msgpack"}
+        key = (self.current_network, service, path, tuple(sorted((params or {}).items())))
+        return await self._single_flight.do(key, lambda: pool.request(
+            lambda base_url: self._fetch_json(f"{base_url}{path}", params, timeout), hedge=hedge
+        ))
+    
+    async def _fetch_json(self, url: str, params: Optional[Dict[str, Any]],
+                          timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        session = await self._get_session()
+        request_options: Dict[str, Any] = {}
+        if timeout is not None:
+            request_options["timeout"] = aiohttp.ClientTimeout(total=timeout)
+        async with session.get(url, headers=self.headers, params=params, **request_options) as response:
+            if response.status == 200:
+                if response.content_type == MSGPACK_CONTENT_TYPE:
+                    return decode_msgpack(await response.read())
+                return await response.json()
+            if response.status != 404:
+                response.raise_for_status()
+            return None
     
     async def get_account_info(self, address: str) -> Optional[Dict[str, Any]]:
         """Get account information from Algorand"""
         try:
-            async with aiohttp.ClientSession() as session:
-                url = f"{self.algod_url}/v2/accounts/{address}"
-                async with session.get(url, headers=self.headers) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return {
-                            "address": address,
-                            "amount": data.get("amount", 0),
-                            "created-at": data.get("created-at"),
-                            "status": data.get("status", "Offline"),
-                            "apps-local-state": data.get("apps-local-state", []),
-                            "apps-total-schema": data.get("apps-total-schema", {}),
-                            "assets": data.get("assets", []),
-                            "created-apps": data.get("created-apps", []),
-                            "created-assets": data.get("created-assets", [])
-                        }
-                    else:
-                        return None
+            return await self._fetch_account_info(address)
         except Exception as e:
             print(f"Error fetching account info: {e}")
             return None
     
+    async def get_accounts_info(self, addresses: Iterable[str],
+                                concurrency: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Fetch many accounts with bounded concurrency, yielding results as they complete.
+        Each result is {"address", "account", "error"}; a failed address never fails the batch.
+        """
+        concurrency = concurrency or self.bulk_concurrency
+        if self.pool_limit_per_host:
+            concurrency = min(concurrency, self.pool_limit_per_host)
+        concurrency = max(concurrency, 1)
+        pending_addresses = iter(addresses)
+        results: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+        
+        async def worker():
+            # Workers share one address iterator, so at most `concurrency` fetches run at once
+            for address in pending_addresses:
+                try:
+                    account = await self._fetch_account_info(address)
+                    error = None if account is not None else "Account not found"
+                except Exception as e:
+                    account, error = None, str(e) or e.__class__.__name__
+                await results.put({"address": address, "account": account, "error": error})
+            await results.put(None)
+        
+        workers = [asyncio.ensure_future(worker()) for _ in range(concurrency)]
+        finished = 0
+        try:
+            while finished < len(workers):
+                result = await results.get()
+                if result is None:
+                    finished += 1
+                else:
+                    yield result
+        finally:
+            for task in workers:
+                task.cancel()
+    
+    async def _fetch_account_info(self, address: str) -> Optional[Dict[str, Any]]:
+        """Fetch and normalize an account, raising on transport errors"""
+        cache_key = (self.current_network, "account", address)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        data = await self._get_json("algod", f"/v2/accounts/{address}")
+        if data is None:
+            return None
+        data = normalize_account(data)
+        
+        account = self._to_account(address, data)
+        self.cache.set(cache_key, account, self.cache_ttl_seconds["account"],
+                       read_round=data.get("round"))
+        return account
+    
+    def _to_account(self, address: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """The account fields the analyzers use, from an algod or indexer account record"""
+        return {
+            "address": address,
+            "amount": data.get("amount", 0),
+            "created-at": data.get("created-at"),
+            "status": data.get("status", "Offline"),
+            "apps-local-state": data.get("apps-local-state", []),
+            "apps-total-schema": data.get("apps-total-schema", {}),
+            "assets": data.get("assets", []),
+            "created-apps": data.get("created-apps", []),
+            "created-assets": data.get("created-assets", [])
+        }
+    
     async def get_transaction_history(self, address: str, limit: int = 100) -> List[Dict[str, Any]]:
         """Get transaction history for an account"""
         try:
-            async with aiohttp.ClientSession() as session:
-                url = f"{self.indexer_url}/v2/accounts/{address}/transactions"
-                params = {
-                    "limit": limit,
-                    "format": "json"
-                }
-                
-                async with session.get(url, headers=self.headers, params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        transactions = data.get("transactions", [])
-                        
-                        # Process and format transactions
-                        processed_txs = []
-                        for tx in transactions:
-                            processed_tx = {
-                                "id": tx.get("id", ""),
-                                "sender": tx.get("sender", ""),
-                                "receiver": tx.get("payment-transaction", {}).get("receiver", ""),
-                                "amount": tx.get("payment-transaction", {}).get("amount", 0),
-                                "fee": tx.get("fee", 0),
-                                "confirmed-round": tx.get("confirmed-round", 0),
-                                "round-time": tx.get("round-time", 0),
-                                "tx-type": tx.get("tx-type", ""),
-                                "note": tx.get("note", ""),
-                                "group": tx.get("group", "")
-                            }
-                            processed_txs.append(processed_tx)
-                        
-                        return processed_txs
-                    else:
-                        return []
+            path = f"/v2/accounts/{address}/transactions"
+            params = {
+                "limit": limit,
+                "format": "json"
+            }
+            
+            data = await self._get_json("indexer", path, params)
+            if data is None:
+                return []
+            
+            # Process and format transactions
+            return [self._process_transaction(tx) for tx in data.get("transactions", [])]
         except Exception as e:
             print(f"Error fetching transaction history: {e}")
             return []
     
-    async def get_network_stats(self) -> Dict[str, Any]:
-        """Get current network statistics"""
+    async def iter_transactions(self, address: str, min_round: Optional[int] = None,
+                                max_round: Optional[int] = None, page_size: int = 1000,
+                                limit: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream an account's full transaction history, following the indexer next-token.
+        The next page is fetched in the background while the current one is consumed.
+        """
+        async for tx in self._iter_raw_transactions(address, min_round, max_round, page_size, limit):
+            yield self._process_transaction(tx)
+    
+    async def iter_account_transactions(self, address: str, limit: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream an account's history, newest first. With a transaction store the address
+        is synced incrementally and served locally; otherwise it streams from the indexer.
+        """
+        async for tx in self._iter_raw_account_transactions(address, limit):
+            yield self._process_transaction(tx)
+    
+    async def get_transaction_batch(self, address: str, limit: Optional[int] = None,
+                                    strict: bool = False) -> TransactionBatch:
+        """
+        An account's history (newest first) as a columnar TransactionBatch. A failed
+        indexer page ends the history early unless strict, in which case it raises.
+        """
+        builder = TransactionBatchBuilder()
+        async for tx in self._iter_raw_account_transactions(address, limit, strict=strict):
+            builder.append_raw(tx)
+        return builder.build()
+
+    async def get_latest_transaction_round(self, address: str) -> Optional[int]:
+        """
+        Round of an account's most recent transaction (0 if it has none), read with a
+        single one-transaction indexer page. Returns None if the indexer is unavailable.
+        """
         try:
-            async with aiohttp.ClientSession() as session:
-                # Get network status
-                status_url = f"{self.algod_url}/v2/status"
-                async with session.get(status_url, headers=self.headers) as response:
-                    if response.status == 200:
-                        status_data = await response.json()
-                        
-                        # Get recent blocks for TPS calculation
-                        blocks_url = f"{self.algod_url}/v2/blocks"
-                        params = {"limit": 10}
-                        async with session.get(blocks_url, headers=self.headers, params=params) as blocks_response:
-                            if blocks_response.status == 200:
-                                blocks_data = await blocks_response.json()
-                                blocks = blocks_data.get("blocks", [])
-                                
-                                # Calculate TPS (simplified)
-                                tps = self._calculate_tps(blocks)
-                                
-                                return {
-                                    "tps": tps,
-                                    "finality_seconds": 4.5,  # Algorand's finality time
-                                    "fees_microalgos": 1000,  # Current fee
-                                    "block_height": status_data.get("last-round", 0),
-                                    "last_block_time": datetime.fromtimestamp(
-                                        status_data.get("time", 0)
-                                    ).isoformat(),
-                                    "network_health": self._assess_network_health(status_data, tps)
-                                }
-                            else:
-                                return self._get_default_network_stats()
-                    else:
-                        return self._get_default_network_stats()
+            page = await self._fetch_transaction_page(f"/v2/accounts/{address}/transactions", {"limit": 1})
         except Exception as e:
-            print(f"Error fetching network stats: {e}")
-            return self._get_default_network_stats()
-    
-    def _calculate_tps(self, blocks: List[Dict[str, Any]]) -> int:
-        """Calculate transactions per second from recent blocks"""
-        if len(blocks) < 2:
-            return 1200  # Default TPS for Algorand
+            print(f"Error fetching latest transaction: {e}")
+            return None
+        if page is None:
+            return None
+        transactions = page.get("transactions", [])
+        return transactions[0].get("confirmed-round", 0) if transactions else 0
+
+    async def _iter_raw_account_transactions(self, address: str, limit: Optional[int] = None,
+                                             strict: bool = False) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Raw indexer transactions, newest first, from the store when one is configured.
+        With strict, a failed page or sync raises instead of cutting the history short.
+        """
+        if self.tx_store is None:
+            async for tx in self._iter_raw_transactions(address, limit=limit, strict=strict):
+                yield tx
+            return
         
-        # Calculate TPS based on recent blocks
-        total_txs = sum(block.get("txns", {}).get("num", 0) for block in blocks)
-        time_span = len(blocks) * 4.5  # 4.5 seconds per block
+        try:
+            await self.sync_transactions(address)
+        except Exception as e:
+            if strict:
+                raise
+            # Serve whatever is stored; the next analysis resumes from the checkpoint
+            print(f"Error syncing transactions: {e}")
         
-        if time_span > 0:
-            tps = int(total_txs / time_span)
-            return max(1000, min(2000, tps))  # Reasonable range
-        else:
-            return 1200
-    
-    def _assess_network_health(self, status_data: Dict[str, Any], tps: int) -> str:
-        """Assess overall network health"""
-        if tps >= 1000 and status_data.get("last-round", 0) > 0:
-            return "Excellent"
-        elif tps >= 800:
-            return "Good"
-        elif tps >= 600:
-            return "Fair"
-        else:
-            return "Poor"
+        network = self.current_network
+        yielded = 0
+        before = None
+        while limit is None or yielded < limit:
+            batch_size = self.tx_store.read_batch_size
+            if limit is not None:
+                batch_size = min(batch_size, limit - yielded)
+            rows = await self.tx_store.read_transactions(network, address, before=before, limit=batch_size)
+            for tx in rows:
+                yield tx
+            yielded += len(rows)
+            if len(rows) < batch_size:
+                return
+            last = rows[-1]
+            before = (last.get("confirmed-round", 0), last.get("intra-round-offset", 0), last.get("id", ""))
     
-    def _get_default_network_stats(self) -> Dict[str, Any]:
-        """Get dynamic network stats with realistic variations"""
-        import random
-        
-        # Generate realistic TPS variations (Algorand can handle 1000-6000 TPS)
-        base_tps = 1200
-        tps_variation = random.uniform(-200, 800)
-        current_tps = max(800, int(base_tps + tps_variation))
-        
-        # Use realistic block height close to actual testnet
-        base_block = 55309000  # Close to real testnet height
-        # Small progression to simulate real block advancement
-        time_elapsed = (datetime.now().timestamp() % 3600) / 4.5  # blocks in current hour
-        current_block = int(base_block + time_elapsed + random.uniform(-5, 15))
+    async def _iter_raw_transactions(self, address: str, min_round: Optional[int] = None,
+                                     max_round: Optional[int] = None, page_size: int = 1000,
+                                     limit: Optional[int] = None,
+                                     strict: bool = False) -> AsyncIterator[Dict[str, Any]]:
+        """Raw indexer transactions across pages; a failed page ends the stream, or raises if strict"""
+        yielded = 0
+        try:
+            async for page in self._iter_transaction_pages(address, min_round, max_round, page_size, limit):
+                for tx in page.get("transactions", []):
+                    if limit is not None and yielded >= limit:
+                        return
+                    yield tx
+                    yielded += 1
+        except Exception as e:
+            if strict:
+                raise
+            print(f"Error fetching transaction page: {e}")
+    
+    async def iter_transaction_updates(self, address: str,
+                                       min_round: Optional[int] = None) -> AsyncIterator[Tuple[int, List[Dict[str, Any]]]]:
+        """
+        Yield (indexer round, processed transactions) per page of an account's history
+        from min_round on. Unlike iter_transactions, errors propagate, so a caller can
+        tell a complete walk (covering everything up to the first round) from a cut-off one.
+        """
+        async for page in self._iter_transaction_pages(address, min_round=min_round):
+            yield page.get("current-round", 0), [self._process_transaction(tx) for tx in page.get("transactions", [])]
+    
+    async def get_round_transactions(self, round_number: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        Every transaction confirmed in a round, from the indexer. Returns None while
+        the indexer has not caught up to that round yet; errors propagate.
+        """
+        params: Dict[str, Any] = {"round": round_number, "limit": 1000}
+        transactions: List[Dict[str, Any]] = []
+        while True:
+            page = await self._fetch_transaction_page("/v2/transactions", params)
+            if page is None or page.get("current-round", 0) < round_number:
+                return None
+            transactions.extend(self._process_transaction(tx) for tx in page.get("transactions", []))
+            next_token = page.get("next-token")
+            if not next_token or not page.get("transactions"):
+                return transactions
+            params = {**params, "next": next_token}
+    
+    async def sync_transactions(self, address: str) -> int:
+        """
+        Bring the local store up to date for an address, fetching only rounds after
+        its checkpoint. Returns the number of transactions fetched. Concurrent syncs
+        of the same address share one indexer walk.
+        """
+        if self.tx_store is None:
+            raise RuntimeError("sync_transactions requires a transaction store")
+        network = self.current_network
+        return await self._single_flight.do(
+            ("sync", network, address), lambda: self._sync_transactions(network, address)
+        )
+    
+    async def _sync_transactions(self, network: str, address: str) -> int:
+        checkpoint = await self.tx_store.get_checkpoint(network, address)
+        min_round = checkpoint + 1 if checkpoint is not None else None
         
-        # Dynamic fees based on network congestion
-        base_fee = 1000
-        congestion_multiplier = 1 + (current_tps - 1200) / 2000
-        current_fee = max(1000, int(base_fee * congestion_multiplier))
+        # Everything up to the indexer's round at the first page is covered once the
+        # walk completes; the checkpoint only advances after every page was stored
+        synced_round = None
+        fetched = 0
+        async for page in self._iter_transaction_pages(address, min_round=min_round):
+            if synced_round is None:
+                synced_round = page.get("current-round")
+            transactions = page.get("transactions", [])
+            if transactions:
+                fetched += await self.tx_store.save_transactions(network, address, transactions)
         
-        # Network health based on TPS
-        if current_tps >= 2000:
-            health = "Excellent"
-        elif current_tps >= 1500:
-            health = "Good" 
-        elif current_tps >= 1000:
-            health = "Fair"
-        else:
-            health = "Poor"
+        if synced_round:
+            await self.tx_store.set_checkpoint(network, address, synced_round)
+        return fetched
+    
+    async def _iter_transaction_pages(self, address: str, min_round: Optional[int] = None,
+                                      max_round: Optional[int] = None, page_size: int = 1000,
+                                      limit: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Raw indexer transaction pages, prefetching the next page; errors propagate"""
+        path = f"/v2/accounts/{address}/transactions"
+        params: Dict[str, Any] = {"limit": page_size}
+        if min_round is not None:
+            params["min-round"] = min_round
+        if max_round is not None:
+            params["max-round"] = max_round
         
+        pending = asyncio.ensure_future(self._fetch_transaction_page(path, params))
+        fetched = 0
+        try:
+            while pending is not None:
+                page = await pending
+                pending = None
+                if not page:
+                    return
+                
+                transactions = page.get("transactions", [])
+                fetched += len(transactions)
+                next_token = page.get("next-token")
+                if next_token and transactions and (limit is None or fetched < limit):
+                    pending = asyncio.ensure_future(
+                        self._fetch_transaction_page(path, {**params, "next": next_token})
+                    )
+                yield page
+        finally:
+            if pending is not None:
+                pending.cancel()
+    
+    async def _fetch_transaction_page(self, path: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Fetch one raw indexer transaction page"""
+        page = await self._get_json("indexer", path, params)
+        if page is not None:
+            self.cache.advance_round(self.current_network, page.get("current-round", 0))
+        return page
+    
+    def _process_transaction(self, tx: Dict[str, Any]) -> Dict[str, Any]:
+        """Normalize a raw indexer transaction"""
         return {
-            "tps": current_tps,
-            "finality_seconds": 4.5,
-            "fees_microalgos": current_fee,
-            "block_height": current_block,
-            "last_block_time": datetime.now().isoformat(),
-            "network_health": health
+            "id": tx.get("id", ""),
+            "sender": tx.get("sender", ""),
+            "receiver": tx.get("payment-transaction", {}).get("receiver", ""),
+            "amount": tx.get("payment-transaction", {}).get("amount", 0),
+            "fee": tx.get("fee", 0),
+            "confirmed-round": tx.get("confirmed-round", 0),
+            "round-time": tx.get("round-time", 0),
+            "tx-type": tx.get("tx-type", ""),
+            "note": tx.get("note", ""),
+            "group": tx.get("group", "")
         }
     
     async def get_asset_info(self, asset_id: int) -> Optional[Dict[str, Any]]:
         """Get asset information"""
+        cache_key = (self.current_network, "asset", asset_id)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
-            async with aiohttp.ClientSession() as session:
-                url = f"{self.algod_url}/v2/assets/{asset_id}"
-                async with session.get(url, headers=self.headers) as response:
-                    if response.status == 200:
-                        return await response.json()
-                    else:
-                        return None
+            data = await self._get_json("algod", f"/v2/assets/{asset_id}")
+            if data is not None:
+                self.cache.set(cache_key, data, self.cache_ttl_seconds["asset"])
+            return data
         except Exception as e:
             print(f"Error fetching asset info: {e}")
             return None
     
-    async def get_app_info(self, app_id: int) -> Optional[Dict[str, Any]]:
-        """Get application information"""
+    async def get_app_info(self, app_id: int, refresh: bool = False) -> Optional[Dict[str, Any]]:
+        """Get application information (refresh skips the cache, e.g. for per-round global state)"""
+        cache_key = (self.current_network, "app", app_id)
+        cached = self.cache.get(cache_key) if not refresh else None
+        if cached is not None:
+            return cached
+        
         try:
-            async with aiohttp.ClientSession() as session:
-                url = f"{self.algod_url}/v2/applications/{app_id}"
-                async with session.get(url, headers=self.headers) as response:
-                    if response.status == 200:
-                        return await response.json()
-                    else:
-                        return None
+            data = await self._get_json("algod", f"/v2/applications/{app_id}")
+            if data is not None:
+                self.cache.set(cache_key, data, self.cache_ttl_seconds["app"])
+            return data
         except Exception as e:
             print(f"Error fetching app info: {e}")
             return None
     
+    async def iter_application_accounts(self, app_id: int, next_token: Optional[str] = None,
+                                        page_size: int = 1000) -> AsyncIterator[Tuple[List[Dict[str, Any]], Optional[str]]]:
+        """
+        Page through every account opted into an application, from the indexer. Yields
+        (accounts, next token) per page; each account carries the application's decoded
+        local state under "app-local-state". Start from a saved next token to resume a
+        walk; errors propagate.
+        """
+        params: Dict[str, Any] = {"application-id": app_id, "limit": page_size}
+        while True:
+            page = await self._get_json("indexer", "/v2/accounts", {**params, "next": next_token} if next_token else params)
+            if page is None:
+                return
+            self.cache.advance_round(self.current_network, page.get("current-round", 0))
+            accounts = []
+            for data in page.get("accounts", []):
+                account = self._to_account(data.get("address", ""), data)
+                account["app-local-state"] = next(
+                    (decode_state(state.get("key-value", [])) for state in account["apps-local-state"]
+                     if state.get("id") == app_id), {}
+                )
+                accounts.append(account)
+            next_token = page.get("next-token")
+            if not accounts or not next_token:
+                yield accounts, None
+                return
+            yield accounts, next_token
+    
     async def get_block_info(self, round_number: int) -> Optional[Dict[str, Any]]:
         """Get block information"""
         try:
-            async with aiohttp.ClientSession() as session:
-                url = f"{self.algod_url}/v2/blocks/{round_number}"
-                async with session.get(url, headers=self.headers) as response:
-                    if response.status == 200:
-                        return await response.json()
-                    else:
-                        return None
+            return await self._get_json("algod", f"/v2/blocks/{round_number}")
         except Exception as e:
             print(f"Error fetching block info: {e}")
             return None
     
+    async def get_status(self) -> Optional[Dict[str, Any]]:
+        """Get the algod node status (raises on transport errors)"""
+        status = await self._get_json("algod", "/v2/status")
+        if status is not None:
+            self.cache.advance_round(self.current_network, status.get("last-round", 0))
+        return status
+    
+    async def wait_for_block_after(self, round_number: int, timeout: float = 90.0) -> Optional[Dict[str, Any]]:
+        """Wait until a round after round_number is committed and return the node status (raises on transport errors)"""
+        status = await self._get_json(
+            "algod", f"/v2/status/wait-for-block-after/{round_number}", timeout=timeout, hedge=False
+        )
+        if status is not None:
+            self.cache.advance_round(self.current_network, status.get("last-round", 0))
+        return status
+    
+    async def get_block_header(self, round_number: int) -> Optional[Dict[str, Any]]:
+        """Get a block header without its transactions (raises on transport errors)"""
+        data = await self._get_json("algod", f"/v2/blocks/{round_number}", {"header-only": "true"})
+        return data.get("block") if data is not None else None
+    
+    async def get_transaction_params(self) -> Optional[Dict[str, Any]]:
+        """Get suggested transaction parameters (raises on transport errors)"""
+        return await self._get_json("algod", "/v2/transactions/params")
+    
     def switch_network(self, network: str):
         """Switch between testnet and mainnet"""
         if network == "mainnet":
             self.current_network = "mainnet"
-            self.algod_url = self.mainnet_algod_url
-            self.indexer_url = self.mainnet_indexer_url
         else:
             self.current_network = "testnet"
-            self.algod_url = self.testnet_algod_url
-            self.indexer_url = self.testnet_indexer_url
     
     async def health_check(self) -> Dict[str, Any]:
         """Check if Algorand client is healthy"""
         try:
-            async with aiohttp.ClientSession() as session:
-                url = f"{self.algod_url}/v2/status"
-                async with session.get(url, headers=self.headers, timeout=5) as response:
-                    if response.status == 200:
-                        return {
-                            "status": "healthy",
-                            "network": self.current_network,
-                            "algod_url": self.algod_url,
-                            "indexer_url": self.indexer_url,
-                            "timestamp": datetime.now().isoformat()
-                        }
-                    else:
-                        return {
-                            "status": "unhealthy",
-                            "error": f"HTTP {response.status}",
-                            "timestamp": datetime.now().isoformat()
-                        }
+            session = await self._get_session()
+            url = f"{self.algod_url}/v2/status"
+            async with session.get(url, headers=self.headers, timeout=aiohttp.ClientTimeout(total=5)) as response:
+                if response.status == 200:
+                    status_data = await response.json()
+                    self.cache.advance_round(self.current_network, status_data.get("last-round", 0))
+                    return {
+                        "status": "healthy",
+                        "network": self.current_network,
+                        "algod_url": self.algod_url,
+                        "indexer_url": self.indexer_url,
+                        "last_round": status_data.get("last-round", 0),
+                        "cache": self.cache.stats(),
+                        "single_flight": self._single_flight.stats(),
+                        "tx_store": self.tx_store.stats() if self.tx_store is not None else None,
+                        "endpoints": {
+                            service: self.endpoint_pool(service).stats()
+                            for service in ("algod", "indexer")
+                        },
+                        "timestamp": datetime.now().isoformat()
+                    }
+                else:
+                    return {
+                        "status": "unhealthy",
+                        "error": f"HTTP {response.status}",
+                        "timestamp": datetime.now().isoformat()
+                    }
         except Exception as e:
             return {
                 "status": "unhealthy",
@@ -0,0 +1,96 @@
+"""
+Wire Codec
+Decodes algod msgpack responses into the same dicts the JSON API returns
+"""
+
+import base64
+from typing import Dict, List, Any
+
+try:
+    import msgpack
+except ImportError:  # msgpack is only needed for the opt-in msgpack wire format
+    msgpack = None
+
+MSGPACK_CONTENT_TYPE = "application/msgpack"
+
+ACCOUNT_STATUS_NAMES = {0: "Offline", 1: "Online", 2: "NotParticipating"}
+
+def msgpack_available() -> bool:
+    return msgpack is not None
+
+def decode_msgpack(payload: bytes) -> Any:
+    """Decode a msgpack body, turning binary fields into base64 strings as the JSON API does"""
+    if msgpack is None:
+        raise RuntimeError("msgpack wire format requested but the msgpack package is not installed")
+    return _to_json_types(msgpack.unpackb(payload, raw=False, strict_map_key=False))
+
+def normalize_account(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Map an account record onto the JSON field names. algod encodes msgpack account
+    records with the ledger's short field names ("algo", "onl", "asset", ...); JSON
+    records are returned unchanged. The round the record was read at is kept.
+    """
+    if "amount" in data or "algo" not in data and "onl" not in data:
+        return data
+
+    return {
+        "round": data.get("round"),
+        "amount": data.get("algo", 0),
+        "status": ACCOUNT_STATUS_NAMES.get(data.get("onl", 0), "Offline"),
+        "apps-local-state": [
+            {"id": app_id, "schema": _schema(state.get("hsch", {})), "key-value": _key_values(state.get("tkv", {}))}
+            for app_id, state in data.get("appl", {}).items()
+        ],
+        "apps-total-schema": _schema(data.get("tsch", {})),
+        "assets": [
+            {"asset-id": asset_id, "amount": holding.get("a", 0), "is-frozen": holding.get("f", False)}
+            for asset_id, holding in data.get("asset", {}).items()
+        ],
+        "created-apps": [
+            {"id": app_id, "params": params}
+            for app_id, params in data.get("appp", {}).items()
+        ],
+        "created-assets": [
+            {"index": asset_id, "params": params}
+            for asset_id, params in data.get("apar", {}).items()
+        ]
+    }
+
+def decode_state(key_values: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Application state as {key: value} from a JSON "key-value" list: base64 keys are
+    decoded to text, uint values become ints and byte values stay base64 strings
+    """
+    state = {}
+    for entry in key_values:
+        try:
+            key = base64.b64decode(entry.get("key", "")).decode()
+        except (ValueError, UnicodeDecodeError):
+            key = entry.get("key", "")
+        value = entry.get("value", {})
+        state[key] = value.get("uint", 0) if value.get("type") == 2 else value.get("bytes", "")
+    return state
+
+def _schema(schema: Dict[str, Any]) -> Dict[str, Any]:
+    return {"num-uint": schema.get("nui", 0), "num-byte-slice": schema.get("nbs", 0)}
+
+def _key_values(key_values: Dict[str, Any]) -> List[Dict[str, Any]]:
+    # Ledger TEAL values: tt 1 = bytes ("tb"), tt 2 = uint ("ui")
+    return [
+        {"key": key, "value": {"type": value.get("tt", 0), "bytes": value.get("tb", ""), "uint": value.get("ui", 0)}}
+        for key, value in key_values.items()
+    ]
+
+def _to_json_types(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {_to_json_key(key): _to_json_types(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_to_json_types(item) for item in value]
+    if isinstance(value, (bytes, bytearray)):
+        return base64.b64encode(value).decode()
+    return value
+
+def _to_json_key(key: Any) -> Any:
+    if isinstance(key, (bytes, bytearray)):
+        return base64.b64encode(key).decode()
+    return key
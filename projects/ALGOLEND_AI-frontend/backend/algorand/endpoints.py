@@ -0,0 +1,248 @@
+"""
+Endpoint Pool
+Routes requests across redundant algod/indexer endpoints with retries,
+hedged requests and per-endpoint circuit breakers
+"""
+
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Dict, List, Any, Optional, Awaitable, Callable, Deque, Set
+
+import aiohttp
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+class NoEndpointAvailable(Exception):
+    """Raised when every endpoint in a pool is failing fast behind an open circuit breaker"""
+
+def is_retryable(error: BaseException) -> bool:
+    """Transport failures, timeouts and overload/server errors are worth retrying elsewhere"""
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status in RETRYABLE_STATUSES
+    return isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError))
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        """closed (healthy), open (failing fast) or half_open (ready for one trial request)"""
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow_request(self) -> bool:
+        """Whether a request may be sent now; a half-open breaker admits a single probe"""
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        self._probe_in_flight = False
+        if self.opened_at is not None or self.consecutive_failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+    def release_probe(self):
+        """Give back a half-open probe whose request was abandoned"""
+        self._probe_in_flight = False
+
+class Endpoint:
+    def __init__(self, url: str, breaker: CircuitBreaker, sample_size: int = 200):
+        self.url = url.rstrip("/")
+        self.breaker = breaker
+        self.latencies: Deque[float] = deque(maxlen=sample_size)
+        self.ewma_latency: Optional[float] = None
+        self.in_flight = 0
+        self.successes = 0
+        self.failures = 0
+
+    def record_success(self, latency: float):
+        self.successes += 1
+        self.latencies.append(latency)
+        if self.ewma_latency is None:
+            self.ewma_latency = latency
+        else:
+            self.ewma_latency = 0.8 * self.ewma_latency + 0.2 * latency
+        self.breaker.record_success()
+
+    def record_failure(self):
+        self.failures += 1
+        self.breaker.record_failure()
+
+    def score(self) -> float:
+        """Routing cost (lower is better); endpoints with no history are tried first"""
+        latency = self.ewma_latency or 0.0
+        return latency * (1 + self.in_flight) + self.breaker.consecutive_failures
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "state": self.breaker.state,
+            "ewma_latency_ms": round(self.ewma_latency * 1000, 2) if self.ewma_latency is not None else None,
+            "in_flight": self.in_flight,
+            "successes": self.successes,
+            "failures": self.failures
+        }
+
+class EndpointPool:
+    def __init__(self, urls: List[str], max_retries: int = 2, backoff_base: float = 0.1,
+                 backoff_max: float = 2.0, hedging: bool = True, hedge_percentile: float = 0.95,
+                 min_hedge_delay: float = 0.05, default_hedge_delay: float = 0.5,
+                 failure_threshold: int = 5, reset_timeout: float = 30.0):
+        if not urls:
+            raise ValueError("EndpointPool needs at least one endpoint URL")
+        self.endpoints = [Endpoint(url, CircuitBreaker(failure_threshold, reset_timeout)) for url in urls]
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedging = hedging
+        self.hedge_percentile = hedge_percentile
+        self.min_hedge_delay = min_hedge_delay
+        self.default_hedge_delay = default_hedge_delay
+
+        # Counters
+        self.requests = 0
+        self.retries = 0
+        self.hedged = 0
+        self.failovers = 0
+
+    @property
+    def primary_url(self) -> str:
+        """URL of the endpoint currently preferred for routing"""
+        return min(self.endpoints, key=self._rank_key).url
+
+    def hedge_delay(self) -> float:
+        """Wait this long for the primary before sending a hedged request elsewhere"""
+        samples = sorted(latency for endpoint in self.endpoints for latency in endpoint.latencies)
+        if len(samples) < 20:
+            return self.default_hedge_delay
+        index = min(len(samples) - 1, int(len(samples) * self.hedge_percentile))
+        return max(self.min_hedge_delay, samples[index])
+
+    async def request(self, fn: Callable[[str], Awaitable[Any]], hedge: bool = True) -> Any:
+        """
+        Call fn(base_url) against the best available endpoint. Retryable failures fail
+        over to the next endpoint and are retried with exponential backoff; a slow
+        primary gets a hedged duplicate on a second endpoint. Long-polling or
+        non-idempotent calls should pass hedge=False.
+        """
+        self.requests += 1
+        last_error: Optional[BaseException] = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self.retries += 1
+                await asyncio.sleep(self._backoff(attempt))
+            try:
+                return await self._attempt(fn, hedge and self.hedging)
+            except Exception as e:
+                if not is_retryable(e) and not isinstance(e, NoEndpointAvailable):
+                    raise
+                last_error = e
+        raise last_error
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "hedged": self.hedged,
+            "failovers": self.failovers,
+            "hedge_delay_ms": round(self.hedge_delay() * 1000, 2),
+            "endpoints": [endpoint.stats() for endpoint in self.endpoints]
+        }
+
+    async def _attempt(self, fn: Callable[[str], Awaitable[Any]], hedge: bool) -> Any:
+        primary = self._next_endpoint(set())
+        if primary is None:
+            raise NoEndpointAvailable("all endpoints have open circuit breakers")
+
+        used = {primary.url}
+        tasks = {asyncio.ensure_future(self._call(fn, primary))}
+        error: Optional[BaseException] = None
+        try:
+            while tasks:
+                timeout = self.hedge_delay() if hedge and len(used) < len(self.endpoints) else None
+                done, _ = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    # Primary is slow: race a duplicate on another endpoint
+                    backup = self._next_endpoint(used)
+                    if backup is None:
+                        hedge = False
+                        continue
+                    self.hedged += 1
+                    used.add(backup.url)
+                    tasks.add(asyncio.ensure_future(self._call(fn, backup)))
+                    continue
+
+                for task in done:
+                    tasks.discard(task)
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+                    if not is_retryable(error):
+                        raise error
+
+                if not tasks:
+                    # Failed fast: fail over immediately rather than waiting for a retry
+                    backup = self._next_endpoint(used)
+                    if backup is not None:
+                        self.failovers += 1
+                        used.add(backup.url)
+                        tasks.add(asyncio.ensure_future(self._call(fn, backup)))
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _call(self, fn: Callable[[str], Awaitable[Any]], endpoint: Endpoint) -> Any:
+        endpoint.in_flight += 1
+        start = time.monotonic()
+        try:
+            result = await fn(endpoint.url)
+        except asyncio.CancelledError:
+            endpoint.breaker.release_probe()
+            raise
+        except Exception as e:
+            if is_retryable(e):
+                endpoint.record_failure()
+            else:
+                # The endpoint answered; the request itself was bad
+                endpoint.record_success(time.monotonic() - start)
+            raise
+        else:
+            endpoint.record_success(time.monotonic() - start)
+            return result
+        finally:
+            endpoint.in_flight -= 1
+
+    def _next_endpoint(self, exclude: Set[str]) -> Optional[Endpoint]:
+        for endpoint in sorted(self.endpoints, key=self._rank_key):
+            if endpoint.url not in exclude and endpoint.breaker.allow_request():
+                return endpoint
+        return None
+
+    def _rank_key(self, endpoint: Endpoint):
+        return (endpoint.breaker.state == "open", endpoint.score())
+
+    def _backoff(self, attempt: int) -> float:
+        delay = min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1)))
+        return delay * random.uniform(0.5, 1.0)
\ No newline at end of file
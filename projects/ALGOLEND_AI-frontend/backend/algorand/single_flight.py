@@ -0,0 +1,49 @@
+"""
+Single Flight
+Coalesces concurrent identical upstream requests into one in-flight call
+"""
+
+import asyncio
+from typing import Dict, Any, Awaitable, Callable, Hashable
+
+class SingleFlight:
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+        # Counters
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run fn() for key, or join the call already in flight for the same key.
+        Every waiter receives the same result object (or the same exception);
+        the key is released as soon as the call settles, so a failure only
+        affects callers that were already waiting on it.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._release(key, done))
+            self.leaders += 1
+        else:
+            self.coalesced += 1
+
+        # Shield so one cancelled waiter does not cancel the call for the others
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, Any]:
+        """In-flight and coalescing counters"""
+        return {
+            "in_flight": len(self._inflight),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced
+        }
+
+    def _release(self, key: Hashable, task: asyncio.Future):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception as retrieved in case every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
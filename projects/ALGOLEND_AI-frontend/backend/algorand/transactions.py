@@ -7,21 +7,90 @@ import asyncio
 import aiohttp
 import json
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 import base64
 
+from algorand.endpoints import EndpointPool, RETRYABLE_STATUSES
+
 class TransactionHelper:
-    def __init__(self):
+    def __init__(self, endpoints: Optional[Dict[str, List[str]]] = None,
+                 endpoint_options: Optional[Dict[str, Any]] = None, request_timeout: float = 10.0,
+                 pool_limit_per_host: int = 20):
         self.testnet_algod_url = "https://testnet-api.algonode.cloud"
         self.mainnet_algod_url = "https://mainnet-api.algonode.cloud"
         self.current_network = "testnet"
-        self.algod_url = self.testnet_algod_url
+        
+        # algod endpoint pools per network (retries, hedging and circuit breakers)
+        self.network_endpoints = {
+            "testnet": [self.testnet_algod_url],
+            "mainnet": [self.mainnet_algod_url]
+        }
+        self.network_endpoints.update({network: list(urls) for network, urls in (endpoints or {}).items() if urls})
+        self.endpoint_options = endpoint_options or {}
+        self._endpoint_pools: Dict[str, EndpointPool] = {}
+        
+        # One pooled session; each attempt is bounded by request_timeout, so a hung
+        # endpoint fails over instead of stalling the call
+        self.request_timeout = request_timeout
+        self.pool_limit_per_host = pool_limit_per_host
+        self._session: Optional[aiohttp.ClientSession] = None
         
         self.headers = {
             "Content-Type": "application/json",
             "User-Agent": "AlgoLend-AI/1.0"
         }
     
+    async def start(self):
+        """Open the pooled HTTP session (called from the app lifespan)"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit_per_host=self.pool_limit_per_host),
+                headers=self.headers,
+                timeout=aiohttp.ClientTimeout(total=self.request_timeout)
+            )
+    
+    async def close(self):
+        """Close the pooled HTTP session and release its connections"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+    
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Return the pooled session, opening it lazily if start() was not called"""
+        if self._session is None or self._session.closed:
+            await self.start()
+        return self._session
+    
+    @property
+    def algod_url(self) -> str:
+        """Preferred algod endpoint on the current network"""
+        return self._endpoint_pool().primary_url
+    
+    def _endpoint_pool(self) -> EndpointPool:
+        pool = self._endpoint_pools.get(self.current_network)
+        if pool is None:
+            pool = EndpointPool(self.network_endpoints[self.current_network], **self.endpoint_options)
+            self._endpoint_pools[self.current_network] = pool
+        return pool
+    
+    async def _request(self, method: str, path: str, data: Any = None, hedge: bool = True) -> Tuple[int, Any]:
+        """
+        Send a request to algod through the endpoint pool, returning (status, body).
+        Overload and server errors and attempts that exceed request_timeout are
+        retried on other endpoints before being raised.
+        """
+        session = await self._get_session()
+        
+        async def send(base_url: str) -> Tuple[int, Any]:
+            async with session.request(method, f"{base_url}{path}", data=data) as response:
+                if response.status in RETRYABLE_STATUSES:
+                    response.raise_for_status()
+                if response.status == 200:
+                    return response.status, await response.json()
+                return response.status, await response.text()
+        
+        return await self._endpoint_pool().request(send, hedge=hedge)
+    
     async def create_payment_transaction(self, sender: str, receiver: str, amount_microalgos: int, 
                                       note: str = "", fee: int = 1000) -> Optional[Dict[str, Any]]:
         """Create a payment transaction"""
@@ -114,24 +183,20 @@ class TransactionHelper:
     async def submit_transaction(self, signed_transaction: str) -> Optional[Dict[str, Any]]:
         """Submit a signed transaction to the network"""
         try:
-            async with aiohttp.ClientSession() as session:
-                url = f"{self.algod_url}/v2/transactions"
-                data = signed_transaction
-                
-                async with session.post(url, headers=self.headers, data=data) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        return {
-                            "txid": result.get("txid", ""),
-                            "confirmed": False,
-                            "status": "pending"
-                        }
-                    else:
-                        error_text = await response.text()
-                        return {
-                            "error": f"Transaction submission failed: {response.status}",
-                            "details": error_text
-                        }
+            # Resubmitting the same signed transaction is safe (algod rejects duplicates),
+            # but it is never hedged
+            status, body = await self._request("POST", "/v2/transactions", data=signed_transaction, hedge=False)
+            if status == 200:
+                return {
+                    "txid": body.get("txid", ""),
+                    "confirmed": False,
+                    "status": "pending"
+                }
+            else:
+                return {
+                    "error": f"Transaction submission failed: {status}",
+                    "details": body
+                }
         except Exception as e:
             return {
                 "error": f"Transaction submission error: {str(e)}"
@@ -143,29 +208,26 @@ class TransactionHelper:
             start_time = datetime.now()
             
             while (datetime.now() - start_time).seconds < timeout:
-                async with aiohttp.ClientSession() as session:
-                    url = f"{self.algod_url}/v2/transactions/{txid}"
-                    async with session.get(url, headers=self.headers) as response:
-                        if response.status == 200:
-                            tx_data = await response.json()
-                            if tx_data.get("confirmed-round"):
-                                return {
-                                    "txid": txid,
-                                    "confirmed": True,
-                                    "confirmed_round": tx_data.get("confirmed-round"),
-                                    "status": "confirmed"
-                                }
-                        elif response.status == 404:
-                            # Transaction not found yet, continue waiting
-                            await asyncio.sleep(1)
-                            continue
-                        else:
-                            return {
-                                "txid": txid,
-                                "confirmed": False,
-                                "status": "error",
-                                "error": f"HTTP {response.status}"
-                            }
+                status, tx_data = await self._request("GET", f"/v2/transactions/{txid}")
+                if status == 200:
+                    if tx_data.get("confirmed-round"):
+                        return {
+                            "txid": txid,
+                            "confirmed": True,
+                            "confirmed_round": tx_data.get("confirmed-round"),
+                            "status": "confirmed"
+                        }
+                elif status == 404:
+                    # Transaction not found yet, continue waiting
+                    await asyncio.sleep(1)
+                    continue
+                else:
+                    return {
+                        "txid": txid,
+                        "confirmed": False,
+                        "status": "error",
+                        "error": f"HTTP {status}"
+                    }
                 
                 await asyncio.sleep(1)
             
@@ -186,30 +248,27 @@ class TransactionHelper:
     async def get_transaction_status(self, txid: str) -> Optional[Dict[str, Any]]:
         """Get current status of a transaction"""
         try:
-            async with aiohttp.ClientSession() as session:
-                url = f"{self.algod_url}/v2/transactions/{txid}"
-                async with session.get(url, headers=self.headers) as response:
-                    if response.status == 200:
-                        tx_data = await response.json()
-                        return {
-                            "txid": txid,
-                            "confirmed": bool(tx_data.get("confirmed-round")),
-                            "confirmed_round": tx_data.get("confirmed-round"),
-                            "status": "confirmed" if tx_data.get("confirmed-round") else "pending"
-                        }
-                    elif response.status == 404:
-                        return {
-                            "txid": txid,
-                            "confirmed": False,
-                            "status": "not_found"
-                        }
-                    else:
-                        return {
-                            "txid": txid,
-                            "confirmed": False,
-                            "status": "error",
-                            "error": f"HTTP {response.status}"
-                        }
+            status, tx_data = await self._request("GET", f"/v2/transactions/{txid}")
+            if status == 200:
+                return {
+                    "txid": txid,
+                    "confirmed": bool(tx_data.get("confirmed-round")),
+                    "confirmed_round": tx_data.get("confirmed-round"),
+                    "status": "confirmed" if tx_data.get("confirmed-round") else "pending"
+                }
+            elif status == 404:
+                return {
+                    "txid": txid,
+                    "confirmed": False,
+                    "status": "not_found"
+                }
+            else:
+                return {
+                    "txid": txid,
+                    "confirmed": False,
+                    "status": "error",
+                    "error": f"HTTP {status}"
+                }
         except Exception as e:
             return {
                 "txid": txid,
@@ -221,13 +280,11 @@ class TransactionHelper:
     async def _get_suggested_params(self) -> Optional[Dict[str, Any]]:
         """Get suggested transaction parameters"""
         try:
-            async with aiohttp.ClientSession() as session:
-                url = f"{self.algod_url}/v2/transactions/params"
-                async with session.get(url, headers=self.headers) as response:
-                    if response.status == 200:
-                        return await response.json()
-                    else:
-                        return None
+            status, params = await self._request("GET", "/v2/transactions/params")
+            if status == 200:
+                return params
+            else:
+                return None
         except Exception as e:
             print(f"Error getting suggested params: {e}")
             return None
@@ -283,10 +340,8 @@ class TransactionHelper:
         """Switch between testnet and mainnet"""
         if network == "mainnet":
             self.current_network = "mainnet"
-            self.algod_url = self.mainnet_algod_url
         else:
             self.current_network = "testnet"
-            self.algod_url = self.testnet_algod_url
     
     async def get_transaction_fee_estimate(self, transaction_type: str = "payment") -> int:
         """Get estimated transaction fee"""
@@ -0,0 +1,185 @@
+"""
+Transaction Batch
+Columnar, array-backed representation of an account's transaction history
+"""
+
+import struct
+from array import array
+from typing import Dict, List, Any, Iterable, Iterator, Optional
+
+import numpy as np
+
+# Wire layout: transaction count and address table size, the int64 columns, the int32
+# id columns, then the address table as newline-separated UTF-8
+_HEADER = struct.Struct("<QQ")
+_INT64_COLUMNS = ("amounts", "fees", "rounds", "times")
+_INT32_COLUMNS = ("senders", "receivers")
+
+class TransactionBatch:
+    """
+    Transactions stored column by column: amounts, fees, rounds and times as int64
+    arrays, senders and receivers as int32 ids into a shared address table (-1 when
+    absent). Slicing returns a view over the same buffers; nothing is copied.
+    """
+
+    def __init__(self, amounts: np.ndarray, fees: np.ndarray, rounds: np.ndarray, times: np.ndarray,
+                 senders: np.ndarray, receivers: np.ndarray, addresses: List[str]):
+        self.amounts = amounts
+        self.fees = fees
+        self.rounds = rounds
+        self.times = times
+        self.senders = senders
+        self.receivers = receivers
+        self.addresses = addresses
+
+    @classmethod
+    def empty(cls) -> "TransactionBatch":
+        return TransactionBatchBuilder().build()
+
+    @classmethod
+    def from_transactions(cls, transactions: Iterable[Dict[str, Any]]) -> "TransactionBatch":
+        """Build from processed transactions (AlgorandClient._process_transaction shape)"""
+        builder = TransactionBatchBuilder()
+        for tx in transactions:
+            builder.append(tx)
+        return builder.build()
+
+    @classmethod
+    def from_indexer(cls, transactions: Iterable[Dict[str, Any]]) -> "TransactionBatch":
+        """Build straight from raw indexer transactions, skipping the per-transaction dicts"""
+        builder = TransactionBatchBuilder()
+        for tx in transactions:
+            builder.append_raw(tx)
+        return builder.build()
+
+    @classmethod
+    def from_bytes(cls, payload: bytes) -> "TransactionBatch":
+        """Rebuild a batch from to_bytes() output; the columns are views over the payload"""
+        count, address_size = _HEADER.unpack_from(payload)
+        columns = {}
+        offset = _HEADER.size
+        for name in _INT64_COLUMNS:
+            columns[name] = np.frombuffer(payload, dtype=np.int64, count=count, offset=offset)
+            offset += 8 * count
+        for name in _INT32_COLUMNS:
+            columns[name] = np.frombuffer(payload, dtype=np.int32, count=count, offset=offset)
+            offset += 4 * count
+        address_blob = bytes(payload[offset:offset + address_size])
+        addresses = address_blob.decode().split("\n") if address_size else []
+        return cls(addresses=addresses, **columns)
+
+    def to_bytes(self) -> bytearray:
+        """Pack the columns and address table into one compact buffer (for worker processes)"""
+        count = len(self)
+        address_blob = "\n".join(self.addresses).encode()
+        columns_size = count * (8 * len(_INT64_COLUMNS) + 4 * len(_INT32_COLUMNS))
+        payload = bytearray(_HEADER.size + columns_size + len(address_blob))
+        _HEADER.pack_into(payload, 0, count, len(address_blob))
+        offset = _HEADER.size
+        # Each column is copied exactly once, straight into its slot in the payload
+        for name, dtype, width in ([(name, np.int64, 8) for name in _INT64_COLUMNS] +
+                                   [(name, np.int32, 4) for name in _INT32_COLUMNS]):
+            np.frombuffer(payload, dtype=dtype, count=count, offset=offset)[:] = getattr(self, name)
+            offset += width * count
+        payload[offset:] = address_blob
+        return payload
+
+    def __len__(self) -> int:
+        return len(self.amounts)
+
+    def __getitem__(self, index: slice) -> "TransactionBatch":
+        if not isinstance(index, slice):
+            raise TypeError("TransactionBatch only supports slicing")
+        return TransactionBatch(self.amounts[index], self.fees[index], self.rounds[index], self.times[index],
+                                self.senders[index], self.receivers[index], self.addresses)
+
+    def counterparty_ids(self) -> np.ndarray:
+        """Distinct address ids appearing as sender or receiver"""
+        ids = np.concatenate((self.senders, self.receivers))
+        return np.unique(ids[ids >= 0])
+
+    def address(self, address_id: int) -> Optional[str]:
+        return self.addresses[address_id] if address_id >= 0 else None
+
+    def iter_transactions(self) -> Iterator[Dict[str, Any]]:
+        """Rebuild the processed transaction fields the columns hold (for debugging and export)"""
+        for i in range(len(self)):
+            yield {
+                "sender": self.address(int(self.senders[i])) or "",
+                "receiver": self.address(int(self.receivers[i])) or "",
+                "amount": int(self.amounts[i]),
+                "fee": int(self.fees[i]),
+                "confirmed-round": int(self.rounds[i]),
+                "round-time": int(self.times[i])
+            }
+
+    def nbytes(self) -> int:
+        """Memory held by the column buffers"""
+        return sum(column.nbytes for column in (self.amounts, self.fees, self.rounds, self.times,
+                                                 self.senders, self.receivers))
+
+class TransactionBatchBuilder:
+    """
+    Appends transactions into growable typed arrays, then exposes them as NumPy columns.
+    build() hands the arrays' buffers to the batch without copying, so a builder is
+    single-use: appending after build() raises RuntimeError.
+    """
+
+    def __init__(self):
+        self._amounts = array("q")
+        self._fees = array("q")
+        self._rounds = array("q")
+        self._times = array("q")
+        self._senders = array("i")
+        self._receivers = array("i")
+        self._addresses: List[str] = []
+        self._address_ids: Dict[str, int] = {}
+        self._built = False
+
+    def __len__(self) -> int:
+        return len(self._amounts)
+
+    def append(self, tx: Dict[str, Any]):
+        """Append a processed transaction"""
+        self._append(tx.get("amount", 0), tx.get("fee", 0), tx.get("confirmed-round", 0),
+                     tx.get("round-time", 0), tx.get("sender", ""), tx.get("receiver", ""))
+
+    def append_raw(self, tx: Dict[str, Any]):
+        """Append a raw indexer transaction"""
+        payment = tx.get("payment-transaction", {})
+        self._append(payment.get("amount", 0), tx.get("fee", 0), tx.get("confirmed-round", 0),
+                     tx.get("round-time", 0), tx.get("sender", ""), payment.get("receiver", ""))
+
+    def build(self) -> TransactionBatch:
+        # np.frombuffer shares the array buffers rather than copying them, and an
+        # array exporting its buffer cannot be resized
+        self._built = True
+        return TransactionBatch(
+            np.frombuffer(self._amounts, dtype=np.int64),
+            np.frombuffer(self._fees, dtype=np.int64),
+            np.frombuffer(self._rounds, dtype=np.int64),
+            np.frombuffer(self._times, dtype=np.int64),
+            np.frombuffer(self._senders, dtype=np.int32),
+            np.frombuffer(self._receivers, dtype=np.int32),
+            self._addresses
+        )
+
+    def _append(self, amount: int, fee: int, confirmed_round: int, round_time: int, sender: str, receiver: str):
+        if self._built:
+            raise RuntimeError("TransactionBatchBuilder cannot be appended to after build()")
+        self._amounts.append(amount)
+        self._fees.append(fee)
+        self._rounds.append(confirmed_round)
+        self._times.append(round_time)
+        self._senders.append(self._intern(sender))
+        self._receivers.append(self._intern(receiver))
+
+    def _intern(self, address: str) -> int:
+        if not address:
+            return -1
+        address_id = self._address_ids.get(address)
+        if address_id is None:
+            address_id = len(self._addresses)
+            self._address_ids[address] = address_id
+            self._addresses.append(address)
+        return address_id
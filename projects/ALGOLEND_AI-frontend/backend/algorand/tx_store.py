@@ -0,0 +1,127 @@
+"""
+Transaction Store
+Local SQLite (WAL) copy of indexer transaction history with per-address sync checkpoints
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Any, Optional, Iterable
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    network TEXT NOT NULL,
+    address TEXT NOT NULL,
+    id TEXT NOT NULL,
+    confirmed_round INTEGER NOT NULL,
+    intra_round_offset INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (network, address, id)
+);
+CREATE INDEX IF NOT EXISTS transactions_by_round
+    ON transactions (network, address, confirmed_round, intra_round_offset, id);
+CREATE TABLE IF NOT EXISTS sync_checkpoints (
+    network TEXT NOT NULL,
+    address TEXT NOT NULL,
+    synced_round INTEGER NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (network, address)
+);
+"""
+
+class TransactionStore:
+    def __init__(self, path: str, read_batch_size: int = 1000):
+        self.path = path
+        self.read_batch_size = read_batch_size
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        # One connection per process, serialized by a lock and used from worker
+        # threads; WAL lets other processes (e.g. batch jobs) read while we write
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    async def get_checkpoint(self, network: str, address: str) -> Optional[int]:
+        """Last round the address is fully synced to, or None if never synced"""
+        return await asyncio.to_thread(self._get_checkpoint, network, address)
+
+    async def save_transactions(self, network: str, address: str, transactions: Iterable[Dict[str, Any]]) -> int:
+        """Insert or replace raw indexer transactions; returns the number written"""
+        return await asyncio.to_thread(self._save_transactions, network, address, list(transactions))
+
+    async def set_checkpoint(self, network: str, address: str, synced_round: int):
+        """Record that every transaction up to synced_round has been stored"""
+        await asyncio.to_thread(self._set_checkpoint, network, address, synced_round)
+
+    async def read_transactions(self, network: str, address: str, before: Optional[tuple] = None,
+                                limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Stored raw transactions, newest first (the indexer's order). before is the
+        (confirmed_round, intra_round_offset, id) of the last row already read.
+        """
+        return await asyncio.to_thread(self._read_transactions, network, address, before,
+                                       limit or self.read_batch_size)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            transactions = self._conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+            addresses = self._conn.execute("SELECT COUNT(*) FROM sync_checkpoints").fetchone()[0]
+        return {"path": self.path, "transactions": transactions, "synced_addresses": addresses}
+
+    def _get_checkpoint(self, network: str, address: str) -> Optional[int]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT synced_round FROM sync_checkpoints WHERE network = ? AND address = ?",
+                (network, address)
+            ).fetchone()
+        return row[0] if row else None
+
+    def _save_transactions(self, network: str, address: str, transactions: List[Dict[str, Any]]) -> int:
+        rows = [
+            (network, address, tx.get("id", ""), tx.get("confirmed-round", 0),
+             tx.get("intra-round-offset", 0), json.dumps(tx, separators=(",", ":")))
+            for tx in transactions
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO transactions "
+                "(network, address, id, confirmed_round, intra_round_offset, data) VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+        return len(rows)
+
+    def _set_checkpoint(self, network: str, address: str, synced_round: int):
+        with self._lock, self._conn:
+            # Checkpoints only move forward, even if a slower sync finishes last
+            self._conn.execute(
+                "INSERT INTO sync_checkpoints (network, address, synced_round, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (network, address) DO UPDATE SET "
+                "synced_round = MAX(synced_round, excluded.synced_round), updated_at = excluded.updated_at",
+                (network, address, synced_round, time.time())
+            )
+
+    def _read_transactions(self, network: str, address: str, before: Optional[tuple],
+                           limit: int) -> List[Dict[str, Any]]:
+        query = "SELECT data FROM transactions WHERE network = ? AND address = ?"
+        params: List[Any] = [network, address]
+        if before is not None:
+            query += " AND (confirmed_round, intra_round_offset, id) < (?, ?, ?)"
+            params.extend(before)
+        query += " ORDER BY confirmed_round DESC, intra_round_offset DESC, id DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [json.loads(row[0]) for row in rows]
@@ -1,20 +1,178 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 import asyncio
 import aiohttp
 import json
 from datetime import datetime, timedelta
+from contextlib import asynccontextmanager
 import math
+import os
+import time
 
 # AI Modules
 from ai.market_oracle import MarketOracle
+from ai.counterparty_graph import CounterpartyGraph
+from ai.feature_store import FeatureStore
+from ai.fraud_detector import FraudDetector
+from ai.participation_index import ParticipationIndex
+from ai.pool_catalog import PoolCatalog
 from ai.risk_analyzer import RiskAnalyzer
+from ai.score_cache import ScoreCache
+from ai.score_maintainer import ScoreMaintainer
+from ai.yield_optimizer import YieldOptimizer
 from algorand.client import AlgorandClient
+from algorand.block_follower import BlockFollower
 from algorand.transactions import TransactionHelper
+from algorand.tx_store import TransactionStore
 
-app = FastAPI(title="AlgoLend AI API", version="1.0.0")
+def _env_list(name: str) -> List[str]:
+    """Comma-separated environment variable as a list"""
+    return [item.strip() for item in os.environ.get(name, "").split(",") if item.strip()]
+
+# Upstream Algorand endpoints (comma-separated lists enable failover and hedging)
+ALGOD_NETWORK = os.environ.get("ALGOD_NETWORK", "testnet")
+ALGORAND_ENDPOINTS = {
+    ALGOD_NETWORK: {
+        "algod": _env_list("ALGOD_ENDPOINTS"),
+        "indexer": _env_list("INDEXER_ENDPOINTS")
+    }
+}
+
+# Local transaction history store (empty path disables it)
+TX_STORE_PATH = os.environ.get("TX_STORE_PATH", "./data/transactions.db")
+tx_store = TransactionStore(TX_STORE_PATH) if TX_STORE_PATH else None
+
+# Persisted per-address scoring features for watched accounts (empty path disables it)
+FEATURE_STORE_PATH = os.environ.get("FEATURE_STORE_PATH", "./data/features.db")
+feature_store = FeatureStore(FEATURE_STORE_PATH) if FEATURE_STORE_PATH else None
+
+# Global counterparty graph built from every analyzed history (network and reputation scores)
+counterparty_graph = CounterpartyGraph(
+    refresh_seconds=float(os.environ.get("COUNTERPARTY_GRAPH_REFRESH_SECONDS", 60))
+)
+
+# Known lending/DEX/governance apps and assets for reputation scoring, re-read when the file changes
+participation_index = ParticipationIndex(
+    ALGOD_NETWORK,
+    path=os.environ.get("PARTICIPATION_INDEX_PATH") or None,
+    poll_seconds=float(os.environ.get("PARTICIPATION_INDEX_POLL_SECONDS", 60))
+)
+
+# Initialize AI agents
+market_oracle = MarketOracle()
+risk_analyzer = RiskAnalyzer(
+    process_workers=int(os.environ.get("RISK_PROCESS_WORKERS", 0)),
+    offload_threshold=int(os.environ.get("RISK_OFFLOAD_THRESHOLD", 20000)),
+    feature_store=feature_store,
+    model_path=os.environ.get("RISK_MODEL_PATH") or None,
+    model_poll_seconds=float(os.environ.get("RISK_MODEL_POLL_SECONDS", 5)),
+    graph=counterparty_graph,
+    participation=participation_index
+)
+algorand_client = AlgorandClient(
+    pool_limit=int(os.environ.get("ALGOD_POOL_LIMIT", 100)),
+    pool_limit_per_host=int(os.environ.get("ALGOD_POOL_LIMIT_PER_HOST", 20)),
+    keepalive_timeout=float(os.environ.get("ALGOD_KEEPALIVE_SECONDS", 30)),
+    dns_cache_ttl=int(os.environ.get("ALGOD_DNS_CACHE_TTL", 300)),
+    endpoints=ALGORAND_ENDPOINTS,
+    endpoint_options={
+        "max_retries": int(os.environ.get("ALGOD_MAX_RETRIES", 2)),
+        "hedge_percentile": float(os.environ.get("ALGOD_HEDGE_PERCENTILE", 0.95))
+    },
+    wire_format=os.environ.get("ALGOD_WIRE_FORMAT", "json"),
+    tx_store=tx_store
+)
+algorand_client.switch_network(ALGOD_NETWORK)
+block_follower = BlockFollower(
+    algorand_client,
+    window=int(os.environ.get("BLOCK_FOLLOWER_WINDOW", 120))
+)
+score_maintainer = ScoreMaintainer(
+    algorand_client,
+    risk_analyzer,
+    max_replay_rounds=int(os.environ.get("SCORE_MAX_REPLAY_ROUNDS", 50))
+) if feature_store is not None else None
+if score_maintainer is not None:
+    block_follower.add_listener(score_maintainer.on_block)
+# Streaming fraud detection over each new block, in fixed-size per-address windows
+fraud_detector = FraudDetector(
+    algorand_client,
+    max_addresses=int(os.environ.get("FRAUD_MAX_ADDRESSES", 4096)),
+    window=int(os.environ.get("FRAUD_WINDOW_TRANSACTIONS", 128)),
+    max_catchup_rounds=int(os.environ.get("FRAUD_MAX_CATCHUP_ROUNDS", 10))
+)
+block_follower.add_listener(fraud_detector.on_block)
+# Live LendingPool catalog from each app's global state, re-read once per round
+pool_catalog = PoolCatalog(
+    algorand_client,
+    [int(app_id) for app_id in _env_list("POOL_APP_IDS") or _env_list("LENDING_POOL_APP_ID")],
+    concurrency=int(os.environ.get("POOL_CATALOG_CONCURRENCY", 16)),
+    min_deposit=float(os.environ.get("POOL_MIN_DEPOSIT_ALGO", 1)),
+    max_deposit=float(os.environ.get("POOL_MAX_DEPOSIT_ALGO", 1000000))
+)
+block_follower.add_listener(pool_catalog.on_block)
+# Portfolio optimization over the catalog's snapshot (built-in sample pools when no apps are configured)
+yield_optimizer = YieldOptimizer(
+    max_frontiers=int(os.environ.get("YIELD_MAX_FRONTIERS", 64)),
+    catalog=pool_catalog if pool_catalog.app_ids else None
+)
+tx_helper = TransactionHelper(
+    endpoints={ALGOD_NETWORK: _env_list("ALGOD_ENDPOINTS")},
+    request_timeout=float(os.environ.get("ALGOD_REQUEST_TIMEOUT_SECONDS", 10)),
+    pool_limit_per_host=int(os.environ.get("ALGOD_POOL_LIMIT_PER_HOST", 20))
+)
+tx_helper.switch_network(ALGOD_NETWORK)
+
+# Portfolios per request to /api/optimize-portfolios, and NDJSON lines per streamed chunk
+BATCH_MAX_PORTFOLIOS = int(os.environ.get("BATCH_MAX_PORTFOLIOS", 50000))
+BATCH_STREAM_CHUNK = int(os.environ.get("BATCH_STREAM_CHUNK", 256))
+
+# Upper bound on the history streamed into a single account analysis
+ANALYSIS_MAX_TRANSACTIONS = int(os.environ.get("ANALYSIS_MAX_TRANSACTIONS", 10000))
+
+# Recent analyses are served from memory; stale ones are refreshed in the background
+score_cache = ScoreCache(
+    fresh_seconds=float(os.environ.get("SCORE_CACHE_FRESH_SECONDS", 5)),
+    max_stale_seconds=float(os.environ.get("SCORE_CACHE_MAX_STALE_SECONDS", 60)),
+    max_entries=int(os.environ.get("SCORE_CACHE_MAX_ENTRIES", 10000))
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open shared upstream connections on startup and release them on shutdown"""
+    await algorand_client.start()
+    await tx_helper.start()
+    await risk_analyzer.start()
+    await counterparty_graph.start()
+    await participation_index.start()
+    if score_maintainer is not None:
+        await score_maintainer.start()
+        # Accounts watched for scoring are monitored for fraud too, across restarts
+        fraud_detector.watch(score_maintainer.watched_addresses())
+    await fraud_detector.start()
+    await pool_catalog.start()
+    await block_follower.start()
+    yield
+    await block_follower.stop()
+    await pool_catalog.stop()
+    await fraud_detector.stop()
+    if score_maintainer is not None:
+        await score_maintainer.stop()
+    score_cache.close()
+    await counterparty_graph.stop()
+    await participation_index.stop()
+    await algorand_client.close()
+    await tx_helper.close()
+    risk_analyzer.close()
+    if tx_store is not None:
+        tx_store.close()
+    if feature_store is not None:
+        feature_store.close()
+
+app = FastAPI(title="AlgoLend AI API", version="1.0.0", lifespan=lifespan)
 
 # CORS middleware
 app.add_middleware(
@@ -25,12 +183,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize AI agents
-market_oracle = MarketOracle()
-risk_analyzer = RiskAnalyzer()
-algorand_client = AlgorandClient()
-tx_helper = TransactionHelper()
-
 class AccountAnalysisRequest(BaseModel):
     address: str
     include_transaction_history: bool = True
@@ -47,6 +199,17 @@ class AccountAnalysisResponse(BaseModel):
     recommendations: List[str]
     ai_confidence: float
 
+class WatchAccountsRequest(BaseModel):
+    addresses: List[str]
+
+class PortfolioOptimizationRequest(BaseModel):
+    portfolio_id: Optional[str] = None
+    current_portfolio: Dict[str, Any] = {}
+    preferences: Dict[str, Any] = {}
+
+class BatchOptimizationRequest(BaseModel):
+    portfolios: List[PortfolioOptimizationRequest]
+
 class NetworkStatsResponse(BaseModel):
     tps: int
     finality_seconds: float
@@ -78,21 +241,13 @@ async def analyze_account(request: AccountAnalysisRequest):
     Analyze an Algorand account using AI to determine creditworthiness
     """
     try:
-        # Get account data from Algorand
-        account_data = await algorand_client.get_account_info(request.address)
-        
-        if not account_data:
-            raise HTTPException(status_code=404, detail="Account not found")
-        
-        # Get transaction history if requested
-        transaction_history = []
-        if request.include_transaction_history:
-            transaction_history = await algorand_client.get_transaction_history(request.address, limit=100)
-        
-        # AI Analysis
-        analysis = await risk_analyzer.analyze_account(
-            account_data=account_data,
-            transaction_history=transaction_history
+        # Keyed by model version too, so a new scoring model never serves old scores
+        cache_key = (algorand_client.current_network, request.address,
+                     request.include_transaction_history, risk_analyzer.model.version)
+        analysis = await score_cache.get(
+            cache_key,
+            lambda: _compute_account_analysis(request.address, request.include_transaction_history),
+            lambda: algorand_client.get_latest_transaction_round(request.address)
         )
         
         return AccountAnalysisResponse(
@@ -111,14 +266,88 @@ async def analyze_account(request: AccountAnalysisRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
+async def _compute_account_analysis(address: str, include_transaction_history: bool) -> Tuple[Dict, Optional[int]]:
+    """Full fetch-and-score pipeline; also returns the round of the account's latest transaction"""
+    # Get account data from Algorand
+    account_data = await algorand_client.get_account_info(address)
+    
+    if not account_data:
+        raise HTTPException(status_code=404, detail="Account not found")
+    
+    # AI Analysis over the columnar transaction history if requested
+    if include_transaction_history:
+        batch = await algorand_client.get_transaction_batch(address, limit=ANALYSIS_MAX_TRANSACTIONS)
+        analysis = await risk_analyzer.analyze_account_batch(account_data=account_data, batch=batch)
+        activity_round = int(batch.rounds.max()) if len(batch) else 0
+    else:
+        analysis = await risk_analyzer.analyze_account(
+            account_data=account_data,
+            transaction_history=[]
+        )
+        activity_round = await algorand_client.get_latest_transaction_round(address)
+    
+    # Failed analyses are returned but never cached
+    if analysis.get("risk_level") == "Unknown":
+        activity_round = None
+    return analysis, activity_round
+
+@app.post("/api/watched-accounts")
+async def watch_accounts(request: WatchAccountsRequest):
+    """
+    Track accounts so their credit scores are kept current from each new block.
+    New accounts are scored from their full history once, then incrementally.
+    """
+    if score_maintainer is None:
+        raise HTTPException(status_code=503, detail="Incremental scoring is disabled (no feature store)")
+    fraud_detector.watch(request.addresses)
+    results = await score_maintainer.watch(request.addresses)
+    return {
+        "added": {address: result for address, result in results.items() if "error" not in result},
+        "failed": {address: result["error"] for address, result in results.items() if "error" in result},
+        "maintainer": score_maintainer.stats()
+    }
+
+@app.get("/api/account-score/{address}")
+async def get_account_score(address: str):
+    """
+    Maintained credit score of a watched account (no history is read to serve it)
+    """
+    if score_maintainer is None:
+        raise HTTPException(status_code=503, detail="Incremental scoring is disabled (no feature store)")
+    score = await score_maintainer.get_score(address)
+    if score is None:
+        raise HTTPException(status_code=404, detail="Account is not watched")
+    return {"address": address, **score}
+
+@app.post("/api/fraud-watch")
+async def fraud_watch(request: WatchAccountsRequest):
+    """
+    Monitor accounts for bursts, volume spikes and round-trip transfers from each new block
+    """
+    results = fraud_detector.watch(request.addresses)
+    return {
+        "added": [address for address, error in results.items() if error is None],
+        "failed": {address: error for address, error in results.items() if error is not None},
+        "detector": fraud_detector.stats()
+    }
+
+@app.get("/api/fraud-alerts")
+async def get_fraud_alerts(address: Optional[str] = None, limit: int = 100):
+    """
+    Most recent fraud alerts, optionally for one account
+    """
+    return {"alerts": fraud_detector.get_alerts(address, limit), "detector": fraud_detector.stats()}
+
 @app.get("/api/network-stats", response_model=NetworkStatsResponse)
 async def get_network_stats():
     """
-    Get live Algorand network statistics
+    Get live Algorand network statistics (served from the background block follower)
     """
+    stats = block_follower.get_stats()
+    if stats is None:
+        raise HTTPException(status_code=503, detail="Network stats are still warming up")
+    
     try:
-        stats = await algorand_client.get_network_stats()
-        
         return NetworkStatsResponse(
             tps=stats['tps'],
             finality_seconds=stats['finality_seconds'],
@@ -143,6 +372,13 @@ async def get_ai_agents_status():
         return {
             "market_oracle": oracle_status,
             "risk_analyzer": risk_status,
+            "score_maintainer": score_maintainer.stats() if score_maintainer is not None else None,
+            "score_cache": score_cache.stats(),
+            "fraud_detector": fraud_detector.stats(),
+            "pool_catalog": pool_catalog.stats(),
+            "yield_optimizer": yield_optimizer.stats(),
+            "counterparty_graph": counterparty_graph.stats(),
+            "participation_index": participation_index.stats(),
             "timestamp": datetime.now().isoformat()
         }
         
@@ -152,16 +388,20 @@ async def get_ai_agents_status():
 @app.post("/api/analyze-lending-pool")
 async def analyze_lending_pool(pool_id: str):
     """
-    Analyze a lending pool using AI
+    Analyze a lending pool using AI: a LendingPool app id from the pool catalog's
+    current snapshot, or one of the optimizer's mock pools when no catalog is configured
     """
+    pool = yield_optimizer.get_pool(pool_id)
+    if pool is None:
+        raise HTTPException(status_code=404, detail=f"Unknown lending pool {pool_id}")
+    
     try:
-        # Get pool data (mock for now, would integrate with actual pool contracts)
         pool_data = {
             "pool_id": pool_id,
-            "total_value_locked": 1000000,  # Mock data
-            "active_loans": 25,
-            "default_rate": 0.02,
-            "average_loan_size": 50000
+            "total_value_locked": pool["tvl"],
+            # Mock pools only state their liquidity, which is 1 - utilization
+            "total_borrowed": pool.get("total_borrowed", pool["tvl"] * (1 - pool["liquidity"])),
+            "interest_rate": pool["apy"]
         }
         
         analysis = await market_oracle.analyze_pool(pool_data)
@@ -179,6 +419,71 @@ async def analyze_lending_pool(pool_id: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Pool analysis failed: {str(e)}")
 
+@app.post("/api/optimize-portfolios")
+async def optimize_portfolios(request: BatchOptimizationRequest):
+    """
+    Optimize many portfolios against one pool snapshot, streamed back as NDJSON: one
+    line per portfolio in request order (with its index and portfolio_id), then a
+    summary line with the batch's throughput. Portfolios with identical preferences
+    share one optimization.
+    """
+    if len(request.portfolios) > BATCH_MAX_PORTFOLIOS:
+        raise HTTPException(status_code=413, detail=f"At most {BATCH_MAX_PORTFOLIOS} portfolios per batch")
+    
+    async def stream():
+        started = time.perf_counter()
+        portfolios = request.portfolios
+        lines = []
+        fragments: Dict[Tuple[Any, ...], str] = {}
+        batch_stats: Dict[str, Any] = {}
+        results = yield_optimizer.optimize_portfolios(
+            ((item.current_portfolio, item.preferences) for item in portfolios),
+            chunk_size=BATCH_STREAM_CHUNK, stats=batch_stats
+        )
+        async for result in results:
+            item = portfolios[result["index"]]
+            lines.append(_encode_batch_result(
+                item.portfolio_id, result, fragments, yield_optimizer.preference_key(item.preferences)
+            ))
+            if len(lines) >= BATCH_STREAM_CHUNK:
+                yield "\n".join(lines) + "\n"
+                lines = []
+        
+        elapsed = time.perf_counter() - started
+        lines.append(json.dumps({"summary": {
+            **batch_stats,
+            "elapsed_seconds": round(elapsed, 4),
+            "portfolios_per_second": round(len(portfolios) / elapsed, 1) if elapsed > 0 else None,
+            "catalog_version": pool_catalog.snapshot.version if yield_optimizer.catalog is not None else None
+        }}))
+        yield "\n".join(lines) + "\n"
+    
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+# Result fields optimize_portfolios shares between portfolios with the same preferences
+SHARED_RESULT_FIELDS = ("optimal_allocation", "expected_returns", "risk_analysis", "constraints",
+                        "action_plan", "optimization_confidence")
+
+def _encode_batch_result(portfolio_id: Optional[str], result: Dict[str, Any],
+                         fragments: Dict[Tuple[Any, ...], str], key: Tuple[Any, ...]) -> str:
+    """
+    One NDJSON line. The shared fields are the same for every portfolio with the same
+    preferences, so they are encoded once per batch, keyed by the preference tuple.
+    """
+    if "error" in result:
+        return json.dumps({"portfolio_id": portfolio_id, **result})
+    fragment = fragments.get(key)
+    if fragment is None:
+        fragment = json.dumps({field: result[field] for field in SHARED_RESULT_FIELDS})[1:-1]
+        fragments[key] = fragment
+    own = json.dumps({
+        "portfolio_id": portfolio_id,
+        "index": result["index"],
+        "rebalancing_recommendations": result["rebalancing_recommendations"],
+        "timestamp": result["timestamp"]
+    })
+    return f"{own[:-1]}, {fragment}}}"
+
 @app.get("/api/market-insights")
 async def get_market_insights():
     """
@@ -193,6 +498,5 @@ async def get_market_insights():
 
 if __name__ == "__main__":
     import uvicorn
-    import os
     port = int(os.environ.get("PORT", 8000))
     uvicorn.run(app, host="0.0.0.0", port=port)
@@ -0,0 +1,79 @@
+"""
+Batch Optimizer Benchmark
+Throughput of YieldOptimizer.optimize_portfolios (one pool snapshot, shared work
+per preference tuple) against one optimize_portfolio call per portfolio, for
+batches with few and many distinct preference tuples. Per-call throughput is
+measured on the first PER_CALL portfolios of each batch.
+
+Usage:
+    python benchmarks/bench_batch_optimizer.py
+"""
+
+import asyncio
+import os
+import random
+import sys
+import time
+from typing import Any, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai.yield_optimizer import YieldOptimizer
+from bench_yield_optimizer import synthetic_pools
+
+PORTFOLIOS = 10_000
+POOLS = 500
+PER_CALL = 1_000
+
+class SnapshotOptimizer(YieldOptimizer):
+    """Serves a fixed synthetic snapshot instead of the catalog"""
+
+    def __init__(self, pools: List[Dict[str, Any]]):
+        super().__init__()
+        self.pools = pools
+
+    async def _get_available_pools(self) -> List[Dict[str, Any]]:
+        return self.pools
+
+def requests(count: int, distinct_amounts: int, pools: List[Dict[str, Any]],
+             seed: int = 3) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    rng = random.Random(seed)
+    amounts = [rng.randint(10, 5_000) * 50 for _ in range(distinct_amounts)]
+    batch = []
+    for _ in range(count):
+        held = rng.sample(pools, 3)
+        batch.append((
+            {"pools": [{"pool_id": pool["id"], "allocation_percent": 100 / 3} for pool in held]},
+            {"risk_tolerance": rng.choice(("conservative", "moderate", "aggressive")),
+             "investment_amount": rng.choice(amounts),
+             "time_horizon": rng.choice((30, 60, 90))}
+        ))
+    return batch
+
+async def per_call(optimizer: YieldOptimizer, batch: List[Tuple[Dict[str, Any], Dict[str, Any]]]) -> float:
+    started = time.perf_counter()
+    for current_portfolio, preferences in batch:
+        await optimizer.optimize_portfolio(current_portfolio, preferences)
+    return time.perf_counter() - started
+
+async def batched(optimizer: YieldOptimizer, batch: List[Tuple[Dict[str, Any], Dict[str, Any]]]) -> float:
+    started = time.perf_counter()
+    async for _ in optimizer.optimize_portfolios(batch):
+        pass
+    return time.perf_counter() - started
+
+async def main() -> None:
+    pools = synthetic_pools(POOLS)
+    optimizer = SnapshotOptimizer(pools)
+    print(f"{PORTFOLIOS} portfolios over {POOLS} pools")
+    print(f"{'amounts':>8} {'tuples':>7} {'per call/s':>11} {'batch/s':>10} {'speedup':>8}")
+    for distinct_amounts in (1, 10, 100, 1_000):
+        batch = requests(PORTFOLIOS, distinct_amounts, pools)
+        tuples = len({tuple(preferences.values()) for _, preferences in batch})
+        await batched(optimizer, batch)
+        single = PER_CALL / await per_call(optimizer, batch[:PER_CALL])
+        shared = PORTFOLIOS / await batched(optimizer, batch)
+        print(f"{distinct_amounts:>8} {tuples:>7} {single:>11.0f} {shared:>10.0f} {shared / single:>7.1f}x")
+
+if __name__ == "__main__":
+    asyncio.run(main())
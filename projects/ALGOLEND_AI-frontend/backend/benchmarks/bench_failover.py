@@ -0,0 +1,72 @@
+"""
+Failover Benchmark
+Measures account lookup latency and error rate through a single endpoint versus
+an endpoint pool with retries, hedging and circuit breakers, using local stand-in
+servers that inject slow responses and errors
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from algorand.client import AlgorandClient
+from benchmarks.standin_server import StandinServer
+
+REQUESTS = 400
+CONCURRENCY = 10
+
+async def run(label: str, client: AlgorandClient) -> None:
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+    errors = 0
+
+    async def one(i: int) -> float:
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await client._fetch_account_info(f"ADDR{i}")
+            except Exception:
+                errors += 1
+            return time.perf_counter() - start
+
+    latencies = sorted(await asyncio.gather(*(one(i) for i in range(REQUESTS))))
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(f"{label:<28} p50={statistics.median(latencies) * 1000:7.2f}ms "
+          f"p99={p99 * 1000:7.2f}ms errors={errors / REQUESTS:6.1%}")
+
+async def main() -> None:
+    # One endpoint with a slow tail and occasional 503s, one healthy endpoint
+    flaky = StandinServer(delay_seconds=0.005, error_rate=0.05, slow_rate=0.1, slow_seconds=0.4)
+    healthy = StandinServer(delay_seconds=0.005)
+    flaky_url = await flaky.start()
+    healthy_url = await healthy.start()
+
+    single = AlgorandClient(endpoint_options={"max_retries": 0, "hedging": False})
+    single.set_endpoints("algod", [flaky_url])
+    await run("single endpoint, no retries", single)
+    await single.close()
+
+    retrying = AlgorandClient(endpoint_options={"hedging": False})
+    retrying.set_endpoints("algod", [flaky_url])
+    await run("single endpoint, retries", retrying)
+    await retrying.close()
+
+    pooled = AlgorandClient()
+    pooled.set_endpoints("algod", [flaky_url, healthy_url])
+    await run("pool, retries + hedging", pooled)
+    for endpoint in pooled.endpoint_pool("algod").stats()["endpoints"]:
+        print(f"{'':<28} {endpoint['url']} state={endpoint['state']} "
+              f"ewma={endpoint['ewma_latency_ms']}ms ok={endpoint['successes']} failed={endpoint['failures']}")
+    stats = pooled.endpoint_pool("algod").stats()
+    print(f"{'':<28} hedged={stats['hedged']} failovers={stats['failovers']} retries={stats['retries']}")
+    await pooled.close()
+
+    await flaky.stop()
+    await healthy.stop()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,101 @@
+"""
+Fraud Detector Benchmark
+Replays block transactions through FraudDetector.process_round and reports
+throughput in transactions per second, alerts raised and the fixed buffer size.
+
+Usage:
+    python benchmarks/bench_fraud_detector.py                        # synthetic rounds
+    python benchmarks/bench_fraud_detector.py rounds.jsonl           # recorded rounds
+    python benchmarks/bench_fraud_detector.py --record rounds.jsonl 200   # record the last 200 rounds
+
+Recorded files hold one {"round": ..., "transactions": [...]} object per line, with
+transactions in AlgorandClient._process_transaction form.
+"""
+
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai.fraud_detector import FraudDetector
+from algorand.client import AlgorandClient
+
+Round = Tuple[int, List[Dict[str, Any]]]
+
+def synthetic_rounds(count: int = 500, txns_per_round: int = 2000, population: int = 50_000) -> List[Round]:
+    """Mostly random payments, with a few accounts that burst, spike or bounce funds back and forth"""
+    rng = random.Random(11)
+    addresses = [f"ADDR{i:06d}" for i in range(population)]
+    rounds = []
+    for index in range(count):
+        round_number = 40_000_000 + index
+        transactions = [
+            {"sender": rng.choice(addresses), "receiver": rng.choice(addresses),
+             "amount": rng.randint(1, 50) * 1_000_000}
+            for _ in range(txns_per_round)
+        ]
+        if index % 50 == 25:
+            transactions += [{"sender": addresses[1], "receiver": rng.choice(addresses), "amount": 1_000_000}
+                             for _ in range(30)]
+        if index % 40 == 30:
+            transactions.append({"sender": addresses[2], "receiver": addresses[3], "amount": 5_000_000_000})
+        if index % 7 == 0:
+            transactions.append({"sender": addresses[4], "receiver": addresses[5], "amount": 2_000_000})
+            transactions.append({"sender": addresses[5], "receiver": addresses[4], "amount": 2_000_000})
+        rounds.append((round_number, transactions))
+    return rounds
+
+def recorded_rounds(path: str) -> List[Round]:
+    with open(path) as f:
+        return [(record["round"], record["transactions"]) for record in map(json.loads, f) if record]
+
+async def record(path: str, count: int) -> None:
+    client = AlgorandClient()
+    await client.start()
+    try:
+        status = await client.get_status()
+        if status is None:
+            raise SystemExit("node status unavailable")
+        last_round = status.get("last-round", 0)
+        with open(path, "w") as f:
+            for round_number in range(last_round - count + 1, last_round + 1):
+                transactions = await client.get_round_transactions(round_number)
+                if transactions is not None:
+                    f.write(json.dumps({"round": round_number, "transactions": transactions}) + "\n")
+    finally:
+        await client.close()
+
+def run(label: str, rounds: List[Round], watched: int) -> None:
+    detector = FraudDetector(client=None, max_addresses=max(watched, 1))
+    activity = Counter(address for _, transactions in rounds for tx in transactions
+                       for address in (tx.get("sender"), tx.get("receiver")) if address)
+    detector.watch([address for address, _ in activity.most_common(watched)])
+
+    transactions = sum(len(txns) for _, txns in rounds)
+    start = time.perf_counter()
+    for round_number, txns in rounds:
+        detector.process_round(round_number, txns)
+    elapsed = time.perf_counter() - start
+
+    stats = detector.stats()
+    print(f"{label:<12} watched={watched:>6} rounds={len(rounds):>5} txns={transactions:>9} "
+          f"| {transactions / elapsed:>12,.0f} txn/s | matched={stats['transactions_matched']:>8} "
+          f"| alerts={stats['alerts']} | buffers={stats['buffer_bytes'] / 1024:,.0f} KiB")
+
+def main() -> None:
+    if len(sys.argv) == 4 and sys.argv[1] == "--record":
+        asyncio.run(record(sys.argv[2], int(sys.argv[3])))
+        return
+    label = os.path.basename(sys.argv[1]) if len(sys.argv) > 1 else "synthetic"
+    rounds = recorded_rounds(sys.argv[1]) if len(sys.argv) > 1 else synthetic_rounds()
+    for watched in (10, 1000, 10_000):
+        run(label, rounds, watched)
+
+if __name__ == "__main__":
+    main()
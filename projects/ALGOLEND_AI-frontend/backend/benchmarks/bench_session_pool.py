@@ -0,0 +1,70 @@
+"""
+Session Pool Benchmark
+Compares per-request latency of a fresh aiohttp session per call against
+the pooled AlgorandClient session, using a local stand-in algod server
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+import aiohttp
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from algorand.client import AlgorandClient
+from benchmarks.standin_server import StandinServer
+
+REQUESTS = 500
+CONCURRENCY = 20
+
+async def fresh_session_call(base_url: str, address: str) -> float:
+    """The pre-pool pattern: one ClientSession per request"""
+    start = time.perf_counter()
+    async with aiohttp.ClientSession() as session:
+        async with session.get(f"{base_url}/v2/accounts/{address}") as response:
+            await response.json()
+    return time.perf_counter() - start
+
+async def pooled_call(client: AlgorandClient, address: str) -> float:
+    start = time.perf_counter()
+    await client.get_account_info(address)
+    return time.perf_counter() - start
+
+async def run(label: str, make_call) -> None:
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def bounded(i: int) -> float:
+        async with semaphore:
+            return await make_call(f"ADDR{i}")
+
+    wall_start = time.perf_counter()
+    latencies = await asyncio.gather(*(bounded(i) for i in range(REQUESTS)))
+    wall = time.perf_counter() - wall_start
+    latencies = sorted(latencies)
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(f"{label:<16} mean={statistics.mean(latencies) * 1000:7.2f}ms "
+          f"p50={statistics.median(latencies) * 1000:7.2f}ms p99={p99 * 1000:7.2f}ms "
+          f"throughput={REQUESTS / wall:8.1f} req/s")
+
+async def main() -> None:
+    fresh_server = StandinServer()
+    fresh_url = await fresh_server.start()
+    await run("fresh session", lambda address: fresh_session_call(fresh_url, address))
+    print(f"{'':<16} connections opened: {fresh_server.connection_count}")
+    await fresh_server.stop()
+
+    pooled_server = StandinServer()
+    pooled_url = await pooled_server.start()
+    client = AlgorandClient(pool_limit_per_host=CONCURRENCY)
+    client.algod_url = pooled_url
+    await client.start()
+    await run("pooled session", lambda address: pooled_call(client, address))
+    print(f"{'':<16} connections opened: {pooled_server.connection_count}")
+    await client.close()
+    await pooled_server.stop()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,115 @@
+"""
+Wire Format Benchmark
+Compares bytes transferred and decode time for JSON versus msgpack algod payloads.
+
+Usage:
+    python benchmarks/bench_wire_format.py                      # synthetic block/account payloads
+    python benchmarks/bench_wire_format.py block.json block.msgpack [...]   # recorded pairs
+"""
+
+import base64
+import json
+import os
+import random
+import sys
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+import msgpack
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from algorand.codec import decode_msgpack, normalize_account
+
+ROUNDS = 50
+
+def synthetic_block(txn_count: int = 5000) -> Dict[str, Any]:
+    """A block shaped like algod's /v2/blocks response, with raw bytes for binary fields"""
+    rng = random.Random(7)
+
+    def raw(size: int) -> bytes:
+        return bytes(rng.getrandbits(8) for _ in range(size))
+
+    txns = []
+    for i in range(txn_count):
+        txns.append({
+            "sig": raw(64),
+            "txn": {
+                "type": "pay",
+                "snd": raw(32),
+                "rcv": raw(32),
+                "amt": rng.randint(1, 10_000_000_000),
+                "fee": 1000,
+                "fv": 40_000_000 + i,
+                "lv": 40_001_000 + i,
+                "note": raw(rng.randint(0, 64)),
+                "gh": raw(32)
+            }
+        })
+    return {"block": {"rnd": 40_000_123, "ts": 1_700_000_000, "tc": 2_000_000_000,
+                      "prev": raw(32), "seed": raw(32), "txn": raw(32), "txns": txns}}
+
+def synthetic_account(assets: int = 500, apps: int = 50) -> Dict[str, Any]:
+    """An account record in algod's msgpack (ledger field name) form"""
+    return {
+        "algo": 123_456_789,
+        "onl": 1,
+        "asset": {10_000 + i: {"a": i * 1000, "f": False} for i in range(assets)},
+        "appl": {
+            20_000 + i: {"hsch": {"nui": 4, "nbs": 2},
+                         "tkv": {f"key{k}": {"tt": 2, "ui": k} for k in range(6)}}
+            for i in range(apps)
+        },
+        "tsch": {"nui": 4 * apps, "nbs": 2 * apps}
+    }
+
+def to_json_form(value: Any) -> Any:
+    """The JSON API's rendering of a payload: bytes become base64 strings"""
+    if isinstance(value, dict):
+        return {str(key): to_json_form(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [to_json_form(item) for item in value]
+    if isinstance(value, bytes):
+        return base64.b64encode(value).decode()
+    return value
+
+def time_per_call(fn: Callable[[], Any]) -> float:
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        fn()
+    return (time.perf_counter() - start) / ROUNDS
+
+def report(label: str, json_bytes: bytes, msgpack_bytes: bytes,
+           msgpack_decoder: Callable[[bytes], Any]) -> None:
+    json_time = time_per_call(lambda: json.loads(json_bytes))
+    msgpack_time = time_per_call(lambda: msgpack_decoder(msgpack_bytes))
+    # Unpack alone, without converting binary fields back to their JSON (base64) form
+    unpack_time = time_per_call(lambda: msgpack.unpackb(msgpack_bytes, raw=False, strict_map_key=False))
+    print(f"{label:<22} json={len(json_bytes) / 1024:9.1f} KiB {json_time * 1000:8.2f} ms | "
+          f"msgpack={len(msgpack_bytes) / 1024:9.1f} KiB {msgpack_time * 1000:8.2f} ms "
+          f"(unpack {unpack_time * 1000:.2f} ms) | "
+          f"bytes {len(msgpack_bytes) / len(json_bytes):5.1%} of json")
+
+def synthetic_pairs() -> List[Tuple[str, bytes, bytes, Callable[[bytes], Any]]]:
+    block = synthetic_block()
+    account = synthetic_account()
+    return [
+        ("block (5000 txns)", json.dumps(to_json_form(block)).encode(), msgpack.packb(block), decode_msgpack),
+        ("account (500 assets)", json.dumps(normalize_account(account)).encode(), msgpack.packb(account),
+         lambda payload: normalize_account(decode_msgpack(payload)))
+    ]
+
+def recorded_pairs(paths: List[str]) -> List[Tuple[str, bytes, bytes, Callable[[bytes], Any]]]:
+    pairs = []
+    for json_path, msgpack_path in zip(paths[::2], paths[1::2]):
+        with open(json_path, "rb") as json_file, open(msgpack_path, "rb") as msgpack_file:
+            pairs.append((os.path.basename(json_path), json_file.read(), msgpack_file.read(), decode_msgpack))
+    return pairs
+
+def main() -> None:
+    pairs = recorded_pairs(sys.argv[1:]) if len(sys.argv) > 2 else synthetic_pairs()
+    for label, json_bytes, msgpack_bytes, decoder in pairs:
+        report(label, json_bytes, msgpack_bytes, decoder)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Yield Optimizer Benchmark
+Times YieldOptimizer._calculate_optimal_allocation on synthetic pool catalogs of
+increasing size for every risk tolerance, and checks each allocation against the
+constraints (risk budget, deposit bounds, term, liquidity, total invested).
+"frontier" is the share of requests answered from the cached efficient frontier
+rather than by the solver.
+
+Usage:
+    python benchmarks/bench_yield_optimizer.py
+"""
+
+import os
+import random
+import statistics
+import sys
+import time
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai.yield_optimizer import YieldOptimizer
+
+SIZES = (5, 50, 500, 2_000, 10_000)
+AMOUNTS = (1_000, 25_000, 250_000)
+TIME_HORIZON = 60
+REPEATS = 20
+
+def synthetic_pools(count: int, seed: int = 7) -> List[Dict[str, Any]]:
+    """APY loosely rising with risk, shorter terms and deeper liquidity on the safer end"""
+    rng = random.Random(seed)
+    pools = []
+    for index in range(count):
+        risk = rng.uniform(3, 70)
+        pools.append({
+            "id": f"pool_{index}",
+            "name": f"Pool {index}",
+            "apy": round(max(0.5, 3 + risk * 0.2 + rng.gauss(0, 2)), 2),
+            "risk_score": round(risk, 1),
+            "tvl": rng.randint(50_000, 5_000_000),
+            "min_deposit": rng.choice((10, 50, 100, 500, 1000)),
+            "max_deposit": rng.choice((5_000, 25_000, 100_000, 1_000_000)),
+            "term_days": rng.choice((7, 15, 30, 60, 90)),
+            "liquidity": round(rng.uniform(0.7, 0.995), 3)
+        })
+    return pools
+
+def violations(optimizer: YieldOptimizer, pools: List[Dict[str, Any]], allocation: List[Dict[str, Any]],
+               risk_tolerance: str, amount: float) -> List[str]:
+    params = optimizer.risk_tolerance_levels[risk_tolerance]
+    by_id = {pool["id"]: pool for pool in pools}
+    problems = []
+    for position in allocation:
+        pool = by_id[position["pool_id"]]
+        deposit = position["allocation_amount"]
+        if not pool["min_deposit"] - 0.01 <= deposit <= pool["max_deposit"] + 0.01:
+            problems.append(f"{pool['id']} deposit {deposit} outside [{pool['min_deposit']}, {pool['max_deposit']}]")
+    constraints = optimizer._check_constraints(allocation, risk_tolerance, amount)
+    if not constraints["risk_constraint_met"]:
+        problems.append(f"risk {constraints['portfolio_risk_score']} > {params['max_risk'] * 100}")
+    return problems
+
+def main() -> None:
+    optimizer = YieldOptimizer()
+    print(f"{'pools':>6} {'tolerance':<13} {'mean ms':>8} {'p95 ms':>8} {'positions':>9} "
+          f"{'apy':>6} {'risk':>6} {'invested':>9} {'frontier':>9}  problems")
+    for size in SIZES:
+        pools = synthetic_pools(size)
+        for risk_tolerance in optimizer.risk_tolerance_levels:
+            timings = []
+            positions = apy = risk = invested = 0.0
+            problems: List[str] = []
+            hits, fallbacks = optimizer.frontier_hits, optimizer.frontier_fallbacks
+            for amount in AMOUNTS:
+                for _ in range(REPEATS):
+                    start = time.perf_counter()
+                    allocation = optimizer._calculate_optimal_allocation(pools, risk_tolerance, amount, TIME_HORIZON)
+                    timings.append(time.perf_counter() - start)
+                constraints = optimizer._check_constraints(allocation, risk_tolerance, amount)
+                positions += len(allocation) / len(AMOUNTS)
+                apy += constraints["portfolio_apy"] / len(AMOUNTS)
+                risk += constraints["portfolio_risk_score"] / len(AMOUNTS)
+                invested += (1 - constraints["unallocated_amount"] / amount) / len(AMOUNTS)
+                problems += violations(optimizer, pools, allocation, risk_tolerance, amount)
+            timings.sort()
+            hits = optimizer.frontier_hits - hits
+            frontier = hits / (hits + optimizer.frontier_fallbacks - fallbacks)
+            print(f"{size:>6} {risk_tolerance:<13} {statistics.mean(timings) * 1000:>8.2f} "
+                  f"{timings[int(len(timings) * 0.95)] * 1000:>8.2f} {positions:>9.1f} {apy:>6.2f} "
+                  f"{risk:>6.2f} {invested:>9.1%} {frontier:>9.1%}  {'; '.join(problems) or 'none'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Stand-in Algorand Server
+Minimal local algod/indexer impersonation used by the benchmarks
+"""
+
+import asyncio
+from typing import Dict, Any, Optional
+from aiohttp import web
+
+SAMPLE_ACCOUNT = {
+    "address": "STANDIN",
+    "amount": 125_000_000,
+    "created-at": 1_700_000_000,
+    "status": "Offline",
+    "apps-local-state": [],
+    "apps-total-schema": {},
+    "assets": [],
+    "created-apps": [],
+    "created-assets": []
+}
+
+class StandinServer:
+    def __init__(self, delay_seconds: float = 0.0, error_rate: float = 0.0,
+                 slow_rate: float = 0.0, slow_seconds: float = 0.5,
+                 block_interval: float = 0.05, txns_per_block: int = 25):
+        self.delay_seconds = delay_seconds
+        self.error_rate = error_rate
+        self.slow_rate = slow_rate
+        self.slow_seconds = slow_seconds
+        self.block_interval = block_interval
+        self.txns_per_block = txns_per_block
+        self.genesis_time = 1_700_000_000
+        self.last_round = 1000
+        self.request_count = 0
+        self.client_peers = set()
+        self._runner: Optional[web.AppRunner] = None
+        self.url = ""
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start serving and return the base URL"""
+        app = web.Application()
+        app.router.add_get("/v2/status", self._status)
+        app.router.add_get("/v2/status/wait-for-block-after/{round}", self._wait_for_block)
+        app.router.add_get("/v2/blocks/{round}", self._block)
+        app.router.add_get("/v2/transactions/params", self._params)
+        app.router.add_get("/v2/accounts/{address}", self._account)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound_port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://{host}:{bound_port}"
+        return self.url
+
+    async def stop(self):
+        """Stop serving"""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    @property
+    def connection_count(self) -> int:
+        """Number of distinct TCP connections opened against the server"""
+        return len(self.client_peers)
+
+    async def _maybe_fail(self, request: web.Request) -> Optional[web.Response]:
+        self.request_count += 1
+        request_number = self.request_count
+        self.client_peers.add(request.transport.get_extra_info("peername"))
+        if self.delay_seconds:
+            await asyncio.sleep(self.delay_seconds)
+        if self.slow_rate and (request_number * 6271 % 100) < self.slow_rate * 100:
+            await asyncio.sleep(self.slow_seconds)
+        # Deterministic spread of failures across request numbers
+        if self.error_rate and (request_number * 7919 % 100) < self.error_rate * 100:
+            return web.json_response({"message": "injected failure"}, status=503)
+        return None
+
+    async def _status(self, request: web.Request) -> web.Response:
+        failure = await self._maybe_fail(request)
+        if failure is not None:
+            return failure
+        return web.json_response({"last-round": self.last_round, "time-since-last-round": 0})
+
+    async def _wait_for_block(self, request: web.Request) -> web.Response:
+        failure = await self._maybe_fail(request)
+        if failure is not None:
+            return failure
+        after = int(request.match_info["round"])
+        while self.last_round <= after:
+            await asyncio.sleep(self.block_interval)
+            self.last_round += 1
+        return web.json_response({"last-round": self.last_round, "time-since-last-round": 0})
+
+    async def _block(self, request: web.Request) -> web.Response:
+        failure = await self._maybe_fail(request)
+        if failure is not None:
+            return failure
+        round_number = int(request.match_info["round"])
+        if round_number > self.last_round:
+            return web.json_response({"message": "block not found"}, status=404)
+        header = {
+            "rnd": round_number,
+            "ts": self.genesis_time + round_number * 3,
+            "tc": round_number * self.txns_per_block
+        }
+        return web.json_response({"block": header})
+
+    async def _params(self, request: web.Request) -> web.Response:
+        failure = await self._maybe_fail(request)
+        if failure is not None:
+            return failure
+        return web.json_response({"fee": 0, "min-fee": 1000, "last-round": self.last_round})
+
+    async def _account(self, request: web.Request) -> web.Response:
+        failure = await self._maybe_fail(request)
+        if failure is not None:
+            return failure
+        account: Dict[str, Any] = dict(SAMPLE_ACCOUNT)
+        account["address"] = request.match_info["address"]
+        return web.json_response(account)
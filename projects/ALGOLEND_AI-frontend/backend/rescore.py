@@ -0,0 +1,82 @@
+"""
+Nightly Rescoring
+Rescores every account opted into the LendingPool application and writes the
+results to a local SQLite file. Reruns with the same job id resume from the last
+saved page.
+
+Usage:
+    python rescore.py --app-id 123456 --network testnet
+    python rescore.py --app-id 123456 --job-id nightly-2024-06-01 --restart
+"""
+
+import argparse
+import asyncio
+import os
+from datetime import date
+
+from ai.participation_index import ParticipationIndex
+from ai.rescoring_job import RescoringJob, RescoringStore
+from ai.risk_analyzer import RiskAnalyzer
+from algorand.client import AlgorandClient
+
+def _env_list(name: str):
+    return [item.strip() for item in os.environ.get(name, "").split(",") if item.strip()]
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Rescore all LendingPool accounts")
+    parser.add_argument("--app-id", type=int, default=int(os.environ.get("LENDING_POOL_APP_ID", 0)),
+                        help="LendingPool application id (default: LENDING_POOL_APP_ID)")
+    parser.add_argument("--network", default=os.environ.get("ALGOD_NETWORK", "testnet"))
+    parser.add_argument("--db", default=os.environ.get("RESCORE_DB_PATH", "./data/rescoring.db"))
+    parser.add_argument("--job-id", help="checkpoint key (default: <network>-<app id>-<today>)")
+    parser.add_argument("--restart", action="store_true", help="discard the job's checkpoint and results")
+    parser.add_argument("--borrowers-only", action="store_true", help="skip accounts with nothing borrowed")
+    parser.add_argument("--page-size", type=int, default=int(os.environ.get("RESCORE_PAGE_SIZE", 500)))
+    parser.add_argument("--concurrency", type=int, default=int(os.environ.get("RESCORE_CONCURRENCY", 16)),
+                        help="concurrent history fetches")
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("RESCORE_WORKERS", os.cpu_count() or 1)),
+                        help="scoring processes (0 scores inline)")
+    parser.add_argument("--max-transactions", type=int,
+                        default=int(os.environ.get("RESCORE_MAX_TRANSACTIONS", 10000)),
+                        help="history depth per account")
+    return parser.parse_args()
+
+async def main() -> None:
+    args = parse_args()
+    if not args.app_id:
+        raise SystemExit("--app-id (or LENDING_POOL_APP_ID) is required")
+    job_id = args.job_id or f"{args.network}-{args.app_id}-{date.today().isoformat()}"
+
+    client = AlgorandClient(
+        pool_limit_per_host=max(args.concurrency, 20),
+        endpoints={args.network: {"algod": _env_list("ALGOD_ENDPOINTS"), "indexer": _env_list("INDEXER_ENDPOINTS")}}
+    )
+    client.switch_network(args.network)
+    analyzer = RiskAnalyzer(
+        process_workers=args.workers,
+        model_path=os.environ.get("RISK_MODEL_PATH") or None,
+        model_poll_seconds=0,
+        participation=ParticipationIndex(
+            args.network, path=os.environ.get("PARTICIPATION_INDEX_PATH") or None, poll_seconds=0
+        )
+    )
+    store = RescoringStore(args.db)
+    job = RescoringJob(
+        client, analyzer, store, args.app_id, job_id,
+        page_size=args.page_size,
+        concurrency=args.concurrency,
+        max_transactions=args.max_transactions,
+        borrowers_only=args.borrowers_only
+    )
+
+    await client.start()
+    await analyzer.offload.start()
+    try:
+        await job.run(restart=args.restart)
+    finally:
+        await client.close()
+        analyzer.offload.close()
+        store.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())